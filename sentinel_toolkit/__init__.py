@@ -13,11 +13,16 @@ from .ecostress import Ecostress
 
 from .srf import S2Srf
 from .srf import S2SrfOptions
+from .srf import SensorSrf
 
 from .colorimetry import sd_to_sentinel_numpy
 from .colorimetry import sd_to_sentinel_colour
 
 from .colorimetry import sd_to_sentinel_direct_colour
 from .colorimetry import sd_to_sentinel_direct_numpy
+from .colorimetry import sd_to_sentinel_batch_numpy
+
+from .colorimetry import ConversionKernel
 
 from .converter import EcostressToSentinelConverter
+from .converter import CubeToSentinelConverter
@@ -11,6 +11,39 @@ from .sentinel_values import sd_to_sentinel_direct_colour
 
 from .sentinel_values import sd_to_sentinel_numpy
 from .sentinel_values import sd_to_sentinel_direct_numpy
+from .sentinel_values import sd_to_sentinel_batch_numpy
 
+from .spectral_data import SpectralData
+from .spectral_data import SpectralBatch
+
+from .kernel import ConversionKernel
+from .kernel import SparseConversionKernel
+from .kernel import ConversionKernelCache
+from .kernel import KERNEL_CACHE
+
+from .inversion import InverseModel
+
+from .band_adjustment import BandAdjustment
+from .band_adjustment import LinearBandAdjustment
+from .band_adjustment import simulate_sensors
+
+from .srf_ensemble import SrfEnsemble
+from .srf_ensemble import SrfEnsembleReport
+from .srf_ensemble import perturb_bands_responses
+
+from .resampling import RESAMPLING_METHODS
+from .resampling import resample_batch
+
+from .spectral_grid import SpectralGrid
+from .spectral_grid import ResamplingErrorReport
+from .spectral_grid import interpolation_matrix
+from .spectral_grid import resampling_error_report
+
+from .illuminants import D65_300_830_1NM_DISTRIBUTION
+from .illuminants import D65_300_830_1NM_VALUES
 from .illuminants import D65_360_830_1NM_DISTRIBUTION
 from .illuminants import D65_360_830_1NM_VALUES
+
+from .illuminants import Illuminant
+from .illuminants import get_illuminant
+from .illuminants import register_illuminant
@@ -0,0 +1,298 @@
+"""
+band_adjustment provides tools for harmonizing the responses of two sensors, e.g. Sentinel-2A
+with Sentinel-2B or Sentinel-2 with another sensor: simulate_sensors converts a spectral
+library for several sensors in one pass, BandAdjustment fits per-band polynomial transfer
+functions and LinearBandAdjustment fits a cross-band linear transfer function, both with
+a batched least squares solve. The coefficients are kept in compact tables, which can be
+saved to CSV files and applied to whole images.
+"""
+
+import csv
+
+import numpy as np
+
+from .kernel import get_float_dtype
+from .sentinel_values import sd_to_sentinel_batch_numpy
+
+
+class BandAdjustment:
+    """
+    BandAdjustment maps the source band band_indices[b] to the target band b with
+    the polynomial sum_d coefficients[b, d] * x^d (lowest order first).
+    """
+
+    def __init__(self, coefficients, band_indices=None, band_names=None):
+        """
+        Parameters
+        ----------
+        coefficients : array_like
+                       The (target_bands x degree + 1) polynomial coefficients.
+        band_indices : array_like of int
+                       The source band of each target band. If missing, 0, 1, 2, ...
+        band_names : list of str
+                     The target band names. If missing, B1, B2, B3, ...
+        """
+        coefficients = np.array(coefficients, dtype=np.float64, ndmin=2)
+        bands_count = len(coefficients)
+
+        if band_indices is None:
+            band_indices = np.arange(bands_count)
+        if band_names is None:
+            band_names = [f"B{i + 1}" for i in range(bands_count)]
+
+        self.coefficients = coefficients
+        self.band_indices = np.asarray(band_indices, dtype=np.int64)
+        self.band_names = list(band_names)
+        self.rmse = None
+
+    @classmethod
+    def fit(cls, source_responses, target_responses, degree=1, band_indices=None):
+        """
+        Fits the polynomials of all the bands with one batched least squares solve.
+
+        Parameters
+        ----------
+        source_responses : ndarray
+                           The (spectra x source_bands) simulated source responses.
+        target_responses : ndarray
+                           The (spectra x target_bands) simulated target responses.
+        degree : int
+                 The degree of the polynomials. If missing, default to 1 (linear).
+        band_indices : array_like of int
+                       The source band of each target band. If missing, 0, 1, 2, ...
+        Returns
+        -------
+        output : BandAdjustment
+                 The fitted band adjustment. Its rmse holds the residuals of each band.
+        """
+        target_responses = np.asarray(target_responses, dtype=np.float64)
+        if band_indices is None:
+            band_indices = np.arange(target_responses.shape[1])
+
+        source = np.asarray(source_responses, dtype=np.float64)[:, band_indices]
+        # The (target_bands x spectra x degree + 1) design matrices.
+        design = source.T[:, :, None] ** np.arange(degree + 1)
+
+        gram = np.einsum('bnd,bne->bde', design, design)
+        moments = np.einsum('bnd,nb->bd', design, target_responses)
+
+        adjustment = cls(_solve_batched(gram, moments), band_indices)
+        adjustment.rmse = _get_rmse(adjustment.apply(source_responses), target_responses)
+        return adjustment
+
+    def apply(self, sentinel_responses):
+        """
+        Applies the band adjustment to responses, e.g. a (rows x columns x bands) image.
+
+        Parameters
+        ----------
+        sentinel_responses : ndarray
+                             The source responses with the bands in the last axis.
+        Returns
+        -------
+        output : ndarray
+                 The adjusted responses with the target bands in the last axis.
+        """
+        source = np.asarray(sentinel_responses)[..., self.band_indices]
+        coefficients = self.coefficients.astype(get_float_dtype(source.dtype))
+
+        # Horner's scheme, one multiply-add per degree over the whole array.
+        output = np.broadcast_to(coefficients[:, -1], source.shape).copy()
+        for degree in range(coefficients.shape[1] - 2, -1, -1):
+            output *= source
+            output += coefficients[:, degree]
+        return output
+
+    def to_csv(self, filename):
+        """
+        Writes the coefficient table to a CSV file with the columns
+        Band, SourceBand, C0, C1, ...
+
+        Parameters
+        ----------
+        filename : str or Path
+                   The CSV filename.
+        """
+        header = ["Band", "SourceBand"] + [f"C{d}" for d in range(self.coefficients.shape[1])]
+        rows = [[band_name, band_index] + coefficients.tolist() for band_name, band_index,
+                coefficients in zip(self.band_names, self.band_indices, self.coefficients)]
+        _write_table(filename, header, rows)
+
+    @classmethod
+    def from_csv(cls, filename):
+        """
+        Reads a coefficient table written by to_csv.
+
+        Parameters
+        ----------
+        filename : str or Path
+                   The CSV filename.
+        Returns
+        -------
+        output : BandAdjustment
+                 The band adjustment.
+        """
+        _, rows = _read_table(filename)
+        band_names = [row[0] for row in rows]
+        band_indices = [int(row[1]) for row in rows]
+        coefficients = [[float(value) for value in row[2:]] for row in rows]
+        return cls(coefficients, band_indices, band_names)
+
+
+class LinearBandAdjustment:
+    """
+    LinearBandAdjustment maps all the source bands to each target band:
+    target = source @ matrix.T + offset, so it is applied with one matrix multiplication.
+    """
+
+    def __init__(self, matrix, offset, band_names=None):
+        """
+        Parameters
+        ----------
+        matrix : array_like
+                 The (target_bands x source_bands) matrix.
+        offset : array_like
+                 The (target_bands,) offset.
+        band_names : list of str
+                     The target band names. If missing, B1, B2, B3, ...
+        """
+        self.matrix = np.array(matrix, dtype=np.float64, ndmin=2)
+        self.offset = np.asarray(offset, dtype=np.float64)
+        if band_names is None:
+            band_names = [f"B{i + 1}" for i in range(len(self.matrix))]
+        self.band_names = list(band_names)
+        self.rmse = None
+
+    @classmethod
+    def fit(cls, source_responses, target_responses):
+        """
+        Fits all the target bands with one least squares solve with multiple right-hand sides.
+
+        Parameters
+        ----------
+        source_responses : ndarray
+                           The (spectra x source_bands) simulated source responses.
+        target_responses : ndarray
+                           The (spectra x target_bands) simulated target responses.
+        Returns
+        -------
+        output : LinearBandAdjustment
+                 The fitted band adjustment. Its rmse holds the residuals of each band.
+        """
+        source_responses = np.asarray(source_responses, dtype=np.float64)
+        target_responses = np.asarray(target_responses, dtype=np.float64)
+
+        design = np.hstack([source_responses, np.ones((len(source_responses), 1))])
+        solution = np.linalg.lstsq(design, target_responses, rcond=None)[0]
+
+        adjustment = cls(solution[:-1].T, solution[-1])
+        adjustment.rmse = _get_rmse(adjustment.apply(source_responses), target_responses)
+        return adjustment
+
+    def apply(self, sentinel_responses):
+        """
+        Applies the band adjustment to responses, e.g. a (rows x columns x bands) image.
+
+        Parameters
+        ----------
+        sentinel_responses : ndarray
+                             The source responses with the bands in the last axis.
+        Returns
+        -------
+        output : ndarray
+                 The adjusted responses with the target bands in the last axis.
+        """
+        sentinel_responses = np.asarray(sentinel_responses)
+        dtype = get_float_dtype(sentinel_responses.dtype)
+
+        output = np.dot(sentinel_responses, self.matrix.T.astype(dtype))
+        output += self.offset.astype(dtype)
+        return output
+
+    def to_csv(self, filename):
+        """
+        Writes the coefficient table to a CSV file with the columns
+        Band, Offset, S1, S2, ... (the weights of the source bands).
+
+        Parameters
+        ----------
+        filename : str or Path
+                   The CSV filename.
+        """
+        header = ["Band", "Offset"] + [f"S{i + 1}" for i in range(self.matrix.shape[1])]
+        rows = [[band_name, offset] + weights.tolist()
+                for band_name, offset, weights in zip(self.band_names, self.offset, self.matrix)]
+        _write_table(filename, header, rows)
+
+    @classmethod
+    def from_csv(cls, filename):
+        """
+        Reads a coefficient table written by to_csv.
+
+        Parameters
+        ----------
+        filename : str or Path
+                   The CSV filename.
+        Returns
+        -------
+        output : LinearBandAdjustment
+                 The band adjustment.
+        """
+        _, rows = _read_table(filename)
+        band_names = [row[0] for row in rows]
+        values = np.array([[float(value) for value in row[1:]] for row in rows])
+        return cls(values[:, 1:], values[:, 0], band_names)
+
+
+def simulate_sensors(spectral_data, bands_responses, illuminant=None):
+    """
+    Converts a spectral library to the responses of several sensors in one pass,
+    by stacking their bands responses into a single conversion kernel.
+
+    Parameters
+    ----------
+    spectral_data : SpectralData (tuple) or SpectralBatch
+                    The wavelengths and (spectra x wavelengths) spectral responses.
+    bands_responses : list of ndarray
+                      The (bands x wavelengths) bands responses of each sensor
+                      in the wavelengths of the spectral data.
+    illuminant : ndarray or Illuminant
+                 The illuminant to apply. If missing, default to D65.
+    Returns
+    -------
+    output : list of ndarray
+             The (spectra x bands) responses of each sensor.
+    """
+    stacked = np.vstack(bands_responses)
+    responses = sd_to_sentinel_batch_numpy(spectral_data, stacked, illuminant)
+
+    sections = np.cumsum([len(sensor_responses) for sensor_responses in bands_responses])[:-1]
+    return np.split(responses, sections, axis=1)
+
+
+def _solve_batched(gram, moments):
+    # Falls back to least squares for the bands whose normal equations are singular.
+    try:
+        return np.linalg.solve(gram, moments[:, :, None])[:, :, 0]
+    except np.linalg.LinAlgError:
+        return np.array([np.linalg.lstsq(band_gram, band_moments, rcond=None)[0]
+                         for band_gram, band_moments in zip(gram, moments)])
+
+
+def _get_rmse(actual, expected):
+    return np.sqrt(np.mean((actual - expected) ** 2, axis=0))
+
+
+def _write_table(filename, header, rows):
+    with open(filename, 'w', encoding='utf-8', newline='') as table_file:
+        writer = csv.writer(table_file)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def _read_table(filename):
+    with open(filename, encoding='utf-8', newline='') as table_file:
+        reader = csv.reader(table_file)
+        header = next(reader)
+        rows = list(reader)
+    return header, rows
@@ -1,6 +1,15 @@
 """
-Illuminants module provides various illuminant spectral data.
+Illuminants module provides various illuminant spectral data
+and a registry of illuminants with cached slices for any wavelength range or grid.
 """
 
+from .d65 import D65_300_830_1NM_DISTRIBUTION
+from .d65 import D65_300_830_1NM_VALUES
 from .d65 import D65_360_830_1NM_DISTRIBUTION
 from .d65 import D65_360_830_1NM_VALUES
+
+from .registry import Illuminant
+from .registry import IlluminantRegistry
+from .registry import ILLUMINANTS
+from .registry import get_illuminant
+from .registry import register_illuminant
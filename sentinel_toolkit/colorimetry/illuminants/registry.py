@@ -0,0 +1,305 @@
+"""
+registry provides the class Illuminant that keeps an illuminant on an integer 1 nm grid
+and hands out cached slices of it, and a registry of the known illuminants:
+
+- D65 - the CIE D65 table shipped with the toolkit (300-830 nm, the whole CIE table),
+- D50 and the F series (FL1-FL12) - the CIE tables from colour (300/380-780 nm),
+- A - the CIE illuminant A, computed from its Planckian definition (300-2500 nm),
+- BB5778 - the Planck curve of a 5778 K blackbody (300-2500 nm). It is not a measured
+  solar spectrum: it has no atmospheric absorption bands and no Fraunhofer lines.
+
+None of the CIE illuminants reaches the SWIR bands (B8A-B12), so converting up to 2500 nm
+needs an explicit illuminant: A, BB5778, or preferably a measured solar spectrum
+(e.g. ASTM E-490 or ASTM G173) added with register_illuminant.
+"""
+
+import threading
+
+import numpy as np
+
+from colour import SDS_ILLUMINANTS
+from colour import SpectralDistribution
+from colour import SpectralShape
+
+from .d65 import D65_300_830_1NM_VALUES
+
+_EXTENDED_RANGE = (300, 2500)
+_BB5778_TEMPERATURE = 5778
+_A_TEMPERATURE = 2848
+_C2 = 1.435e7
+
+
+class Illuminant:
+    """
+    Illuminant keeps the values of an illuminant on an integer 1 nm grid.
+    The slices for a given wavelength range are read-only views, so they are free,
+    and the values resampled on other grids or as colour objects are cached.
+    """
+
+    def __init__(self, name, wavelengths, values):
+        """
+        Parameters
+        ----------
+        name : str
+               The name of the illuminant.
+        wavelengths : array_like
+                      The ascending wavelengths in nm.
+        values : array_like
+                 The illuminant values.
+        """
+        wavelengths = np.asarray(wavelengths, dtype=np.float64)
+        values = np.asarray(values, dtype=np.float64)
+
+        if not (float(wavelengths[0]).is_integer() and np.all(np.diff(wavelengths) == 1)):
+            grid = np.arange(np.ceil(wavelengths[0]), np.floor(wavelengths[-1]) + 1)
+            values = np.interp(grid, wavelengths, values)
+            wavelengths = grid
+
+        values = np.array(values)
+        values.setflags(write=False)
+
+        self.name = name
+        self.start = int(wavelengths[0])
+        self.end = int(wavelengths[-1])
+        self.values = values
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    @property
+    def wavelength_range(self):
+        """
+        Returns the (start, end) wavelength range of the illuminant.
+        """
+        return self.start, self.end
+
+    def get_values(self, wavelength_range):
+        """
+        Returns the illuminant values in a given wavelength range with 1 nm steps.
+
+        Parameters
+        ----------
+        wavelength_range : tuple of int
+                           The wavelength range of interest (inclusive).
+        Returns
+        -------
+        output : ndarray
+                 A read-only view of the illuminant values.
+        """
+        start, end = int(wavelength_range[0]), int(wavelength_range[1])
+        if start < self.start or end > self.end:
+            error_msg = (f'The illuminant {self.name} is defined in ({self.start}, {self.end}),'
+                         f' not in ({start}, {end})!')
+            raise ValueError(error_msg)
+
+        return self.values[start - self.start: end - self.start + 1]
+
+    def get_values_at(self, wavelengths):
+        """
+        Returns the illuminant values at given wavelengths. Consecutive integer wavelengths
+        are served as a view of the values, other wavelengths are interpolated.
+
+        Parameters
+        ----------
+        wavelengths : array_like
+                      The ascending wavelengths of interest in nm.
+        Returns
+        -------
+        output : ndarray
+                 The illuminant values at the given wavelengths.
+        """
+        wavelengths = np.asarray(wavelengths)
+        start, end = wavelengths[0], wavelengths[-1]
+        if float(start).is_integer() and len(wavelengths) == end - start + 1:
+            return self.get_values((start, end))
+        return self._resample(wavelengths)
+
+    def resample(self, grid):
+        """
+        Returns the illuminant values at the wavelengths of a given grid.
+
+        Parameters
+        ----------
+        grid : SpectralGrid
+               The grid of interest.
+        Returns
+        -------
+        output : ndarray
+                 The read-only illuminant values at the grid wavelengths.
+        """
+        return self._get_cached(('grid', grid), lambda: self._resample(grid.wavelengths))
+
+    def to_distribution(self, shape):
+        """
+        Returns the illuminant as a colour.SpectralDistribution with a given shape.
+
+        Parameters
+        ----------
+        shape : colour.SpectralShape
+                The shape of interest.
+        Returns
+        -------
+        output : colour.SpectralDistribution
+                 The illuminant spectral distribution. It is cached, so it should not be modified.
+        """
+        def create():
+            wavelengths = shape.wavelengths
+            return SpectralDistribution(self._resample(wavelengths), wavelengths, name=self.name)
+
+        key = ('distribution', shape.start, shape.end, shape.interval)
+        return self._get_cached(key, create)
+
+    def _resample(self, wavelengths):
+        if wavelengths[0] < self.start or wavelengths[-1] > self.end:
+            error_msg = (f'The illuminant {self.name} is defined in ({self.start}, {self.end}),'
+                         f' not in ({wavelengths[0]}, {wavelengths[-1]})!')
+            raise ValueError(error_msg)
+
+        values = np.interp(wavelengths, np.arange(self.start, self.end + 1), self.values)
+        values.setflags(write=False)
+        return values
+
+    def _get_cached(self, key, create):
+        with self._lock:
+            value = self._cache.get(key)
+        if value is None:
+            value = create()
+            with self._lock:
+                self._cache[key] = value
+        return value
+
+
+class IlluminantRegistry:
+    """
+    IlluminantRegistry maps illuminant names to Illuminant objects.
+    The built-in illuminants are created on first use.
+    """
+
+    def __init__(self):
+        self._factories = {}
+        self._illuminants = {}
+        self._lock = threading.Lock()
+
+    def register(self, illuminant, factory=None):
+        """
+        Registers an illuminant.
+
+        Parameters
+        ----------
+        illuminant : Illuminant or str
+                     The illuminant, or its name when a factory is given.
+        factory : callable
+                  A function returning the Illuminant, called on first use.
+        """
+        with self._lock:
+            if factory is None:
+                self._illuminants[illuminant.name] = illuminant
+                self._factories.pop(illuminant.name, None)
+            else:
+                self._illuminants.pop(illuminant, None)
+                self._factories[illuminant] = factory
+
+    def get(self, name):
+        """
+        Retrieves a registered illuminant.
+
+        Parameters
+        ----------
+        name : str
+               The name of the illuminant.
+        Returns
+        -------
+        output : Illuminant
+                 The illuminant.
+        """
+        with self._lock:
+            illuminant = self._illuminants.get(name)
+            if illuminant is None:
+                if name not in self._factories:
+                    raise KeyError(f'Unknown illuminant "{name}"!')
+                illuminant = self._factories.pop(name)()
+                self._illuminants[name] = illuminant
+        return illuminant
+
+    def names(self):
+        """
+        Retrieves the names of all the registered illuminants.
+
+        Returns
+        -------
+        output : list of str
+                 The registered illuminant names.
+        """
+        with self._lock:
+            return list(self._illuminants) + list(self._factories)
+
+
+ILLUMINANTS = IlluminantRegistry()
+
+
+def register_illuminant(name, wavelengths, values):
+    """
+    Registers a user-supplied illuminant in the default illuminant registry.
+
+    Parameters
+    ----------
+    name : str
+           The name of the illuminant.
+    wavelengths : array_like
+                  The ascending wavelengths in nm.
+    values : array_like
+             The illuminant values.
+    Returns
+    -------
+    output : Illuminant
+             The registered illuminant.
+    """
+    illuminant = Illuminant(name, wavelengths, values)
+    ILLUMINANTS.register(illuminant)
+    return illuminant
+
+
+def get_illuminant(name):
+    """
+    Retrieves an illuminant from the default illuminant registry.
+
+    Parameters
+    ----------
+    name : str
+           The name of the illuminant, e.g. "D65", "D50", "A", "FL2" or "BB5778".
+    Returns
+    -------
+    output : Illuminant
+             The illuminant.
+    """
+    return ILLUMINANTS.get(name)
+
+
+def _planckian_values(temperature, wavelengths):
+    # Relative spectral power of a blackbody, normalized to 100 at 560 nm.
+    return 100 * (560 / wavelengths) ** 5 * \
+        np.expm1(_C2 / (temperature * 560)) / np.expm1(_C2 / (temperature * wavelengths))
+
+
+def _create_planckian(name, temperature):
+    wavelengths = np.arange(_EXTENDED_RANGE[0], _EXTENDED_RANGE[1] + 1, dtype=np.float64)
+    return Illuminant(name, wavelengths, _planckian_values(temperature, wavelengths))
+
+
+def _create_from_colour(name):
+    spectral_distribution = SDS_ILLUMINANTS[name].copy()
+    shape = spectral_distribution.shape
+    spectral_distribution.interpolate(SpectralShape(shape.start, shape.end, 1))
+    return Illuminant(name, spectral_distribution.wavelengths, spectral_distribution.values)
+
+
+def _register_builtin_illuminants():
+    ILLUMINANTS.register("D65", lambda: Illuminant("D65", np.arange(300, 831),
+                                                   D65_300_830_1NM_VALUES))
+    ILLUMINANTS.register("A", lambda: _create_planckian("A", _A_TEMPERATURE))
+    ILLUMINANTS.register("BB5778", lambda: _create_planckian("BB5778", _BB5778_TEMPERATURE))
+
+    for name in ["D50"] + [f"FL{i}" for i in range(1, 13)]:
+        ILLUMINANTS.register(name, lambda name=name: _create_from_colour(name))
+
+
+_register_builtin_illuminants()
@@ -0,0 +1,179 @@
+"""
+inversion provides the class InverseModel that reconstructs spectra from Sentinel-2 responses.
+It inverts the weights of a ConversionKernel by regularized least squares, optionally
+restricted to a basis of a spectral library (e.g. the Ecostress library), and precomputes
+the result as a single (wavelengths x bands) matrix, so inverting an image is one matrix
+product per chunk of pixels.
+"""
+
+import numpy as np
+
+from .kernel import get_float_dtype
+
+_INVERSION_CHUNK_SIZE = 65536
+
+
+class InverseModel:
+    """
+    InverseModel reconstructs spectra x = mean + basis @ c from Sentinel-2 responses y,
+    where c minimizes ||K @ (mean + basis @ c) - y||^2 + regularization * s^2 * ||c||^2
+    for the kernel weights K, s^2 being the largest eigenvalue of (K @ basis) @ (K @ basis).T.
+    Without a basis, this gives the regularized minimum-norm deviation from the mean.
+
+    The solution is affine in y, so it is kept as the read-only (wavelengths x bands)
+    matrix and the (wavelengths,) offset: x = matrix @ y + offset.
+    """
+
+    def __init__(self, kernel, basis=None, mean=None, regularization=1e-6):
+        """
+        Parameters
+        ----------
+        kernel : ConversionKernel
+                 The kernel converting the spectra to Sentinel-2 responses.
+        basis : ndarray
+                The (wavelengths x components) basis of the reconstructed spectra.
+                If missing, the spectra are reconstructed in all the wavelengths.
+        mean : ndarray
+               The prior (wavelengths,) mean spectrum. If missing, zeros.
+        regularization : float
+                         The regularization weight, relative to the largest eigenvalue.
+                         If missing, default to 1e-6.
+        """
+        weights = kernel.weights
+        wavelengths_count = weights.shape[1]
+
+        if mean is None:
+            mean = np.zeros(wavelengths_count)
+        mean = np.asarray(mean, dtype=np.float64)
+
+        if basis is None:
+            projected = weights
+        else:
+            basis = np.asarray(basis, dtype=np.float64)
+            projected = np.dot(weights, basis)
+
+        pseudo_inverse = _regularized_pseudo_inverse(projected, regularization)
+        matrix = pseudo_inverse if basis is None else np.dot(basis, pseudo_inverse)
+        offset = mean - np.dot(matrix, np.dot(weights, mean))
+
+        matrix.setflags(write=False)
+        offset.setflags(write=False)
+
+        self.kernel = kernel
+        self.basis = basis
+        self.mean = mean
+        self.regularization = regularization
+        self.matrix = matrix
+        self.offset = offset
+        self._typed = {np.dtype(np.float64): (matrix.T, offset)}
+
+    @classmethod
+    def from_spectra(cls, kernel, spectral_responses, components=None, regularization=1e-6):
+        """
+        Creates an InverseModel whose prior mean and basis are the mean and
+        the principal components of a spectral library.
+
+        Parameters
+        ----------
+        kernel : ConversionKernel
+                 The kernel converting the spectra to Sentinel-2 responses.
+        spectral_responses : ndarray
+                             The (spectra x wavelengths) library in the kernel wavelengths,
+                             e.g. Ecostress spectra resampled with a SpectralGrid.
+        components : int
+                     The number of principal components.
+                     If missing, the number of bands of the kernel.
+        regularization : float
+                         The regularization weight, relative to the largest eigenvalue.
+                         If missing, default to 1e-6.
+        Returns
+        -------
+        output : InverseModel
+                 The corresponding inverse model.
+        """
+        spectral_responses = np.asarray(spectral_responses, dtype=np.float64)
+        if components is None:
+            components = kernel.weights.shape[0]
+
+        mean = spectral_responses.mean(axis=0)
+        _, singular_values, right_vectors = np.linalg.svd(spectral_responses - mean,
+                                                          full_matrices=False)
+
+        # Drop the components the library does not span.
+        rank = np.count_nonzero(singular_values > singular_values[0] * 1e-12) \
+            if len(singular_values) > 0 else 0
+        basis = right_vectors[:min(components, rank)].T
+
+        return cls(kernel, basis, mean, regularization)
+
+    def invert(self, sentinel_responses, out=None, chunk_size=_INVERSION_CHUNK_SIZE):
+        """
+        Reconstructs spectra from Sentinel-2 responses, chunk_size pixels at a time.
+
+        Parameters
+        ----------
+        sentinel_responses : ndarray
+                             The Sentinel-2 responses with the bands in the last axis,
+                             e.g. (bands,), (pixels x bands) or (rows x columns x bands).
+        out : ndarray
+              The C-contiguous array to write the spectra to, e.g. a numpy.memmap,
+              with the shape of the responses and the wavelengths in the last axis.
+              If missing, a new array is allocated.
+        chunk_size : int
+                     The number of pixels inverted at a time. If missing, default to 65536.
+        Returns
+        -------
+        output : ndarray
+                 The reconstructed spectra, in the floating point type of the responses.
+        """
+        sentinel_responses = np.asarray(sentinel_responses)
+        dtype = get_float_dtype(sentinel_responses.dtype)
+        matrix_t, offset = self._get_typed(dtype)
+
+        bands_count, wavelengths_count = matrix_t.shape
+        if sentinel_responses.shape[-1] != bands_count:
+            error_msg = f'Expected {bands_count} bands, got {sentinel_responses.shape[-1]}!'
+            raise ValueError(error_msg)
+
+        out = _get_output(out, sentinel_responses.shape[:-1] + (wavelengths_count,), dtype)
+
+        responses = sentinel_responses.reshape(-1, bands_count)
+        spectra = out.reshape(-1, wavelengths_count)
+        for start in range(0, len(responses), chunk_size):
+            end = min(start + chunk_size, len(responses))
+            chunk = np.dot(responses[start:end], matrix_t)
+            chunk += offset
+            spectra[start:end] = chunk
+
+        return out
+
+    def _get_typed(self, dtype):
+        typed = self._typed.get(dtype)
+        if typed is None:
+            typed = (np.ascontiguousarray(self.matrix.T, dtype=dtype), self.offset.astype(dtype))
+            self._typed[dtype] = typed
+        return typed
+
+
+def _get_output(out, shape, dtype):
+    if out is None:
+        return np.empty(shape, dtype=dtype)
+    if out.shape != shape or not out.flags.c_contiguous:
+        error_msg = f'Expected a C-contiguous output array of shape {shape}, got {out.shape}!'
+        raise ValueError(error_msg)
+    return out
+
+
+def _regularized_pseudo_inverse(matrix, regularization):
+    # Returns (A.T @ A + l * I)^-1 @ A.T, using the smaller of the two equivalent forms.
+    rows, columns = matrix.shape
+    if regularization == 0:
+        return np.linalg.pinv(matrix)
+
+    gram = np.dot(matrix, matrix.T) if rows <= columns else np.dot(matrix.T, matrix)
+    scale = np.linalg.eigvalsh(gram)[-1] if gram.size > 0 else 0
+    gram[np.diag_indices_from(gram)] += regularization * (scale if scale > 0 else 1)
+
+    if rows <= columns:
+        return np.linalg.solve(gram, matrix).T
+    return np.linalg.solve(gram, matrix.T)
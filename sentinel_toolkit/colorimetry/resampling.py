@@ -0,0 +1,158 @@
+"""
+resampling provides resample_batch, which resamples many spectra with their own native
+wavelengths onto a common grid in one step. The spectra are grouped by their wavelengths
+and each group is resampled with one cached linear operator, built once for the linear,
+cubic spline and Sprague methods, the latter two matching colour's interpolators.
+"""
+
+from functools import lru_cache
+
+import numpy as np
+from colour.utilities import is_uniform
+from scipy.interpolate import interp1d
+from scipy.sparse import csr_matrix
+
+from .kernel import get_float_dtype
+from .spectral_data import SpectralData
+from .spectral_grid import interpolation_matrix
+
+RESAMPLING_METHODS = ("linear", "cubic", "sprague", "colour")
+
+# The coefficients of colour.SpragueInterpolator.
+_SPRAGUE_C_COEFFICIENTS = np.array([
+    [884, -1960, 3033, -2648, 1080, -180],
+    [508, -540, 488, -367, 144, -24],
+    [-24, 144, -367, 488, -540, 508],
+    [-180, 1080, -2648, 3033, -1960, 884]
+]) / 209
+_SPRAGUE_W_COEFFICIENTS = np.array([
+    [2, -16, 0, 16, -2, 0],
+    [-1, 16, -30, 16, -1, 0],
+    [-9, 39, -70, 66, -33, 7],
+    [13, -64, 126, -124, 61, -12],
+    [-5, 25, -50, 50, -25, 5]
+]) / 24
+
+
+def resample_batch(spectral_batch, grid, method="linear"):
+    """
+    Resamples many spectra onto the wavelengths of a grid.
+
+    Parameters
+    ----------
+    spectral_batch : SpectralBatch
+                     The spectra with their native wavelengths, in any order.
+                     For repeated wavelengths, the last value is used.
+    grid : SpectralGrid
+           The grid to resample onto.
+    method : str
+             The interpolation method: "linear", "cubic" (a cubic spline, like
+             colour.CubicSplineInterpolator), "sprague" (like colour.SpragueInterpolator,
+             for uniformly spaced spectra) or "colour" (Sprague for uniformly spaced spectra
+             and cubic for the rest, like colour.SpectralDistribution.interpolate).
+             If missing, default to "linear".
+    Returns
+    -------
+    output : tuple of SpectralData and ndarray
+             The grid wavelengths and (spectra x wavelengths) spectral responses,
+             zero outside of the native range of each spectrum, and the
+             (spectra x wavelengths) boolean mask of the values inside the native range.
+    """
+    if method not in RESAMPLING_METHODS:
+        raise ValueError(f'Unknown resampling method "{method}"!')
+
+    target_bytes = grid.wavelengths.tobytes()
+    dtype = get_float_dtype(spectral_batch.spectral_responses.dtype)
+
+    spectral_responses = np.zeros((len(spectral_batch), len(grid)), dtype=dtype)
+    mask = np.zeros((len(spectral_batch), len(grid)), dtype=bool)
+
+    for source_bytes, positions in _group_by_wavelengths(spectral_batch).items():
+        operator, valid = _get_operator(source_bytes, target_bytes, method)
+
+        positions = np.asarray(positions)
+        length = operator.shape[1]
+        indices = spectral_batch.offsets[positions][:, None] + np.arange(length)
+        values = spectral_batch.spectral_responses[indices]
+
+        spectral_responses[positions] = (operator.astype(dtype) @ values.T).T
+        mask[positions] = valid
+
+    return SpectralData(grid.wavelengths, spectral_responses), mask
+
+
+def _group_by_wavelengths(spectral_batch):
+    groups = {}
+    wavelengths = np.ascontiguousarray(spectral_batch.wavelengths, dtype=np.float64)
+    for i, (start, end) in enumerate(zip(spectral_batch.offsets[:-1], spectral_batch.offsets[1:])):
+        groups.setdefault(wavelengths[start:end].tobytes(), []).append(i)
+    return groups
+
+
+@lru_cache(maxsize=64)
+def _get_operator(source_bytes, target_bytes, method):
+    # Returns the (target x source) operator and the mask of the targets in the source range.
+    source = np.frombuffer(source_bytes, dtype=np.float64)
+    target = np.frombuffer(target_bytes, dtype=np.float64)
+
+    # Sorts the source wavelengths, keeping the last of the repeated ones.
+    reversed_indices = np.arange(len(source))[::-1]
+    sorted_source, first = np.unique(source[::-1], return_index=True)
+    selection = csr_matrix((np.ones(len(first)), (np.arange(len(first)), reversed_indices[first])),
+                           shape=(len(sorted_source), len(source)))
+
+    valid = (target >= sorted_source[0]) & (target <= sorted_source[-1])
+    valid.setflags(write=False)
+
+    if method == "colour":
+        method = "sprague" if is_uniform(sorted_source) else "cubic"
+
+    if method == "linear":
+        operator = interpolation_matrix(sorted_source, target)
+    elif method == "cubic":
+        operator = _cubic_operator(sorted_source, target, valid)
+    else:
+        operator = _sprague_operator(sorted_source, target, valid)
+
+    return csr_matrix(operator @ selection), valid
+
+
+def _cubic_operator(source, target, valid):
+    if len(source) < 4:
+        raise ValueError("The cubic resampling requires at least 4 wavelengths!")
+
+    operator = np.zeros((len(target), len(source)))
+    operator[valid] = interp1d(source, np.eye(len(source)), kind='cubic', axis=0)(target[valid])
+    return operator
+
+
+def _sprague_operator(source, target, valid):
+    if len(source) < 6:
+        raise ValueError("The Sprague resampling requires at least 6 wavelengths!")
+    if not is_uniform(source):
+        raise ValueError("The Sprague resampling requires uniformly spaced wavelengths!")
+
+    count = len(source)
+    step = source[1] - source[0]
+
+    # The values are extended with two extra points on each side: extended = extension @ values.
+    extension = np.zeros((count + 4, count))
+    extension[[0, 1], :6] = _SPRAGUE_C_COEFFICIENTS[:2]
+    extension[2:-2] = np.eye(count)
+    extension[[-2, -1], -6:] = _SPRAGUE_C_COEFFICIENTS[2:]
+    extended_source = np.concatenate([source[0] - step * np.array([2, 1]), source,
+                                      source[-1] + step * np.array([1, 2])])
+
+    rows = np.flatnonzero(valid)
+    i = np.searchsorted(extended_source, target[rows]) - 1
+    x = (target[rows] - extended_source[i]) / (extended_source[i + 1] - extended_source[i])
+
+    # y = r[i] + sum_k a_k x^k with a = W @ r[i - 2: i + 4], so each target is a weighted sum
+    # of 6 extended values.
+    weights = np.dot(x[:, None] ** np.arange(1, 6), _SPRAGUE_W_COEFFICIENTS)
+    weights[:, 2] += 1
+    columns = (i[:, None] + np.arange(-2, 4)) % len(extended_source)
+
+    sprague = csr_matrix((weights.ravel(), (np.repeat(rows, 6), columns.ravel())),
+                         shape=(len(target), len(extended_source)))
+    return sprague @ csr_matrix(extension)
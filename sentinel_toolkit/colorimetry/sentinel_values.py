@@ -2,21 +2,25 @@
 sentinel_values provides methods for converting a spectral distribution to sentinel responses.
 """
 
-from collections import namedtuple
-
-import colour
 import numpy as np
 
-from .illuminants import D65_360_830_1NM_DISTRIBUTION
-from .illuminants.d65 import D65_360_830_1NM_VALUES
+from .illuminants.registry import Illuminant
+from .illuminants.registry import get_illuminant
+from .kernel import ConversionKernel
+from .kernel import SparseConversionKernel
+from .kernel import KERNEL_CACHE
+from .kernel import get_float_dtype
+from .spectral_data import SpectralBatch
+from .spectral_data import SpectralData  # pylint: disable=unused-import
 
-SpectralData = namedtuple("SpectralData", "wavelengths spectral_responses")
+_BATCH_CHUNK_SIZE = 65536
 
 
 def sd_to_sentinel_colour(spectral_distribution,
                           s2_srf,
                           s2_srf_options,
-                          illuminant=None):
+                          illuminant=None,
+                          dtype=np.float64):
     """
     Returns the corresponding Sentinel-2 spectral responses to a given
     spectral distribution, band names, illuminant and wavelength range.
@@ -32,18 +36,21 @@ def sd_to_sentinel_colour(spectral_distribution,
                      If satellite is missing, satellite 'A' will be used.
                      If band names are missing, all band names will be used.
                      If wavelength range is missing, (360, 830) will be used.
-    illuminant : colour.SpectralDistribution
+    illuminant : colour.SpectralDistribution or Illuminant
                  The illuminant to apply. If missing, default to D65 360-830 nm.
+    dtype : data-type
+            The floating point type to compute in, e.g. np.float32. If missing, np.float64.
     Returns
     -------
     output : ndarray
              The Sentinel-2 spectral responses.
     """
-    bands_responses = s2_srf.get_bands_responses(s2_srf_options)
-    return sd_to_sentinel_direct_colour(spectral_distribution, bands_responses, illuminant)
+    bands_responses = s2_srf.get_bands_responses(s2_srf_options, dtype=dtype)
+    return sd_to_sentinel_direct_colour(spectral_distribution, bands_responses, illuminant, dtype)
 
 
-def sd_to_sentinel_direct_colour(spectral_distribution, bands_responses, illuminant=None):
+def sd_to_sentinel_direct_colour(spectral_distribution, bands_responses, illuminant=None,
+                                 dtype=np.float64):
     """
     Returns the corresponding Sentinel-2 spectral responses to a given
     spectral distribution, band names, illuminant and wavelength range.
@@ -54,31 +61,40 @@ def sd_to_sentinel_direct_colour(spectral_distribution, bands_responses, illumin
                             The spectral distribution of interest.
     bands_responses : ndarray
                       The bands_responses functions represented as a 2D ndarray.
-    illuminant : colour.SpectralDistribution
+    illuminant : colour.SpectralDistribution or Illuminant
                  The illuminant to apply. If missing, default to D65 360-830 nm.
+    dtype : data-type
+            The floating point type to compute in, e.g. np.float32. If missing, np.float64.
     Returns
     -------
     output : ndarray
              The Sentinel-2 spectral responses.
     """
     if illuminant is None:
-        shape = spectral_distribution.shape
-        illuminant = colour.SpectralDistribution(D65_360_830_1NM_DISTRIBUTION).trim(shape)
+        illuminant = get_illuminant("D65")
+    if isinstance(illuminant, Illuminant):
+        # The distributions are cached per shape, so they are built only once.
+        illuminant = illuminant.to_distribution(spectral_distribution.shape)
+
+    bands_responses = np.asarray(bands_responses, dtype=dtype)
 
     row_sum = np.sum(bands_responses, axis=1)
     # Hack for solving division by zero optimally
     row_sum[row_sum == 0] = 1
     bands_srf = bands_responses / row_sum[:, None]
 
-    sd_i = spectral_distribution.values * illuminant.values
+    sd_i = np.multiply(spectral_distribution.values, illuminant.values, dtype=dtype)
 
     return np.dot(bands_srf, sd_i)
 
 
-def sd_to_sentinel_numpy(spectral_data,
+def sd_to_sentinel_numpy(spectral_data,  # pylint: disable=too-many-arguments
                          s2_srf,
                          s2_srf_options,
-                         illuminant=None):
+                         illuminant=None,
+                         sparse=False,
+                         *,
+                         grid=None):
     """
     Returns the corresponding Sentinel-2 spectral responses to a given
     spectral distribution, band names, illuminant and wavelength range.
@@ -94,18 +110,28 @@ def sd_to_sentinel_numpy(spectral_data,
                      If satellite is missing, satellite 'A' will be used.
                      If band names are missing, all band names will be used.
                      If wavelength range is missing, (360, 830) will be used.
-    illuminant : colour.SpectralDistribution
+    illuminant : ndarray or Illuminant
                  The illuminant to apply. If missing, default to D65 360-830 nm.
+    sparse : bool
+             Whether to integrate each band only over its non-zero support.
+             If missing, default to False.
+    grid : SpectralGrid
+           The grid the spectral data is sampled at, e.g. SpectralGrid(360, 830, 10).
+           The bands responses and the illuminant are resampled onto it.
+           If missing, the spectral data is sampled at 1 nm.
     Returns
     -------
     output : ndarray
              The Sentinel-2 spectral responses.
     """
-    bands_responses = s2_srf.get_bands_responses(s2_srf_options)
-    return sd_to_sentinel_direct_numpy(spectral_data, bands_responses, illuminant)
+    if grid is None:
+        illuminant = _get_kernel_illuminant(illuminant, spectral_data.wavelengths, s2_srf_options)
+
+    kernel = KERNEL_CACHE.get(s2_srf, s2_srf_options, illuminant, sparse, grid=grid)
+    return kernel.apply(spectral_data.spectral_responses)
 
 
-def sd_to_sentinel_direct_numpy(spectral_data, bands_responses, illuminant=None):
+def sd_to_sentinel_direct_numpy(spectral_data, bands_responses, illuminant=None, sparse=False):
     """
     Returns the corresponding Sentinel-2 spectral responses to a given
     spectral distribution, band names, illuminant and wavelength range
@@ -118,24 +144,117 @@ def sd_to_sentinel_direct_numpy(spectral_data, bands_responses, illuminant=None)
                     The wavelengths and spectral_responses of interest
     bands_responses : ndarray
                       The bands_responses functions represented as a 2D ndarray.
-    illuminant : ndarray
+    illuminant : ndarray or Illuminant
                  The illuminant to apply. If missing, default to D65 360-830 nm.
+    sparse : bool
+             Whether to integrate the bands only over their non-zero support.
+             Only the weights in the support are built. If missing, default to False.
     Returns
     -------
     output : ndarray
              The Sentinel-2 spectral responses.
     """
-    min_wavelength = int(spectral_data.wavelengths[0])
-    max_wavelength = int(spectral_data.wavelengths[-1])
+    illuminant = _get_illuminant_values(illuminant, spectral_data.wavelengths)
+
+    kernel_class = SparseConversionKernel if sparse else ConversionKernel
+    kernel = kernel_class(bands_responses, illuminant)
+    return kernel.apply(spectral_data.spectral_responses)
+
+
+def sd_to_sentinel_batch_numpy(spectral_data,
+                               bands_responses,
+                               illuminant=None,
+                               mask=None,
+                               chunk_size=_BATCH_CHUNK_SIZE):
+    """
+    Returns the corresponding Sentinel-2 spectral responses to many spectral distributions
+    sharing the same wavelengths, using one matrix multiplication per chunk of spectra.
+
+    Parameters
+    ----------
+    spectral_data : SpectralData (tuple) of ndarray or SpectralBatch
+                    The shared wavelengths and the (spectra x wavelengths) spectral_responses.
+                    The spectral_responses can be a np.memmap larger than the memory.
+                    A SpectralBatch is converted on all its distinct wavelengths
+                    and its missing values are masked.
+    bands_responses : ndarray
+                      The bands_responses functions represented as a 2D ndarray.
+    illuminant : ndarray or Illuminant
+                 The illuminant to apply. If missing, default to D65 360-830 nm.
+    mask : ndarray
+           A (spectra x wavelengths) boolean array of the valid values.
+           The invalid values are ignored and the bands responses are normalized
+           only over the valid wavelengths of each spectrum. If missing, all values are valid.
+    chunk_size : int
+                 The number of spectra converted at once. If missing, default to 65536.
+    Returns
+    -------
+    output : ndarray
+             The (spectra x bands) Sentinel-2 spectral responses,
+             float32 for float32 spectral responses and float64 otherwise.
+    """
+    if isinstance(spectral_data, SpectralBatch):
+        spectral_data, batch_mask = spectral_data.to_dense()
+        mask = batch_mask if mask is None else mask & batch_mask
 
+    spectral_responses = np.asarray(spectral_data.spectral_responses)
+    illuminant = _get_illuminant_values(illuminant, spectral_data.wavelengths)
+
+    kernel = ConversionKernel(bands_responses, illuminant)
+    bands_srf = None
+    if mask is not None:
+        bands_srf = ConversionKernel(bands_responses, np.ones(len(illuminant))).weights
+
+    spectra_count = len(spectral_responses)
+    output = np.empty((spectra_count, len(kernel.weights)),
+                      dtype=get_float_dtype(spectral_responses.dtype))
+    for start in range(0, spectra_count, chunk_size):
+        end = min(start + chunk_size, spectra_count)
+        chunk = spectral_responses[start:end]
+
+        if mask is None:
+            output[start:end] = kernel.apply(chunk)
+        else:
+            output[start:end] = _apply_masked(kernel, bands_srf, chunk, mask[start:end])
+
+    return output
+
+
+def _get_illuminant_values(illuminant, wavelengths):
     if illuminant is None:
-        illuminant = D65_360_830_1NM_VALUES[min_wavelength - 360: max_wavelength - 359]
+        illuminant = get_illuminant("D65")
+    if isinstance(illuminant, Illuminant):
+        illuminant = illuminant.get_values_at(wavelengths)
+    return illuminant
 
-    row_sum = np.sum(bands_responses, axis=1)
-    # Hack for solving division by zero optimally
-    row_sum[row_sum == 0] = 1
-    bands_srf = bands_responses / row_sum[:, None]
 
-    sd_i = spectral_data.spectral_responses * illuminant
+def _get_kernel_illuminant(illuminant, wavelengths, s2_srf_options):
+    # The illuminant is taken at the wavelengths of the spectral data. An Illuminant is
+    # a cheaper cache key than its values, so it is kept when the kernel takes it at the
+    # same wavelengths, those of the wavelength range of the options.
+    if illuminant is None:
+        illuminant = get_illuminant("D65")
+    if not isinstance(illuminant, Illuminant):
+        return illuminant
+
+    wavelength_range = (360, 830)
+    if s2_srf_options is not None and s2_srf_options.wavelength_range is not None:
+        wavelength_range = s2_srf_options.wavelength_range
 
-    return np.dot(bands_srf, sd_i)
+    wavelengths = np.asarray(wavelengths)
+    start, end = wavelength_range
+    if wavelengths[0] == start and wavelengths[-1] == end and len(wavelengths) == end - start + 1:
+        return illuminant
+    return illuminant.get_values_at(wavelengths)
+
+
+def _apply_masked(kernel, bands_srf, spectral_responses, mask):
+    # Renormalizes each band over the valid wavelengths of each spectrum. The spectra
+    # without missing values are left as they are, so they match the unmasked conversion.
+    responses = kernel.apply(np.where(mask, spectral_responses, 0))
+
+    valid_weight = np.dot(mask.astype(bands_srf.dtype), bands_srf.T)
+    valid_weight[valid_weight == 0] = 1
+    valid_weight[np.all(mask, axis=1)] = 1
+
+    return responses / valid_weight
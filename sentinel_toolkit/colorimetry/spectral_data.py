@@ -0,0 +1,231 @@
+"""
+spectral_data provides the SpectralData tuple holding the wavelengths and spectral responses
+of a spectral distribution, and the class SpectralBatch that keeps many spectral distributions
+in contiguous buffers.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+SpectralData = namedtuple("SpectralData", "wavelengths spectral_responses")
+
+
+class SpectralBatch:
+    """
+    SpectralBatch keeps the wavelengths and spectral responses of many spectral distributions
+    in two contiguous buffers, indexed by an offsets array in a CSR-like layout:
+    the data of the i-th spectrum is in [offsets[i], offsets[i + 1]).
+    """
+
+    __slots__ = ("spectrum_ids", "wavelengths", "spectral_responses", "offsets", "_positions")
+
+    def __init__(self, spectrum_ids, wavelengths, spectral_responses, offsets):
+        """
+        Parameters
+        ----------
+        spectrum_ids : array_like
+                       The spectrum identifiers.
+        wavelengths : array_like
+                      The concatenated wavelengths of all the spectra.
+        spectral_responses : array_like
+                             The concatenated spectral responses of all the spectra.
+        offsets : array_like
+                  The (spectra + 1) offsets of each spectrum in the buffers.
+        """
+        self.spectrum_ids = np.asarray(spectrum_ids)
+        self.wavelengths = np.asarray(wavelengths)
+        self.spectral_responses = np.asarray(spectral_responses)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self._positions = None
+
+        if len(self.offsets) != len(self.spectrum_ids) + 1:
+            raise ValueError("The offsets should have one more element than the spectrum ids!")
+
+    @classmethod
+    def from_spectral_data(cls, spectral_data, spectrum_ids=None):
+        """
+        Creates a SpectralBatch from SpectralData tuples.
+
+        Parameters
+        ----------
+        spectral_data : iterable of SpectralData (tuple)
+                        The spectral distributions.
+        spectrum_ids : array_like
+                       The spectrum identifiers. If missing, 0, 1, 2, ... will be used.
+        Returns
+        -------
+        output : SpectralBatch
+                 The spectral distributions in contiguous buffers.
+        """
+        spectral_data = list(spectral_data)
+        if spectrum_ids is None:
+            spectrum_ids = np.arange(len(spectral_data))
+
+        lengths = [len(data.wavelengths) for data in spectral_data]
+        offsets = np.zeros(len(spectral_data) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        if len(spectral_data) == 0:
+            return cls(spectrum_ids, np.empty(0), np.empty(0), offsets)
+
+        wavelengths = np.concatenate([data.wavelengths for data in spectral_data])
+        spectral_responses = np.concatenate([data.spectral_responses for data in spectral_data])
+        return cls(spectrum_ids, wavelengths, spectral_responses, offsets)
+
+    def __len__(self):
+        return len(self.spectrum_ids)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __getitem__(self, index):
+        """
+        Returns the SpectralData of the spectrum at a given position,
+        or a SpectralBatch for a slice of positions. No data is copied for slices.
+        """
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step != 1:
+                return self.take(np.arange(start, stop, step))
+            stop = max(start, stop)
+            begin, end = self.offsets[start], self.offsets[stop]
+            return SpectralBatch(self.spectrum_ids[start:stop],
+                                 self.wavelengths[begin:end],
+                                 self.spectral_responses[begin:end],
+                                 self.offsets[start:stop + 1] - begin)
+
+        index = range(len(self))[index]
+        begin, end = self.offsets[index], self.offsets[index + 1]
+        return SpectralData(self.wavelengths[begin:end], self.spectral_responses[begin:end])
+
+    def get(self, spectrum_id):
+        """
+        Returns the SpectralData of a given spectrum identifier.
+
+        Parameters
+        ----------
+        spectrum_id : int
+                      The spectrum identifier.
+        Returns
+        -------
+        output : SpectralData (tuple)
+                 The wavelengths and spectral responses of the spectrum.
+        """
+        return self[self._get_positions()[spectrum_id]]
+
+    def select(self, spectrum_ids):
+        """
+        Returns a SpectralBatch with the given spectrum identifiers, in the given order.
+
+        Parameters
+        ----------
+        spectrum_ids : array_like
+                       The spectrum identifiers.
+        Returns
+        -------
+        output : SpectralBatch
+                 The selected spectral distributions.
+        """
+        positions = self._get_positions()
+        return self.take([positions[spectrum_id] for spectrum_id in spectrum_ids])
+
+    def take(self, positions):
+        """
+        Returns a SpectralBatch with the spectra at the given positions, in the given order.
+
+        Parameters
+        ----------
+        positions : array_like of int
+                    The positions of the spectra in this batch.
+        Returns
+        -------
+        output : SpectralBatch
+                 The selected spectral distributions.
+        """
+        positions = np.asarray(positions, dtype=np.int64)
+        lengths = self.offsets[positions + 1] - self.offsets[positions]
+
+        offsets = np.zeros(len(positions) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+
+        indices = np.repeat(self.offsets[positions] - offsets[:-1], lengths) + \
+            np.arange(offsets[-1])
+        return SpectralBatch(self.spectrum_ids[positions],
+                             self.wavelengths[indices],
+                             self.spectral_responses[indices],
+                             offsets)
+
+    def _get_positions(self):
+        if self._positions is None:
+            self._positions = {spectrum_id: i for i, spectrum_id in
+                               enumerate(self.spectrum_ids.tolist())}
+        return self._positions
+
+    def get_lengths(self):
+        """
+        Returns the number of values of each spectrum.
+
+        Returns
+        -------
+        output : ndarray
+                 The number of values of each spectrum.
+        """
+        return np.diff(self.offsets)
+
+    def to_dense(self, wavelengths=None, fill_value=0):
+        """
+        Converts the batch to a dense (spectra x wavelengths) matrix.
+        The values of each spectrum are placed at its own wavelengths,
+        the rest of the matrix is filled with fill_value.
+
+        Parameters
+        ----------
+        wavelengths : array_like
+                      The wavelengths of the matrix columns.
+                      If missing, all the distinct wavelengths of the batch will be used.
+        fill_value : float
+                     The value of the missing elements. If missing, default to 0.
+        Returns
+        -------
+        output : tuple of SpectralData and ndarray
+                 The wavelengths and (spectra x wavelengths) spectral responses,
+                 and the (spectra x wavelengths) boolean mask of the present values.
+        """
+        if wavelengths is None:
+            wavelengths = np.unique(self.wavelengths)
+        wavelengths = np.asarray(wavelengths)
+
+        columns = np.searchsorted(wavelengths, self.wavelengths)
+        columns_in_range = np.minimum(columns, len(wavelengths) - 1)
+        present = (columns < len(wavelengths)) & (wavelengths[columns_in_range] == self.wavelengths)
+        rows = np.repeat(np.arange(len(self)), self.get_lengths())
+
+        shape = (len(self), len(wavelengths))
+        spectral_responses = np.full(shape, fill_value, dtype=np.result_type(
+            self.spectral_responses, np.min_scalar_type(fill_value)))
+        spectral_responses[rows[present], columns[present]] = self.spectral_responses[present]
+
+        mask = np.zeros(shape, dtype=bool)
+        mask[rows[present], columns[present]] = True
+
+        return SpectralData(wavelengths, spectral_responses), mask
+
+    def to_masked(self, wavelengths=None):
+        """
+        Converts the batch to a (spectra x wavelengths) numpy.ma.MaskedArray,
+        in which the missing values are masked.
+
+        Parameters
+        ----------
+        wavelengths : array_like
+                      The wavelengths of the matrix columns.
+                      If missing, all the distinct wavelengths of the batch will be used.
+        Returns
+        -------
+        output : numpy.ma.MaskedArray
+                 The (spectra x wavelengths) spectral responses.
+        """
+        spectral_data, mask = self.to_dense(wavelengths)
+        return np.ma.MaskedArray(spectral_data.spectral_responses, mask=~mask)
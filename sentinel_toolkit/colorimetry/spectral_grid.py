@@ -0,0 +1,202 @@
+"""
+spectral_grid provides the class SpectralGrid describing the wavelengths of a regular
+or irregular spectral grid, precomputed sparse linear interpolation operators
+for resampling spectral data onto it, and a report of the error introduced
+by converting on a coarser grid.
+"""
+
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+from scipy.sparse import csr_matrix
+
+from .kernel import ConversionKernel
+
+ResamplingErrorReport = namedtuple("ResamplingErrorReport",
+                                   "reference resampled absolute_error relative_error "
+                                   "max_absolute_error max_relative_error")
+
+
+class SpectralGrid:
+    """
+    SpectralGrid describes the wavelengths (in nm) the spectral data is sampled at.
+    It is either regular - given by start, stop and step, or irregular - given by the wavelengths.
+    Conversions run on a grid through sd_to_sentinel_numpy(..., grid=grid) and
+    ConversionKernel.from_s2_srf(..., grid=grid), which resample the bands responses
+    and the illuminant onto it. The other conversion functions and the converters take
+    spectral data and bands responses on the same wavelengths, 1 nm for the converters.
+    """
+
+    def __init__(self, start=360, stop=830, step=1, wavelengths=None):
+        """
+        Parameters
+        ----------
+        start : float
+                The first wavelength of a regular grid. If missing, default to 360.
+        stop : float
+               The last wavelength (inclusive) of a regular grid. If missing, default to 830.
+        step : float
+               The step of a regular grid. If missing, default to 1.
+        wavelengths : array_like
+                      The ascending wavelengths of an irregular grid.
+                      If given, start, stop and step are ignored.
+        """
+        if wavelengths is None:
+            wavelengths = np.arange(start, stop + step / 2, step, dtype=np.float64)
+        else:
+            wavelengths = np.array(wavelengths, dtype=np.float64)
+            steps = np.diff(wavelengths)
+            step = steps[0] if len(steps) > 0 and np.allclose(steps, steps[0]) else None
+
+        wavelengths.setflags(write=False)
+        self.wavelengths = wavelengths
+        self.step = step
+
+    @property
+    def is_regular(self):
+        """
+        Returns whether the grid has a constant step.
+        """
+        return self.step is not None
+
+    def interpolation_matrix(self, source_wavelengths):
+        """
+        Returns the sparse (grid_size x source_size) linear interpolation operator
+        from the given source wavelengths to this grid. The operators are cached.
+        Grid wavelengths outside of the source wavelengths get zero values.
+
+        Parameters
+        ----------
+        source_wavelengths : array_like
+                             The ascending wavelengths the spectral data is sampled at.
+        Returns
+        -------
+        output : scipy.sparse.csr_matrix
+                 The interpolation operator.
+        """
+        source_wavelengths = np.ascontiguousarray(source_wavelengths, dtype=np.float64)
+        return _interpolation_matrix(source_wavelengths.tobytes(), self.wavelengths.tobytes())
+
+    def resample(self, values, source_wavelengths):
+        """
+        Resamples spectral data onto this grid.
+
+        Parameters
+        ----------
+        values : ndarray
+                 The spectral data with the wavelengths in the last axis, e.g.
+                 a spectrum, an illuminant, (spectra x wavelengths) or
+                 (bands x wavelengths) bands responses.
+        source_wavelengths : array_like
+                             The wavelengths the spectral data is sampled at.
+        Returns
+        -------
+        output : ndarray
+                 The spectral data sampled at the grid wavelengths.
+        """
+        values = np.asarray(values)
+        matrix = self.interpolation_matrix(source_wavelengths)
+        if values.ndim == 1:
+            return matrix @ values
+        return (matrix @ values.reshape(-1, values.shape[-1]).T).T.reshape(
+            values.shape[:-1] + (len(self),))
+
+    def __len__(self):
+        return len(self.wavelengths)
+
+    def __eq__(self, other):
+        return isinstance(other, SpectralGrid) and \
+            np.array_equal(self.wavelengths, other.wavelengths)
+
+    def __hash__(self):
+        return hash(self.wavelengths.tobytes())
+
+    def __repr__(self):
+        if self.is_regular:
+            return f"SpectralGrid({self.wavelengths[0]}, {self.wavelengths[-1]}, {self.step})"
+        return f"SpectralGrid(wavelengths={self.wavelengths.tolist()})"
+
+
+def interpolation_matrix(source_wavelengths, target_wavelengths):
+    """
+    Returns the sparse (target_size x source_size) linear interpolation operator.
+    Target wavelengths outside of the source wavelengths get zero values.
+
+    Parameters
+    ----------
+    source_wavelengths : array_like
+                         The ascending wavelengths the spectral data is sampled at.
+    target_wavelengths : array_like
+                         The wavelengths to interpolate at.
+    Returns
+    -------
+    output : scipy.sparse.csr_matrix
+             The interpolation operator.
+    """
+    source = np.asarray(source_wavelengths, dtype=np.float64)
+    target = np.asarray(target_wavelengths, dtype=np.float64)
+
+    valid = (target >= source[0]) & (target <= source[-1])
+    rows = np.flatnonzero(valid)
+    target = target[valid]
+
+    if len(source) == 1:
+        return csr_matrix((np.ones(len(rows)), (rows, np.zeros(len(rows), dtype=int))),
+                          shape=(len(target_wavelengths), 1))
+
+    left = np.clip(np.searchsorted(source, target, side='right') - 1, 0, len(source) - 2)
+    weight = (target - source[left]) / (source[left + 1] - source[left])
+
+    data = np.concatenate([1 - weight, weight])
+    columns = np.concatenate([left, left + 1])
+    rows = np.concatenate([rows, rows])
+
+    matrix = csr_matrix((data, (rows, columns)), shape=(len(target_wavelengths), len(source)))
+    matrix.eliminate_zeros()
+    return matrix
+
+
+@lru_cache(maxsize=256)
+def _interpolation_matrix(source_bytes, target_bytes):
+    source = np.frombuffer(source_bytes, dtype=np.float64)
+    target = np.frombuffer(target_bytes, dtype=np.float64)
+    return interpolation_matrix(source, target)
+
+
+def resampling_error_report(spectral_data, bands_responses, grid, illuminant):
+    """
+    Compares the Sentinel-2 responses computed on a given grid
+    with the responses computed on the original (reference) grid.
+
+    Parameters
+    ----------
+    spectral_data : SpectralData (tuple) of ndarray
+                    The wavelengths and spectral_responses of interest.
+                    The spectral_responses can be a single spectrum or (spectra x wavelengths).
+    bands_responses : ndarray
+                      The (bands x wavelengths) bands responses in the same wavelengths.
+    grid : SpectralGrid
+           The grid to compare against the reference.
+    illuminant : ndarray
+                 The illuminant in the same wavelengths.
+    Returns
+    -------
+    output : ResamplingErrorReport (tuple)
+             The reference and resampled responses with their absolute and relative errors.
+    """
+    wavelengths = spectral_data.wavelengths
+
+    reference = ConversionKernel(bands_responses, illuminant) \
+        .apply(spectral_data.spectral_responses)
+
+    kernel = ConversionKernel(grid.resample(bands_responses, wavelengths),
+                              grid.resample(illuminant, wavelengths))
+    resampled = kernel.apply(grid.resample(spectral_data.spectral_responses, wavelengths))
+
+    absolute_error = np.abs(resampled - reference)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        relative_error = np.where(reference != 0, absolute_error / np.abs(reference), 0)
+
+    return ResamplingErrorReport(reference, resampled, absolute_error, relative_error,
+                                 np.max(absolute_error), np.max(relative_error))
@@ -0,0 +1,253 @@
+"""
+srf_ensemble provides the class SrfEnsemble that keeps K perturbed versions of the bands
+responses - with shifted centre wavelengths and scaled bandwidths - as a single
+(K x bands x wavelengths) tensor, and evaluates a whole spectral library against all of them
+with one matrix multiplication per chunk of spectra, to quantify how the Sentinel-2
+responses change under SRF uncertainty.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from .illuminants.registry import Illuminant
+from .illuminants.registry import get_illuminant
+
+_ENSEMBLE_CHUNK_SIZE = 4096
+
+SrfEnsembleReport = namedtuple("SrfEnsembleReport",
+                               "reference mean std minimum maximum relative_std")
+
+
+class SrfEnsemble:
+    """
+    SrfEnsemble holds K perturbed bands responses. The k-th member's band b is the original
+    response shifted by shifts[k, b] nm and stretched by scales[k, b] around its centroid c:
+    R_kb(wavelength) = R_b(c + (wavelength - c - shifts[k, b]) / scales[k, b]).
+    """
+
+    def __init__(self, wavelengths, bands_responses, shifts, scales):
+        """
+        Parameters
+        ----------
+        wavelengths : array_like
+                      The ascending wavelengths in nm.
+        bands_responses : ndarray
+                          The (K x bands x wavelengths) perturbed bands responses.
+        shifts : ndarray
+                 The (K x bands) centre wavelength shifts in nm.
+        scales : ndarray
+                 The (K x bands) bandwidth scales.
+        """
+        self.wavelengths = np.asarray(wavelengths, dtype=np.float64)
+        self.bands_responses = np.asarray(bands_responses, dtype=np.float64)
+        self.shifts = np.asarray(shifts, dtype=np.float64)
+        self.scales = np.asarray(scales, dtype=np.float64)
+
+    @classmethod
+    def from_perturbations(cls, bands_responses, wavelengths, shifts=0, scales=1):
+        """
+        Creates an ensemble from the original bands responses and the perturbations.
+
+        Parameters
+        ----------
+        bands_responses : ndarray
+                          The (bands x wavelengths) original bands responses.
+        wavelengths : array_like
+                      The ascending wavelengths in nm.
+        shifts : array_like
+                 The centre wavelength shifts in nm, (K,) for the same shift
+                 of all the bands or (K x bands). If missing, no shifts.
+        scales : array_like
+                 The bandwidth scales, (K,) or (K x bands). If missing, no scaling.
+        Returns
+        -------
+        output : SrfEnsemble
+                 The ensemble of K perturbed bands responses.
+        """
+        bands_responses = np.asarray(bands_responses, dtype=np.float64)
+        shifts, scales = _broadcast_perturbations(shifts, scales, len(bands_responses))
+
+        perturbed = perturb_bands_responses(bands_responses, wavelengths, shifts, scales)
+        return cls(wavelengths, perturbed, shifts, scales)
+
+    @classmethod
+    def from_grid(cls, bands_responses, wavelengths, shifts=(0,), scales=(1,)):
+        """
+        Creates an ensemble with all the combinations of the given shifts and scales,
+        applied to all the bands, e.g. shifts=range(-3, 4) and scales=(0.9, 1, 1.1).
+
+        Parameters
+        ----------
+        bands_responses : ndarray
+                          The (bands x wavelengths) original bands responses.
+        wavelengths : array_like
+                      The ascending wavelengths in nm.
+        shifts : array_like
+                 The centre wavelength shifts in nm. If missing, no shifts.
+        scales : array_like
+                 The bandwidth scales. If missing, no scaling.
+        Returns
+        -------
+        output : SrfEnsemble
+                 The ensemble of len(shifts) * len(scales) perturbed bands responses.
+        """
+        shifts, scales = np.meshgrid(np.asarray(shifts, dtype=np.float64),
+                                     np.asarray(scales, dtype=np.float64), indexing='ij')
+        return cls.from_perturbations(bands_responses, wavelengths,
+                                      shifts.ravel(), scales.ravel())
+
+    def __len__(self):
+        return len(self.bands_responses)
+
+    def get_weights(self, illuminant=None):
+        """
+        Returns the (K x bands x wavelengths) weights obtained by normalizing
+        each perturbed band response to unit sum and multiplying it by the illuminant.
+
+        Parameters
+        ----------
+        illuminant : ndarray or Illuminant
+                     The illuminant to apply. If missing, default to D65.
+        Returns
+        -------
+        output : ndarray
+                 The weights of all the members.
+        """
+        return _get_weights(self.bands_responses, self.wavelengths, illuminant)
+
+    def apply(self, spectral_responses, illuminant=None, chunk_size=_ENSEMBLE_CHUNK_SIZE):
+        """
+        Converts spectra to the Sentinel-2 responses of all the members.
+
+        Parameters
+        ----------
+        spectral_responses : ndarray
+                             The (spectra x wavelengths) library in the ensemble wavelengths.
+        illuminant : ndarray or Illuminant
+                     The illuminant to apply. If missing, default to D65.
+        chunk_size : int
+                     The number of spectra converted at a time. If missing, default to 4096.
+        Returns
+        -------
+        output : ndarray
+                 The (spectra x K x bands) responses.
+        """
+        return _apply_weights(self.get_weights(illuminant), spectral_responses, chunk_size)
+
+    def evaluate(self, spectral_responses, reference_responses, illuminant=None):
+        """
+        Evaluates a spectral library against all the members and returns the spread
+        of the responses of each spectrum and band.
+
+        Parameters
+        ----------
+        spectral_responses : ndarray
+                             The (spectra x wavelengths) library in the ensemble wavelengths.
+        reference_responses : ndarray
+                              The (bands x wavelengths) unperturbed bands responses.
+        illuminant : ndarray or Illuminant
+                     The illuminant to apply. If missing, default to D65.
+        Returns
+        -------
+        output : SrfEnsembleReport (tuple)
+                 The (spectra x bands) reference responses and the mean, standard deviation,
+                 minimum and maximum of the members' responses, and the (bands,) mean
+                 relative standard deviation over the spectra.
+        """
+        reference_weights = _get_weights(np.asarray(reference_responses)[None],
+                                         self.wavelengths, illuminant)
+        reference = _apply_weights(reference_weights, spectral_responses)[:, 0]
+
+        responses = self.apply(spectral_responses, illuminant)
+        std = responses.std(axis=1)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            relative_std = np.where(reference != 0, std / np.abs(reference), 0)
+
+        return SrfEnsembleReport(reference, responses.mean(axis=1), std,
+                                 responses.min(axis=1), responses.max(axis=1),
+                                 relative_std.mean(axis=0))
+
+
+def perturb_bands_responses(bands_responses, wavelengths, shifts, scales):
+    """
+    Shifts and stretches the bands responses around their centroids with
+    vectorized linear interpolation. The values outside the wavelengths are zero.
+
+    Parameters
+    ----------
+    bands_responses : ndarray
+                      The (bands x wavelengths) bands responses.
+    wavelengths : array_like
+                  The ascending wavelengths in nm.
+    shifts : ndarray
+             The (K x bands) centre wavelength shifts in nm.
+    scales : ndarray
+             The (K x bands) bandwidth scales.
+    Returns
+    -------
+    output : ndarray
+             The (K x bands x wavelengths) perturbed bands responses.
+    """
+    wavelengths = np.asarray(wavelengths, dtype=np.float64)
+    bands_responses = np.asarray(bands_responses, dtype=np.float64)
+
+    row_sum = np.sum(bands_responses, axis=1)
+    row_sum[row_sum == 0] = 1
+    centroids = np.dot(bands_responses, wavelengths) / row_sum
+
+    # The (K x bands x wavelengths) wavelengths to sample the original responses at.
+    positions = centroids[:, None] + \
+        (wavelengths - centroids[:, None] - shifts[:, :, None]) / scales[:, :, None]
+
+    left = np.clip(np.searchsorted(wavelengths, positions, side='right') - 1,
+                   0, len(wavelengths) - 2)
+    weight = (positions - wavelengths[left]) / (wavelengths[left + 1] - wavelengths[left])
+
+    responses = np.broadcast_to(bands_responses, positions.shape)
+    perturbed = (1 - weight) * np.take_along_axis(responses, left, axis=2) + \
+        weight * np.take_along_axis(responses, left + 1, axis=2)
+
+    outside = (positions < wavelengths[0]) | (positions > wavelengths[-1])
+    perturbed[outside] = 0
+    return perturbed
+
+
+def _get_weights(bands_responses, wavelengths, illuminant):
+    if illuminant is None:
+        illuminant = get_illuminant("D65")
+    if isinstance(illuminant, Illuminant):
+        illuminant = illuminant.get_values_at(wavelengths)
+
+    row_sum = np.sum(bands_responses, axis=2)
+    # Hack for solving division by zero optimally
+    row_sum[row_sum == 0] = 1
+
+    return bands_responses / row_sum[:, :, None] * np.asarray(illuminant)
+
+
+def _apply_weights(weights, spectral_responses, chunk_size=_ENSEMBLE_CHUNK_SIZE):
+    # A single (spectra x wavelengths) @ (wavelengths x K * bands) product per chunk.
+    spectral_responses = np.atleast_2d(spectral_responses)
+    members_count, bands_count, wavelengths_count = weights.shape
+    weights = weights.reshape(members_count * bands_count, wavelengths_count).T
+
+    output = np.empty((len(spectral_responses), members_count, bands_count))
+    for start in range(0, len(spectral_responses), chunk_size):
+        end = min(start + chunk_size, len(spectral_responses))
+        responses = np.dot(spectral_responses[start:end], weights)
+        output[start:end] = responses.reshape(output[start:end].shape)
+
+    return output
+
+
+def _broadcast_perturbations(shifts, scales, bands_count):
+    shifts = np.atleast_1d(np.asarray(shifts, dtype=np.float64))
+    scales = np.atleast_1d(np.asarray(scales, dtype=np.float64))
+
+    shifts = shifts[:, None] if shifts.ndim == 1 else shifts.reshape(-1, bands_count)
+    scales = scales[:, None] if scales.ndim == 1 else scales.reshape(-1, bands_count)
+
+    shape = np.broadcast_shapes(shifts.shape, scales.shape, (1, bands_count))
+    return np.broadcast_to(shifts, shape).copy(), np.broadcast_to(scales, shape).copy()
@@ -0,0 +1,88 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from numpy.testing import assert_array_almost_equal
+
+from sentinel_toolkit.colorimetry import BandAdjustment, LinearBandAdjustment, ConversionKernel
+from sentinel_toolkit.colorimetry import simulate_sensors
+from sentinel_toolkit.colorimetry.sentinel_values import SpectralData
+
+
+class TestBandAdjustment(unittest.TestCase):
+    _WAVELENGTHS = np.arange(400, 901)
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.source = np.random.default_rng(0).random((50, 3))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_fit_linear(self):
+        target = self.source * [1.1, 0.9, 1.0] + [0.01, -0.02, 0.0]
+
+        adjustment = BandAdjustment.fit(self.source, target)
+
+        assert_array_almost_equal([[0.01, 1.1], [-0.02, 0.9], [0.0, 1.0]], adjustment.coefficients)
+        assert_array_almost_equal(np.zeros(3), adjustment.rmse)
+        assert_array_almost_equal(target, adjustment.apply(self.source))
+
+    def test_fit_polynomial_with_band_indices(self):
+        target = np.stack([self.source[:, 2] ** 2, 0.5 * self.source[:, 0]], axis=1)
+
+        adjustment = BandAdjustment.fit(self.source, target, degree=2, band_indices=[2, 0])
+
+        assert_array_almost_equal([[0, 0, 1], [0, 0.5, 0]], adjustment.coefficients)
+        assert_array_almost_equal(target, adjustment.apply(self.source))
+
+    def test_apply_to_image(self):
+        adjustment = BandAdjustment([[0.1, 2.0], [0.0, 1.0], [0.0, 3.0]])
+        image = self.source.reshape(5, 10, 3)
+
+        actual = adjustment.apply(image)
+
+        self.assertEqual((5, 10, 3), actual.shape)
+        assert_array_almost_equal(image[..., 0] * 2 + 0.1, actual[..., 0])
+
+    def test_fit_cross_band(self):
+        matrix = np.array([[1.0, 0.1, 0.0], [0.0, 0.9, 0.05]])
+        target = self.source @ matrix.T + [0.01, 0.02]
+
+        adjustment = LinearBandAdjustment.fit(self.source, target)
+
+        assert_array_almost_equal(matrix, adjustment.matrix)
+        assert_array_almost_equal([0.01, 0.02], adjustment.offset)
+        assert_array_almost_equal(target, adjustment.apply(self.source))
+
+    def test_csv_round_trip(self):
+        filename = Path(self.temp_dir, "coefficients.csv")
+
+        adjustment = BandAdjustment([[0.1, 2.0], [0.0, 1.0]], [1, 0], ["B2", "B3"])
+        adjustment.to_csv(filename)
+        actual = BandAdjustment.from_csv(filename)
+        self.assertEqual(["B2", "B3"], actual.band_names)
+        assert_array_almost_equal(adjustment.apply(self.source), actual.apply(self.source))
+
+        linear_adjustment = LinearBandAdjustment(np.eye(3)[:2], [0.1, 0.2])
+        linear_adjustment.to_csv(filename)
+        actual = LinearBandAdjustment.from_csv(filename)
+        assert_array_almost_equal(linear_adjustment.apply(self.source), actual.apply(self.source))
+
+    def test_simulate_sensors(self):
+        first = np.array([np.exp(-((self._WAVELENGTHS - c) / 15.0) ** 2) for c in [500, 600]])
+        second = np.array([np.exp(-((self._WAVELENGTHS - c) / 20.0) ** 2) for c in [505, 605, 800]])
+        library = np.random.default_rng(1).random((10, len(self._WAVELENGTHS)))
+        illuminant = np.ones(len(self._WAVELENGTHS))
+
+        first_responses, second_responses = simulate_sensors(
+            SpectralData(self._WAVELENGTHS, library), [first, second], illuminant)
+
+        assert_array_almost_equal(ConversionKernel(first, illuminant).apply(library), first_responses)
+        assert_array_almost_equal(ConversionKernel(second, illuminant).apply(library), second_responses)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+
+import numpy as np
+from colour import SDS_ILLUMINANTS, SpectralShape
+from numpy.testing import assert_array_equal, assert_array_almost_equal
+
+from sentinel_toolkit.colorimetry import SpectralGrid, get_illuminant, sd_to_sentinel_direct_numpy
+from sentinel_toolkit.colorimetry.illuminants import D65_300_830_1NM_VALUES
+from sentinel_toolkit.colorimetry.illuminants import D65_360_830_1NM_VALUES
+from sentinel_toolkit.colorimetry.illuminants import Illuminant, IlluminantRegistry
+from sentinel_toolkit.colorimetry.sentinel_values import SpectralData
+
+
+class TestIlluminants(unittest.TestCase):
+
+    def test_d65(self):
+        illuminant = get_illuminant("D65")
+        self.assertEqual((300, 830), illuminant.wavelength_range)
+        assert_array_equal(D65_360_830_1NM_VALUES[438 - 360: 443 - 359], illuminant.get_values((438, 443)))
+        assert_array_equal(D65_300_830_1NM_VALUES, illuminant.get_values((300, 830)))
+
+    def test_d65_matches_the_cie_5nm_table(self):
+        cie_d65 = SDS_ILLUMINANTS["D65"]
+        wavelengths = np.arange(300, 781, 5)
+        assert_array_almost_equal(cie_d65[wavelengths], get_illuminant("D65").resample(
+            SpectralGrid(wavelengths=wavelengths)), decimal=4)
+        self.assertEqual(60.3125, D65_360_830_1NM_VALUES[-1])
+
+    def test_get_values_is_a_read_only_view(self):
+        values = get_illuminant("D65").get_values((400, 410))
+        self.assertEqual(11, len(values))
+        self.assertFalse(values.flags.writeable)
+
+    def test_get_values_out_of_range(self):
+        with self.assertRaises(ValueError):
+            get_illuminant("D65").get_values((290, 400))
+
+    def test_extended_range_illuminants(self):
+        for name in ["A", "BB5778"]:
+            illuminant = get_illuminant(name)
+            self.assertEqual((300, 2500), illuminant.wavelength_range)
+            self.assertAlmostEqual(100, illuminant.get_values((560, 560))[0])
+
+    def test_blackbody_is_not_registered_as_solar(self):
+        with self.assertRaises(KeyError):
+            get_illuminant("SOLAR")
+
+    def test_colour_illuminants(self):
+        for name in ["D50", "FL2", "FL12"]:
+            illuminant = get_illuminant(name)
+            self.assertEqual(780, illuminant.wavelength_range[1])
+
+    def test_resample_is_cached(self):
+        illuminant = get_illuminant("A")
+        grid = SpectralGrid(400, 2400, 10)
+        values = illuminant.resample(grid)
+
+        self.assertEqual(len(grid), len(values))
+        self.assertIs(values, illuminant.resample(SpectralGrid(400, 2400, 10)))
+        assert_array_almost_equal(illuminant.get_values((400, 2400))[::10], values)
+
+    def test_to_distribution_is_cached(self):
+        illuminant = get_illuminant("D65")
+        distribution = illuminant.to_distribution(SpectralShape(438, 443, 1))
+
+        assert_array_equal(illuminant.get_values((438, 443)), distribution.values)
+        self.assertIs(distribution, illuminant.to_distribution(SpectralShape(438, 443, 1)))
+
+    def test_user_supplied_illuminant(self):
+        registry = IlluminantRegistry()
+        registry.register(Illuminant("FLAT", [400, 410, 420], [1, 2, 3]))
+
+        illuminant = registry.get("FLAT")
+        self.assertEqual(["FLAT"], registry.names())
+        assert_array_almost_equal([1.5, 2, 2.5], illuminant.get_values((405, 415))[::5])
+
+    def test_sd_to_sentinel_direct_numpy_with_illuminant(self):
+        wavelengths = np.arange(2000, 2011)
+        spectral_data = SpectralData(wavelengths, np.full(11, 0.5))
+        bands_responses = np.ones((1, 11))
+
+        actual = sd_to_sentinel_direct_numpy(spectral_data, bands_responses, get_illuminant("BB5778"))
+        expected = 0.5 * np.mean(get_illuminant("BB5778").get_values((2000, 2010)))
+        assert_array_almost_equal([expected], actual)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import unittest
+
+import numpy as np
+from numpy.testing import assert_array_almost_equal
+
+from sentinel_toolkit.colorimetry import ConversionKernel, InverseModel
+
+
+class TestInverseModel(unittest.TestCase):
+    _WAVELENGTHS = np.arange(400, 901)
+    _CENTERS = [450, 500, 550, 600, 650, 700, 750, 800, 850]
+
+    def setUp(self):
+        bands_responses = np.array([np.exp(-((self._WAVELENGTHS - center) / 15.0) ** 2)
+                                    for center in self._CENTERS])
+        self.kernel = ConversionKernel(bands_responses, np.ones(len(self._WAVELENGTHS)))
+
+        rng = np.random.default_rng(0)
+        x = (self._WAVELENGTHS - 400) / 500.0
+        basis = np.array([np.ones_like(x), x, np.sin(3 * x)]).T
+        self.library = 0.3 + rng.random((50, 3)) * 0.1 @ basis.T
+
+    def test_invert_library_spectra(self):
+        model = InverseModel.from_spectra(self.kernel, self.library, components=3,
+                                          regularization=1e-12)
+
+        actual = model.invert(self.kernel.apply(self.library[:5]))
+
+        assert_array_almost_equal(self.library[:5], actual, decimal=6)
+
+    def test_invert_without_basis_reproduces_responses(self):
+        model = InverseModel(self.kernel, regularization=1e-12)
+        responses = self.kernel.apply(self.library[:5])
+
+        assert_array_almost_equal(responses, self.kernel.apply(model.invert(responses)))
+
+    def test_invert_image_in_chunks(self):
+        model = InverseModel.from_spectra(self.kernel, self.library)
+        image = self.kernel.apply(self.library[:12]).reshape(3, 4, -1)
+
+        actual = model.invert(image, chunk_size=5)
+
+        self.assertEqual((3, 4, len(self._WAVELENGTHS)), actual.shape)
+        assert_array_almost_equal(model.invert(image.reshape(12, -1)), actual.reshape(12, -1))
+
+    def test_invert_into_output_array(self):
+        model = InverseModel.from_spectra(self.kernel, self.library)
+        responses = self.kernel.apply(self.library[:3])
+        out = np.empty((3, len(self._WAVELENGTHS)))
+
+        self.assertIs(out, model.invert(responses, out=out))
+        with self.assertRaises(ValueError):
+            model.invert(responses, out=np.empty((2, len(self._WAVELENGTHS))))
+
+    def test_invert_float32(self):
+        model = InverseModel.from_spectra(self.kernel, self.library, components=3)
+        responses = self.kernel.apply(self.library[:3])
+
+        actual = model.invert(responses.astype(np.float32))
+
+        self.assertEqual(np.float32, actual.dtype)
+        assert_array_almost_equal(model.invert(responses), actual, decimal=4)
+
+    def test_invert_wrong_bands_count(self):
+        model = InverseModel(self.kernel)
+        with self.assertRaises(ValueError):
+            model.invert(np.ones(3))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,196 @@
+import gc
+import os
+import tracemalloc
+import unittest
+import weakref
+from unittest.mock import MagicMock
+
+import numpy as np
+from numpy.testing import assert_array_equal, assert_array_almost_equal
+
+from sentinel_toolkit.colorimetry import ConversionKernel, ConversionKernelCache, SparseConversionKernel
+from sentinel_toolkit.colorimetry import SpectralGrid
+from sentinel_toolkit.colorimetry.kernel import get_float32_error_bound
+from sentinel_toolkit.srf import S2Srf
+from sentinel_toolkit.srf import S2SrfOptions
+from sentinel_toolkit.srf import SensorSrf
+
+
+class TestConversionKernel(unittest.TestCase):
+    _SRF_FILENAME = os.path.join(os.path.dirname(__file__), "..", "..", "srf", "tests", "test_data", "s2a_srf.xlsx")
+    _WAVELENGTH_RANGE = (438, 443)
+
+    _SPECTRAL_RESPONSES = np.array([0.104, 0.1042, 0.1043, 0.1044, 0.1045, 0.1046])
+
+    _BANDS_RESPONSES = np.array([
+        [0.810893815261278, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0.824198756004815, 0.010315428586995, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0.854158107215052, 0.0300419331664615, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0.870790876711332, 0.0268758905675229, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0.887310969404313, 0.0241431503861076, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0],
+        [0.926199242291321, 0.0202100642531871, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+    ]).T
+
+    _EXPECTED_SENTINEL_RESPONSE = [10.985433231270072, 11.086160373966965, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
+
+    def setUp(self):
+        self.s2_srf = MagicMock()
+        self.s2_srf.get_bands_responses.return_value = self._BANDS_RESPONSES
+        self.s2_srf.get_wavelengths.return_value = np.arange(438, 444)
+
+    def test_apply(self):
+        kernel = ConversionKernel.from_s2_srf(self.s2_srf, S2SrfOptions(wavelength_range=self._WAVELENGTH_RANGE))
+        assert_array_equal(self._EXPECTED_SENTINEL_RESPONSE, kernel.apply(self._SPECTRAL_RESPONSES))
+
+    def test_apply_many_spectra(self):
+        kernel = ConversionKernel.from_s2_srf(self.s2_srf, S2SrfOptions(wavelength_range=self._WAVELENGTH_RANGE))
+        actual = kernel.apply(np.array([self._SPECTRAL_RESPONSES, 2 * self._SPECTRAL_RESPONSES]))
+        self.assertEqual((2, 13), actual.shape)
+        assert_array_almost_equal(self._EXPECTED_SENTINEL_RESPONSE, actual[0])
+
+    def test_weights_are_read_only(self):
+        kernel = ConversionKernel(self._BANDS_RESPONSES, np.ones(6))
+        with self.assertRaises(ValueError):
+            kernel.weights[0, 0] = 1
+
+    def test_sparse_windows(self):
+        kernel = SparseConversionKernel(self._BANDS_RESPONSES, np.ones(6))
+        self.assertEqual([(0, 6), (1, 6)] + [(0, 0)] * 11, [(start, stop) for start, stop, _ in kernel.windows])
+
+    def test_sparse_does_not_build_dense_weights(self):
+        wavelengths = np.arange(300, 100000)
+        bands_responses = np.array([np.where(np.abs(wavelengths - center) <= 20, 0.5, 0.0)
+                                    for center in [443, 490, 560, 665, 842, 1610, 2190]])
+        spectral_responses = np.ones(len(wavelengths))
+
+        tracemalloc.start()
+        try:
+            kernel = SparseConversionKernel(bands_responses, np.ones(len(wavelengths)))
+            actual = kernel.apply(spectral_responses)
+            windows = kernel.windows
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        self.assertLess(peak, bands_responses.nbytes / 4)
+        self.assertEqual({}, kernel._typed_weights)
+        assert_array_almost_equal(np.ones(7), actual)
+        self.assertEqual([(123, 164), (170, 211)], [(start, stop) for start, stop, _ in windows[:2]])
+
+    def test_sparse_apply(self):
+        kernel = ConversionKernel.from_s2_srf(self.s2_srf, S2SrfOptions(wavelength_range=self._WAVELENGTH_RANGE))
+        sparse_kernel = kernel.to_sparse()
+        self.assertIsInstance(sparse_kernel, SparseConversionKernel)
+
+        assert_array_almost_equal(self._EXPECTED_SENTINEL_RESPONSE, sparse_kernel.apply(self._SPECTRAL_RESPONSES))
+
+        library = np.random.default_rng(0).random((5, 6))
+        assert_array_almost_equal(kernel.apply(library), sparse_kernel.apply(library))
+
+    def test_sparse_weights(self):
+        rng = np.random.default_rng(0)
+        bands_responses = rng.random((13, 200)) * (rng.random((13, 200)) > 0.8)
+        bands_responses[3] = 0
+        bands_responses[4, -1] = 1
+        illuminant = rng.random(200) + 1
+
+        kernel = ConversionKernel(bands_responses, illuminant)
+        sparse_kernel = SparseConversionKernel(bands_responses, illuminant)
+
+        assert_array_almost_equal(kernel.weights, sparse_kernel.weights)
+        assert_array_almost_equal(kernel.weights, kernel.to_sparse().weights)
+        library = rng.random((5, 200))
+        assert_array_almost_equal(kernel.apply(library), sparse_kernel.apply(library))
+        assert_array_almost_equal(kernel.apply(library[0]), sparse_kernel.apply(library[0]))
+
+    def test_float32(self):
+        rng = np.random.default_rng(0)
+        bands_responses = rng.random((13, 2301)) * (rng.random((13, 2301)) > 0.9)
+        library = rng.random((50, 2301))
+        kernel = ConversionKernel(bands_responses, rng.random(2301) * 100 + 50)
+
+        for current_kernel in [kernel, kernel.to_sparse()]:
+            expected = current_kernel.apply(library)
+            actual = current_kernel.apply(library.astype(np.float32))
+
+            self.assertEqual(np.float32, actual.dtype)
+            self.assertIs(current_kernel.get_weights(np.float32), current_kernel.get_weights(np.float32))
+            relative_error = np.max(np.abs(actual - expected) / expected)
+            self.assertLess(relative_error, get_float32_error_bound(2301))
+
+    def test_float32_bands_responses(self):
+        bands_responses = self._BANDS_RESPONSES.astype(np.float32)
+
+        for kernel in [ConversionKernel(bands_responses, np.ones(6)),
+                       SparseConversionKernel(bands_responses, np.ones(6))]:
+            self.assertEqual(np.float32, kernel.weights.dtype)
+            self.assertIs(kernel.weights, kernel.get_weights(np.float32))
+            expected = ConversionKernel(self._BANDS_RESPONSES, np.ones(6)).apply(self._SPECTRAL_RESPONSES)
+            assert_array_almost_equal(expected, kernel.apply(self._SPECTRAL_RESPONSES.astype(np.float32)))
+
+    def test_cache_reuses_kernels(self):
+        cache = ConversionKernelCache()
+        options = S2SrfOptions(wavelength_range=self._WAVELENGTH_RANGE)
+
+        kernel = cache.get(self.s2_srf, options)
+        self.assertIs(kernel, cache.get(self.s2_srf, S2SrfOptions(wavelength_range=self._WAVELENGTH_RANGE)))
+        self.s2_srf.get_bands_responses.assert_called_once()
+
+        self.assertIsNot(kernel, cache.get(self.s2_srf, options, illuminant=np.ones(6)))
+
+    def test_from_s2_srf_on_grid(self):
+        grid = SpectralGrid(438, 443, 2.5)
+        options = S2SrfOptions(wavelength_range=self._WAVELENGTH_RANGE)
+
+        kernel = ConversionKernel.from_s2_srf(self.s2_srf, options, np.ones(3), grid)
+
+        expected = ConversionKernel(grid.resample(self._BANDS_RESPONSES, np.arange(438, 444)), np.ones(3))
+        assert_array_almost_equal(expected.weights, kernel.weights)
+        self.assertIsNot(kernel, ConversionKernelCache().get(self.s2_srf, options, grid=grid))
+
+    def test_from_s2_srf_narrower_than_the_range(self):
+        wavelengths = np.arange(430, 2301)
+        responses = (np.abs(wavelengths - 560) <= 20).astype(np.float64)[:, None]
+        sensor_srf = SensorSrf("narrow", wavelengths, ["green"], responses)
+        grid = SpectralGrid(360, 830, 10)
+
+        kernel = ConversionKernel.from_s2_srf(sensor_srf)
+        grid_kernel = ConversionKernel.from_s2_srf(sensor_srf, grid=grid)
+
+        self.assertEqual((1, 401), kernel.weights.shape)
+        self.assertEqual((1, len(grid)), grid_kernel.weights.shape)
+        self.assertAlmostEqual(1, grid_kernel.apply(np.ones(len(grid)))[0] / kernel.apply(np.ones(401))[0],
+                               places=2)
+
+    def test_from_s2_srf_workbook_with_default_options(self):
+        s2_srf = S2Srf(self._SRF_FILENAME, cache_dir=False)
+
+        kernel = ConversionKernel.from_s2_srf(s2_srf)
+        grid_kernel = ConversionKernel.from_s2_srf(s2_srf, grid=SpectralGrid(360, 830, 10))
+
+        self.assertEqual((13, 6), kernel.weights.shape)
+        self.assertEqual((13, 48), grid_kernel.weights.shape)
+
+    def test_cache_is_bounded(self):
+        cache = ConversionKernelCache(maxsize=1)
+        first = cache.get(self.s2_srf, S2SrfOptions(satellite='A', wavelength_range=self._WAVELENGTH_RANGE))
+        cache.get(self.s2_srf, S2SrfOptions(satellite='B', wavelength_range=self._WAVELENGTH_RANGE))
+
+        self.assertEqual(1, len(cache))
+        self.assertIsNot(first, cache.get(self.s2_srf, S2SrfOptions(satellite='A',
+                                                                    wavelength_range=self._WAVELENGTH_RANGE)))
+
+    def test_cache_does_not_keep_srf_alive(self):
+        cache = ConversionKernelCache()
+        kernel = cache.get(self.s2_srf, S2SrfOptions(wavelength_range=self._WAVELENGTH_RANGE))
+        s2_srf = weakref.ref(self.s2_srf)
+
+        self.s2_srf = None
+        gc.collect()
+
+        self.assertIsNone(s2_srf())
+        assert_array_almost_equal(self._EXPECTED_SENTINEL_RESPONSE, kernel.apply(self._SPECTRAL_RESPONSES))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+
+import numpy as np
+from colour import SpectralDistribution, SpectralShape
+from colour.algebra import CubicSplineInterpolator, SpragueInterpolator
+from numpy.testing import assert_array_almost_equal, assert_array_equal
+
+from sentinel_toolkit.colorimetry import SpectralBatch, SpectralGrid, resample_batch
+from sentinel_toolkit.colorimetry.sentinel_values import SpectralData
+
+
+class TestResampling(unittest.TestCase):
+    _UNIFORM_WAVELENGTHS = np.arange(400, 700, 5.0)
+    _GRID = SpectralGrid(360, 830, 1)
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.uniform_responses = rng.random((2, len(self._UNIFORM_WAVELENGTHS)))
+        self.irregular_wavelengths = np.sort(rng.uniform(380, 720, 40))
+        self.irregular_responses = rng.random(40)
+
+        self.batch = SpectralBatch.from_spectral_data([
+            SpectralData(self._UNIFORM_WAVELENGTHS, self.uniform_responses[0]),
+            SpectralData(self.irregular_wavelengths[::-1], self.irregular_responses[::-1]),
+            SpectralData(self._UNIFORM_WAVELENGTHS, self.uniform_responses[1])
+        ])
+
+    def test_linear(self):
+        spectral_data, mask = resample_batch(self.batch, self._GRID)
+
+        assert_array_equal(self._GRID.wavelengths, spectral_data.wavelengths)
+        self.assertEqual((3, len(self._GRID)), spectral_data.spectral_responses.shape)
+
+        wavelengths = self._GRID.wavelengths[mask[1]]
+        expected = np.interp(wavelengths, self.irregular_wavelengths, self.irregular_responses)
+        assert_array_almost_equal(expected, spectral_data.spectral_responses[1][mask[1]])
+        self.assertTrue(np.all(spectral_data.spectral_responses[~mask] == 0))
+
+    def test_mask(self):
+        _, mask = resample_batch(self.batch, self._GRID)
+
+        wavelengths = self._GRID.wavelengths
+        assert_array_equal((wavelengths >= 400) & (wavelengths <= 695), mask[0])
+
+    def test_sprague_matches_colour(self):
+        batch = self.batch.take([0, 2])
+        spectral_data, mask = resample_batch(batch, self._GRID, "sprague")
+
+        for i in range(2):
+            wavelengths = self._GRID.wavelengths[mask[i]]
+            interpolator = SpragueInterpolator(self._UNIFORM_WAVELENGTHS, self.uniform_responses[i])
+            assert_array_almost_equal(interpolator(wavelengths), spectral_data.spectral_responses[i][mask[i]])
+
+    def test_colour_method_matches_spectral_distribution(self):
+        spectral_data, mask = resample_batch(self.batch, self._GRID, "colour")
+
+        spectral_distribution = SpectralDistribution(self.uniform_responses[0], self._UNIFORM_WAVELENGTHS)
+        spectral_distribution.interpolate(SpectralShape(400, 695, 1))
+        assert_array_almost_equal(spectral_distribution.values, spectral_data.spectral_responses[0][mask[0]])
+
+        wavelengths = self._GRID.wavelengths[mask[1]]
+        interpolator = CubicSplineInterpolator(self.irregular_wavelengths, self.irregular_responses)
+        assert_array_almost_equal(interpolator(wavelengths), spectral_data.spectral_responses[1][mask[1]])
+
+    def test_sprague_requires_uniform_wavelengths(self):
+        with self.assertRaises(ValueError):
+            resample_batch(self.batch, self._GRID, "sprague")
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            resample_batch(self.batch, self._GRID, "nearest")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,13 +1,18 @@
 import unittest
+from unittest.mock import MagicMock
 
 import numpy as np
 from colour import SpectralDistribution
 
 from sentinel_toolkit.colorimetry import sd_to_sentinel_direct_colour, sd_to_sentinel_direct_numpy
+from sentinel_toolkit.colorimetry import sd_to_sentinel_batch_numpy, sd_to_sentinel_numpy
+from sentinel_toolkit.colorimetry import SpectralGrid, get_illuminant
 
 from numpy.testing import assert_array_equal
+from numpy.testing import assert_array_almost_equal
 
 from sentinel_toolkit.colorimetry.sentinel_values import SpectralData
+from sentinel_toolkit.srf import S2SrfOptions
 
 
 class TestSentinelValues(unittest.TestCase):
@@ -40,12 +45,103 @@ class TestSentinelValues(unittest.TestCase):
         actual = sd_to_sentinel_direct_colour(self._SPECTRAL_DISTRIBUTION, self._BANDS_RESPONSES)
         assert_array_equal(self._EXPECTED_SENTINEL_RESPONSE, actual)
 
+    def test_sd_to_sentinel_direct_colour_float32(self):
+        actual = sd_to_sentinel_direct_colour(self._SPECTRAL_DISTRIBUTION, self._BANDS_RESPONSES,
+                                              dtype=np.float32)
+
+        self.assertEqual(np.float32, actual.dtype)
+        assert_array_almost_equal(self._EXPECTED_SENTINEL_RESPONSE, actual, decimal=4)
+
+    def test_sd_to_sentinel_direct_colour_default_illuminant_is_cached(self):
+        illuminant = get_illuminant("D65").to_distribution(self._SPECTRAL_DISTRIBUTION.shape)
+
+        sd_to_sentinel_direct_colour(self._SPECTRAL_DISTRIBUTION, self._BANDS_RESPONSES)
+
+        self.assertIs(illuminant,
+                      get_illuminant("D65").to_distribution(self._SPECTRAL_DISTRIBUTION.shape))
+
     def test_sd_to_sentinel_direct_numpy(self):
         spectral_data = SpectralData(self._SPECTRAL_DISTRIBUTION.wavelengths,
                                      self._SPECTRAL_DISTRIBUTION.values)
         actual = sd_to_sentinel_direct_numpy(spectral_data, self._BANDS_RESPONSES)
         assert_array_equal(self._EXPECTED_SENTINEL_RESPONSE, actual)
 
+    def test_sd_to_sentinel_direct_numpy_sparse(self):
+        spectral_data = SpectralData(self._SPECTRAL_DISTRIBUTION.wavelengths,
+                                     self._SPECTRAL_DISTRIBUTION.values)
+        actual = sd_to_sentinel_direct_numpy(spectral_data, self._BANDS_RESPONSES, sparse=True)
+        assert_array_almost_equal(self._EXPECTED_SENTINEL_RESPONSE, actual)
+
+    def test_sd_to_sentinel_numpy(self):
+        s2_srf = MagicMock()
+        s2_srf.get_bands_responses.return_value = self._BANDS_RESPONSES
+        s2_srf.get_wavelengths.return_value = np.arange(438, 444)
+        spectral_data = SpectralData(self._SPECTRAL_DISTRIBUTION.wavelengths,
+                                     self._SPECTRAL_DISTRIBUTION.values)
+
+        actual = sd_to_sentinel_numpy(spectral_data, s2_srf, S2SrfOptions(wavelength_range=(438, 443)))
+
+        assert_array_almost_equal(self._EXPECTED_SENTINEL_RESPONSE, actual)
+
+    def test_sd_to_sentinel_numpy_takes_the_illuminant_at_the_spectral_wavelengths(self):
+        s2_srf = MagicMock()
+        s2_srf.get_bands_responses.return_value = self._BANDS_RESPONSES
+        s2_srf.get_wavelengths.return_value = np.arange(438, 444)
+        spectral_data = SpectralData(self._SPECTRAL_DISTRIBUTION.wavelengths,
+                                     self._SPECTRAL_DISTRIBUTION.values)
+
+        actual = sd_to_sentinel_numpy(spectral_data, s2_srf, S2SrfOptions(wavelength_range=(437, 442)))
+
+        assert_array_almost_equal(self._EXPECTED_SENTINEL_RESPONSE, actual)
+
+    def test_sd_to_sentinel_numpy_on_grid(self):
+        s2_srf = MagicMock()
+        s2_srf.get_bands_responses.return_value = self._BANDS_RESPONSES
+        s2_srf.get_wavelengths.return_value = np.arange(438, 444)
+        grid = SpectralGrid(438, 443, 2.5)
+        spectral_data = SpectralData(grid.wavelengths, grid.resample(self._SPECTRAL_DISTRIBUTION.values,
+                                                                     self._SPECTRAL_DISTRIBUTION.wavelengths))
+
+        actual = sd_to_sentinel_numpy(spectral_data, s2_srf, S2SrfOptions(wavelength_range=(438, 443)), grid=grid)
+
+        assert_array_almost_equal(self._EXPECTED_SENTINEL_RESPONSE, actual, decimal=1)
+
+    def test_sd_to_sentinel_batch_numpy(self):
+        wavelengths = self._SPECTRAL_DISTRIBUTION.wavelengths
+        values = self._SPECTRAL_DISTRIBUTION.values
+        spectral_data = SpectralData(wavelengths, np.array([values, values * 2, values / 2]))
+
+        actual = sd_to_sentinel_batch_numpy(spectral_data, self._BANDS_RESPONSES, chunk_size=2)
+
+        self.assertEqual((3, 13), actual.shape)
+        assert_array_almost_equal(self._EXPECTED_SENTINEL_RESPONSE, actual[0])
+        assert_array_almost_equal(np.multiply(self._EXPECTED_SENTINEL_RESPONSE, 2), actual[1])
+        assert_array_almost_equal(np.divide(self._EXPECTED_SENTINEL_RESPONSE, 2), actual[2])
+
+    def test_sd_to_sentinel_batch_numpy_float32(self):
+        wavelengths = self._SPECTRAL_DISTRIBUTION.wavelengths
+        values = self._SPECTRAL_DISTRIBUTION.values.astype(np.float32)
+        spectral_data = SpectralData(wavelengths, np.array([values, values]))
+
+        actual = sd_to_sentinel_batch_numpy(spectral_data, self._BANDS_RESPONSES.astype(np.float32))
+
+        self.assertEqual(np.float32, actual.dtype)
+        assert_array_almost_equal(self._EXPECTED_SENTINEL_RESPONSE, actual[0], decimal=4)
+
+    def test_sd_to_sentinel_batch_numpy_with_mask(self):
+        wavelengths = self._SPECTRAL_DISTRIBUTION.wavelengths
+        values = self._SPECTRAL_DISTRIBUTION.values
+        spectral_data = SpectralData(wavelengths, np.array([values, values]))
+        mask = np.ones((2, 6), dtype=bool)
+        mask[1, 4:] = False
+
+        actual = sd_to_sentinel_batch_numpy(spectral_data, self._BANDS_RESPONSES, mask=mask)
+
+        expected = sd_to_sentinel_direct_numpy(SpectralData(wavelengths[:4], values[:4]),
+                                               self._BANDS_RESPONSES[:, :4])
+        assert_array_almost_equal(self._EXPECTED_SENTINEL_RESPONSE, actual[0])
+        assert_array_almost_equal(expected, actual[1])
+
 
 if __name__ == '__main__':
     unittest.main()
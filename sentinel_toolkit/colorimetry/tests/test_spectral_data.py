@@ -0,0 +1,77 @@
+import unittest
+
+import numpy as np
+from numpy.testing import assert_array_equal, assert_array_almost_equal
+
+from sentinel_toolkit.colorimetry import SpectralBatch, SpectralData
+from sentinel_toolkit.colorimetry import sd_to_sentinel_batch_numpy, sd_to_sentinel_direct_numpy
+
+
+class TestSpectralBatch(unittest.TestCase):
+    _SPECTRAL_DATA = [
+        SpectralData(np.array([438, 439, 440]), np.array([0.1, 0.2, 0.3])),
+        SpectralData(np.array([439, 440, 441, 442]), np.array([0.4, 0.5, 0.6, 0.7])),
+        SpectralData(np.array([440]), np.array([0.8]))
+    ]
+    _SPECTRUM_IDS = [10, 20, 30]
+
+    def setUp(self):
+        self.batch = SpectralBatch.from_spectral_data(self._SPECTRAL_DATA, self._SPECTRUM_IDS)
+
+    def test_from_spectral_data(self):
+        self.assertEqual(3, len(self.batch))
+        assert_array_equal([0, 3, 7, 8], self.batch.offsets)
+        assert_array_equal([3, 4, 1], self.batch.get_lengths())
+        self.assertFalse(hasattr(self.batch, '__dict__'))
+
+    def test_getitem(self):
+        wavelengths, spectral_responses = self.batch[1]
+        assert_array_equal(self._SPECTRAL_DATA[1].wavelengths, wavelengths)
+        assert_array_equal(self._SPECTRAL_DATA[1].spectral_responses, spectral_responses)
+        assert_array_equal(self._SPECTRAL_DATA[2].wavelengths, self.batch[-1].wavelengths)
+
+    def test_slice(self):
+        batch = self.batch[1:]
+        assert_array_equal([20, 30], batch.spectrum_ids)
+        assert_array_equal([0, 4, 5], batch.offsets)
+        assert_array_equal(self._SPECTRAL_DATA[2].spectral_responses, batch[1].spectral_responses)
+
+    def test_get_and_select(self):
+        assert_array_equal(self._SPECTRAL_DATA[2].spectral_responses, self.batch.get(30).spectral_responses)
+
+        batch = self.batch.select([30, 10])
+        assert_array_equal([30, 10], batch.spectrum_ids)
+        assert_array_equal([0.8, 0.1, 0.2, 0.3], batch.spectral_responses)
+
+    def test_to_dense(self):
+        spectral_data, mask = self.batch.to_dense()
+
+        assert_array_equal([438, 439, 440, 441, 442], spectral_data.wavelengths)
+        assert_array_equal([[0.1, 0.2, 0.3, 0, 0],
+                            [0, 0.4, 0.5, 0.6, 0.7],
+                            [0, 0, 0.8, 0, 0]], spectral_data.spectral_responses)
+        assert_array_equal(spectral_data.spectral_responses != 0, mask)
+
+    def test_to_dense_with_wavelengths(self):
+        spectral_data, mask = self.batch.to_dense([439, 440], fill_value=np.nan)
+        assert_array_equal([[0.2, 0.3], [0.4, 0.5], [np.nan, 0.8]], spectral_data.spectral_responses)
+        assert_array_equal([[True, True], [True, True], [False, True]], mask)
+
+    def test_to_masked(self):
+        masked = self.batch.to_masked()
+        assert_array_equal([3, 4, 1], masked.count(axis=1))
+        self.assertAlmostEqual(0.8, masked[2].sum())
+
+    def test_sd_to_sentinel_batch_numpy(self):
+        bands_responses = np.array([[0.2, 1.0, 0.6, 0.1, 0.0],
+                                    [0.0, 0.1, 0.5, 1.0, 0.3]])
+        illuminant = np.array([1.0, 1.1, 1.2, 1.3, 1.4])
+
+        actual = sd_to_sentinel_batch_numpy(self.batch, bands_responses, illuminant)
+
+        expected = sd_to_sentinel_direct_numpy(self._SPECTRAL_DATA[1], bands_responses[:, 1:], illuminant[1:])
+        assert_array_almost_equal(expected, actual[1])
+
+
+if __name__ == '__main__':
+    unittest.main()
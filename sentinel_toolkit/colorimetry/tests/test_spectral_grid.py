@@ -0,0 +1,65 @@
+import unittest
+
+import numpy as np
+from numpy.testing import assert_array_equal, assert_array_almost_equal
+
+from sentinel_toolkit.colorimetry import SpectralGrid, interpolation_matrix, resampling_error_report
+from sentinel_toolkit.colorimetry.illuminants import D65_360_830_1NM_VALUES
+from sentinel_toolkit.colorimetry.sentinel_values import SpectralData
+
+
+class TestSpectralGrid(unittest.TestCase):
+
+    def test_regular_grid(self):
+        grid = SpectralGrid(400, 450, 10)
+        assert_array_equal([400, 410, 420, 430, 440, 450], grid.wavelengths)
+        self.assertTrue(grid.is_regular)
+        self.assertEqual(SpectralGrid(wavelengths=[400, 410, 420, 430, 440, 450]), grid)
+
+    def test_irregular_grid(self):
+        grid = SpectralGrid(wavelengths=[400, 405, 420])
+        self.assertFalse(grid.is_regular)
+        self.assertEqual(3, len(grid))
+
+    def test_interpolation_matrix(self):
+        matrix = interpolation_matrix([400, 410, 420], [395, 400, 405, 420, 425])
+        expected = [[0, 0, 0],
+                    [1, 0, 0],
+                    [0.5, 0.5, 0],
+                    [0, 0, 1],
+                    [0, 0, 0]]
+        assert_array_almost_equal(expected, matrix.toarray())
+
+    def test_interpolation_matrix_is_cached(self):
+        grid = SpectralGrid(400, 420, 5)
+        self.assertIs(grid.interpolation_matrix(np.arange(400, 421)),
+                      grid.interpolation_matrix(np.arange(400, 421)))
+
+    def test_resample(self):
+        grid = SpectralGrid(400, 420, 5)
+        source_wavelengths = np.arange(400, 421)
+        values = np.array([source_wavelengths * 2.0, source_wavelengths * 3.0])
+
+        assert_array_almost_equal(grid.wavelengths * 2, grid.resample(values[0], source_wavelengths))
+        assert_array_almost_equal([grid.wavelengths * 2, grid.wavelengths * 3],
+                                  grid.resample(values, source_wavelengths))
+
+    def test_resampling_error_report(self):
+        wavelengths = np.arange(400, 501)
+        bands_responses = np.array([np.exp(-((wavelengths - 450) / 15) ** 2),
+                                    np.exp(-((wavelengths - 480) / 10) ** 2)])
+        spectral_responses = np.array([0.2 + wavelengths / 1000, 0.5 - wavelengths / 2000])
+        illuminant = D65_360_830_1NM_VALUES[400 - 360: 500 - 359]
+
+        report = resampling_error_report(SpectralData(wavelengths, spectral_responses),
+                                         bands_responses,
+                                         SpectralGrid(400, 500, 5),
+                                         illuminant)
+
+        self.assertEqual((2, 2), report.reference.shape)
+        assert_array_almost_equal(report.reference, report.resampled, decimal=1)
+        self.assertLess(report.max_relative_error, 0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
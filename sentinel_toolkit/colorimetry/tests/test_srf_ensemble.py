@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+from numpy.testing import assert_array_almost_equal
+
+from sentinel_toolkit.colorimetry import ConversionKernel, SrfEnsemble, perturb_bands_responses
+
+
+class TestSrfEnsemble(unittest.TestCase):
+    _WAVELENGTHS = np.arange(400, 901)
+    _CENTERS = [500, 650, 800]
+
+    def setUp(self):
+        self.bands_responses = np.array([np.exp(-((self._WAVELENGTHS - center) / 15.0) ** 2)
+                                         for center in self._CENTERS])
+        self.library = np.random.default_rng(0).random((20, len(self._WAVELENGTHS)))
+        self.illuminant = np.ones(len(self._WAVELENGTHS))
+
+    def test_perturb_shifts_the_bands(self):
+        perturbed = perturb_bands_responses(self.bands_responses, self._WAVELENGTHS,
+                                            np.array([[5.0, -3.0, 0.0]]), np.ones((1, 3)))
+
+        self.assertEqual((1, 3, len(self._WAVELENGTHS)), perturbed.shape)
+        assert_array_almost_equal(np.roll(self.bands_responses[0], 5), perturbed[0, 0])
+        assert_array_almost_equal(np.roll(self.bands_responses[1], -3), perturbed[0, 1])
+        assert_array_almost_equal(self.bands_responses[2], perturbed[0, 2])
+
+    def test_perturb_scales_the_bandwidth(self):
+        perturbed = perturb_bands_responses(self.bands_responses, self._WAVELENGTHS,
+                                            np.zeros((1, 3)), np.full((1, 3), 2.0))
+
+        expected = np.exp(-((self._WAVELENGTHS - 500) / 30.0) ** 2)
+        assert_array_almost_equal(expected, perturbed[0, 0], decimal=3)
+
+    def test_from_grid(self):
+        ensemble = SrfEnsemble.from_grid(self.bands_responses, self._WAVELENGTHS,
+                                         shifts=[-2, 0, 2], scales=[0.9, 1.1])
+
+        self.assertEqual(6, len(ensemble))
+        self.assertEqual((6, 3, len(self._WAVELENGTHS)), ensemble.bands_responses.shape)
+        self.assertEqual((6, 3), ensemble.shifts.shape)
+
+    def test_apply_matches_kernels(self):
+        ensemble = SrfEnsemble.from_perturbations(self.bands_responses, self._WAVELENGTHS,
+                                                  shifts=[-1, 0, 3])
+
+        actual = ensemble.apply(self.library, self.illuminant, chunk_size=7)
+
+        self.assertEqual((20, 3, 3), actual.shape)
+        for k in range(3):
+            kernel = ConversionKernel(ensemble.bands_responses[k], self.illuminant)
+            assert_array_almost_equal(kernel.apply(self.library), actual[:, k])
+
+    def test_evaluate(self):
+        ensemble = SrfEnsemble.from_perturbations(self.bands_responses, self._WAVELENGTHS,
+                                                  shifts=[0, 0])
+
+        report = ensemble.evaluate(self.library, self.bands_responses, self.illuminant)
+
+        kernel = ConversionKernel(self.bands_responses, self.illuminant)
+        assert_array_almost_equal(kernel.apply(self.library), report.reference)
+        assert_array_almost_equal(report.reference, report.mean)
+        assert_array_almost_equal(np.zeros((20, 3)), report.std)
+        assert_array_almost_equal(np.zeros(3), report.relative_std)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,7 +4,12 @@ Converter
 
 Converter module provides the class EcostressToSentinelConverter
 for converting all the examples from the Ecostress spectral library
-to Sentinel-2 Responses and writing them to a CSV file.
+to Sentinel-2 Responses and writing them to a CSV file,
+and the class CubeToSentinelConverter for simulating Sentinel-2 images
+from hyperspectral cubes.
 """
 
 from .converter import EcostressToSentinelConverter
+
+from .cube_converter import CubeToSentinelConverter
+from .cube_converter import convert_cube
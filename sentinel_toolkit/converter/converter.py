@@ -7,14 +7,21 @@ to Sentinel-2 responses.
 import itertools as it
 from argparse import ArgumentParser
 from pathlib import Path
+
+import numpy as np
 from spectral import EcostressDatabase
 
 from sentinel_toolkit.ecostress import Ecostress
-from sentinel_toolkit.colorimetry import sd_to_sentinel_numpy
+from sentinel_toolkit.ecostress.ecostress import resample_spectra
+from sentinel_toolkit.colorimetry import SpectralGrid
+from sentinel_toolkit.colorimetry import sd_to_sentinel_batch_numpy
 from sentinel_toolkit.srf import S2Srf, S2SrfOptions
 
+from .pipeline import run_pipeline
+
 _ECOSTRESS_DB_FILENAME = "ecostress.db"
 _S2_SRF_FILENAME = "S2-SRF_COPE-GSEG-EOPG-TN-15-0007_3.0.xlsx"
+_SPECTRA_CHUNK_SIZE = 500
 
 
 class EcostressToSentinelConverter:
@@ -29,12 +36,21 @@ class EcostressToSentinelConverter:
         self.ecostress = ecostress_db
         self.s2rf = s2_srf
 
-    def convert_ecostress_to_sentinel_csv(self,
+    def convert_ecostress_to_sentinel_csv(self,  # pylint: disable=too-many-locals
                                           s2_srf_options=None,
-                                          illuminant=None):
+                                          illuminant=None,
+                                          max_workers=None,
+                                          dtype=np.float64):
         """
         Converts the ecostress library into Sentinel-2 responses
         and writes them to a CSV file named sentinel_<A or B>.csv.
+        The spectra are read from the database in chunks, and each chunk is resampled onto
+        the 1 nm grid of the wavelength range and converted with one masked matrix
+        multiplication on a pool of threads, which release the GIL while they compute.
+        The chunks are written by a background thread, so the database reads, the conversion
+        and the writing overlap, and at most a few chunks are held in memory.
+        Every band is normalized only over the wavelengths a spectrum covers,
+        like converting each spectrum in its own wavelength range.
 
         Parameters
         ----------
@@ -43,9 +59,14 @@ class EcostressToSentinelConverter:
                      If satellite is missing, satellite 'A' will be used.
                      If band names are missing, all band names will be used.
                      If wavelength range is missing, (360, 830) will be used.
-        illuminant : ndarray
-                     The illuminant values.
-                     If missing, D65 360-830 nm values will be used.
+        illuminant : ndarray or Illuminant
+                     The illuminant values in the wavelength range, in 1 nm steps.
+                     If missing, D65 will be used.
+        max_workers : int
+                      The number of conversion threads. If missing, the number of CPUs.
+        dtype : data-type
+                The floating point type of the spectra and the conversion, e.g. np.float32.
+                If missing, np.float64.
         """
         if s2_srf_options is None:
             s2_srf_options = S2SrfOptions(satellite='A', wavelength_range=(360, 830))
@@ -59,20 +80,32 @@ class EcostressToSentinelConverter:
 
         spectrum_ids = self.ecostress.get_spectrum_ids(wavelength_range)
 
+        bands_responses = self.s2rf.get_bands_responses(s2_srf_options, dtype=dtype)
+        grid = SpectralGrid(wavelength_range[0], wavelength_range[1], 1)
+
+        def read_chunks():
+            # Only the database reads stay on this thread, the resampling is done by the workers.
+            for start in range(0, len(spectrum_ids), _SPECTRA_CHUNK_SIZE):
+                chunk = spectrum_ids[start:start + _SPECTRA_CHUNK_SIZE]
+                yield chunk, self.ecostress.get_spectra(chunk)
+
+        def convert_chunk(chunk):
+            chunk_spectrum_ids, spectra = chunk
+            spectral_data, mask = resample_spectra(spectra, grid, dtype=dtype)
+            sentinel_responses = sd_to_sentinel_batch_numpy(spectral_data, bands_responses,
+                                                             illuminant, mask)
+            return [_format_sentinel_responses_line(spectrum_id, spectrum_sentinel_responses)
+                    for spectrum_id, spectrum_sentinel_responses
+                    in zip(chunk_spectrum_ids, sentinel_responses)]
+
         with open(output_filename, 'w', encoding='utf-8') as sentinel_file:
             _write_heading_line(sentinel_file, band_names)
-            for spectrum_id in spectrum_ids:
-                spectral_data = self.ecostress.get_spectral_distribution_numpy(spectrum_id,
-                                                                               wavelength_range)
-                wavelength_range = _get_wavelength_range(spectral_data.wavelengths,
-                                                         wavelength_range)
-                s2_srf_options.wavelength_range = wavelength_range
 
-                sentinel_responses = sd_to_sentinel_numpy(spectral_data,
-                                                          self.s2rf,
-                                                          s2_srf_options,
-                                                          illuminant)
-                _write_sentinel_responses_line(sentinel_file, spectrum_id, sentinel_responses)
+            def write_lines(lines):
+                for line in lines:
+                    sentinel_file.write(line)
+
+            run_pipeline(read_chunks(), convert_chunk, write_lines, max_workers)
 
 
 def _write_heading_line(sentinel_file, band_names):
@@ -80,20 +113,9 @@ def _write_heading_line(sentinel_file, band_names):
     sentinel_file.write(f"SpectrumID,{band_names_line}\n")
 
 
-def _get_wavelength_range(spectral_data_wavelengths, wavelength_range):
-    spectral_data_min_wavelength = spectral_data_wavelengths[0]
-    spectral_data_max_wavelength = spectral_data_wavelengths[-1]
-
-    start = max(wavelength_range[0], spectral_data_min_wavelength)
-    end = min(wavelength_range[1], spectral_data_max_wavelength)
-
-    return start, end
-
-
-def _write_sentinel_responses_line(sentinel_file, spectrum_id, sentinel_responses):
+def _format_sentinel_responses_line(spectrum_id, sentinel_responses):
     line = ','.join(it.repeat('{}', len(sentinel_responses) + 1)) + '\n'
-    line = line.format(spectrum_id, *sentinel_responses)
-    sentinel_file.write(line)
+    return line.format(spectrum_id, *sentinel_responses)
 
 
 def _main():
@@ -118,7 +140,7 @@ def _main():
     wavelength_range = (args.wavelength_start, args.wavelength_end)
 
     s2_srf_options = S2SrfOptions(satellite=satellite, wavelength_range=wavelength_range)
-    converter.convert_ecostress_to_sentinel_csv(s2_srf_options)
+    converter.convert_ecostress_to_sentinel_csv(s2_srf_options, dtype=np.dtype(args.dtype))
 
 
 def _parse_args():
@@ -154,6 +176,13 @@ def _parse_args():
                         type=int,
                         default=830,
                         help="The wavelength range end. Default is 830.")
+    parser.add_argument('-d',
+                        '--dtype',
+                        required=False,
+                        type=str,
+                        choices=['float32', 'float64'],
+                        default='float64',
+                        help="The floating point type of the conversion. Default is float64.")
     return parser.parse_args()
 
 
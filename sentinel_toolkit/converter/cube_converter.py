@@ -0,0 +1,223 @@
+"""
+cube_converter provides the class CubeToSentinelConverter that simulates Sentinel-2 images
+from hyperspectral cubes (e.g. airborne ENVI cubes). The cubes are memory-mapped and
+converted tile by tile, each tile with a single matrix multiplication, on a pool of threads,
+and the responses are written to a memory-mapped ENVI or .npy file, so cubes larger
+than the memory are converted with bounded memory.
+"""
+
+import dataclasses
+import math
+import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from spectral.io import envi
+
+from sentinel_toolkit.colorimetry import ConversionKernel
+from sentinel_toolkit.colorimetry import KERNEL_CACHE
+from sentinel_toolkit.colorimetry import SpectralGrid
+from sentinel_toolkit.colorimetry.kernel import get_float_dtype
+from sentinel_toolkit.srf import S2SrfOptions
+
+_TILE_BYTES = 64 * 1024 * 1024
+_MICROMETER_UNITS = ("micrometers", "micrometer", "microns", "um", "µm")
+
+
+class CubeToSentinelConverter:
+    """
+    CubeToSentinelConverter simulates the Sentinel-2 responses of every pixel of a
+    hyperspectral cube. The cube spectra are linearly interpolated to the 1 nm grid
+    of the spectral response functions, which is fused with the bands responses
+    and the illuminant into one (bands x cube_bands) kernel.
+    """
+
+    def __init__(self, s2_srf, s2_srf_options=None, illuminant=None, dtype=None):
+        """
+        Parameters
+        ----------
+        s2_srf : sentinel_toolkit.S2Srf
+                 The Sentinel-2 spectral response functions.
+        s2_srf_options : S2SrfOptions
+                         The satellite, band names and wavelength range of interest.
+                         The wavelength range is clipped to the wavelengths of the cube
+                         and of the spectral response functions.
+                         If missing, all the bands of satellite 'A' in (360, 830) will be used.
+        illuminant : ndarray or Illuminant
+                     The illuminant to apply. If missing, default to D65 in the wavelength range.
+        dtype : data-type
+                The floating point type of the computation and the output.
+                If missing, np.float32 for float32 cubes and np.float64 for the rest.
+        """
+        self.s2_srf = s2_srf
+        self.s2_srf_options = s2_srf_options or S2SrfOptions()
+        self.illuminant = illuminant
+        self.dtype = dtype
+
+    def get_band_names(self):
+        """
+        Retrieves the band names of the simulated image.
+
+        Returns
+        -------
+        output : list of str
+                 The band names.
+        """
+        satellite, band_names, _ = self.s2_srf_options.unpack()
+        if band_names is None:
+            band_names = self.s2_srf.get_all_band_names(satellite)
+        return list(band_names)
+
+    def get_kernel(self, wavelengths):
+        """
+        Builds the kernel converting spectra sampled at the given cube wavelengths.
+
+        Parameters
+        ----------
+        wavelengths : array_like
+                      The ascending wavelengths of the cube bands in nm.
+        Returns
+        -------
+        output : ConversionKernel
+                 The (bands x cube_bands) conversion kernel.
+        """
+        wavelengths = np.asarray(wavelengths, dtype=np.float64)
+        satellite, _, wavelength_range = self.s2_srf_options.unpack()
+        wavelength_range = wavelength_range or (360, 830)
+        srf_wavelengths = np.asarray(self.s2_srf.get_wavelengths(satellite or 'A'),
+                                     dtype=np.float64)
+
+        # The kernel wavelengths are the SRF wavelengths in the cube and the wavelength range.
+        start = max(int(math.ceil(wavelengths[0])), int(wavelength_range[0]),
+                    int(math.ceil(srf_wavelengths[0])))
+        end = min(int(math.floor(wavelengths[-1])), int(wavelength_range[1]),
+                  int(math.floor(srf_wavelengths[-1])))
+        if start > end:
+            error_msg = (f'The cube wavelengths ({wavelengths[0]}, {wavelengths[-1]}) are outside'
+                         f' of the wavelength range {tuple(wavelength_range)} of the spectral'
+                         f' response functions ({srf_wavelengths[0]}, {srf_wavelengths[-1]})!')
+            raise ValueError(error_msg)
+
+        options = dataclasses.replace(self.s2_srf_options, wavelength_range=(start, end))
+        kernel = KERNEL_CACHE.get(self.s2_srf, options, self.illuminant)
+
+        kernel_wavelengths = srf_wavelengths[(srf_wavelengths >= start) & (srf_wavelengths <= end)]
+        kernel_grid = SpectralGrid(wavelengths=kernel_wavelengths)
+        interpolation = kernel_grid.interpolation_matrix(wavelengths)
+        return ConversionKernel.from_weights((interpolation.T @ kernel.weights.T).T)
+
+    def convert(self, cube_filename, output_filename, tile_rows=None, max_workers=None):
+        """
+        Simulates the Sentinel-2 image of an ENVI cube and writes it to a file.
+
+        Parameters
+        ----------
+        cube_filename : str or Path
+                        The ENVI header filename of the hyperspectral cube.
+                        The header should contain the wavelengths of the bands.
+        output_filename : str or Path
+                          The output filename. An ENVI image with BIP interleave
+                          is written for .hdr files and a NumPy array for the rest.
+        tile_rows : int
+                    The number of cube rows per tile. If missing, tiles of about 64 MiB.
+        max_workers : int
+                      The number of threads. If missing, the number of CPUs.
+        Returns
+        -------
+        output : numpy.memmap
+                 The (rows x columns x bands) simulated image.
+        """
+        image = envi.open(str(cube_filename))
+        cube = image.open_memmap(interleave='bip')
+
+        kernel = self.get_kernel(_get_cube_wavelengths(image))
+        dtype = get_float_dtype(cube.dtype) if self.dtype is None else self.dtype
+
+        band_names = self.get_band_names()
+        shape = cube.shape[:2] + (len(band_names),)
+        output = _create_output(output_filename, shape, np.dtype(dtype), band_names)
+
+        convert_cube(cube, kernel, output, tile_rows, max_workers)
+        output.flush()
+        return output
+
+
+def convert_cube(cube, kernel, output, tile_rows=None, max_workers=None):
+    """
+    Converts a (rows x columns x cube_bands) cube tile by tile on a pool of threads.
+    Each tile is read, converted with one matrix multiplication and written to the output,
+    and at most two tiles per thread are in flight, so the memory use is bounded.
+
+    Parameters
+    ----------
+    cube : ndarray
+           The cube, usually a numpy.memmap with BIP interleave.
+    kernel : ConversionKernel
+             The (bands x cube_bands) conversion kernel.
+    output : ndarray
+             The (rows x columns x bands) output array, e.g. a numpy.memmap.
+             The responses are computed in its floating point type.
+    tile_rows : int
+                The number of cube rows per tile. If missing, tiles of about 64 MiB.
+    max_workers : int
+                  The number of threads. If missing, the number of CPUs.
+    Returns
+    -------
+    output : ndarray
+             The output array.
+    """
+    rows_count = cube.shape[0]
+    if tile_rows is None:
+        row_bytes = max(1, cube.shape[1] * cube.shape[2] * output.dtype.itemsize)
+        tile_rows = max(1, _TILE_BYTES // row_bytes)
+    max_workers = max_workers or os.cpu_count() or 1
+
+    weights = np.ascontiguousarray(kernel.get_weights(output.dtype).T)
+
+    def convert_tile(start):
+        end = min(start + tile_rows, rows_count)
+        tile = np.asarray(cube[start:end], dtype=output.dtype)
+        responses = np.dot(tile.reshape(-1, tile.shape[-1]), weights)
+        output[start:end] = responses.reshape(output[start:end].shape)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = []
+        for start in range(0, rows_count, tile_rows):
+            pending.append(executor.submit(convert_tile, start))
+            if len(pending) >= 2 * max_workers:
+                pending.pop(0).result()
+        for future in pending:
+            future.result()
+
+    return output
+
+
+def _get_cube_wavelengths(image):
+    wavelengths = image.bands.centers
+    if wavelengths is None:
+        error_msg = f'The cube "{image.filename}" does not define the wavelengths of its bands!'
+        raise ValueError(error_msg)
+
+    wavelengths = np.asarray(wavelengths, dtype=np.float64)
+    units = str(image.metadata.get('wavelength units', 'nm')).lower()
+    if units in _MICROMETER_UNITS:
+        wavelengths = wavelengths * 1000
+
+    return wavelengths
+
+
+def _create_output(output_filename, shape, dtype, band_names):
+    if Path(output_filename).suffix.lower() == '.hdr':
+        metadata = {
+            'lines': shape[0],
+            'samples': shape[1],
+            'bands': shape[2],
+            'band names': band_names,
+            'description': 'Simulated Sentinel-2 responses'
+        }
+        image = envi.create_image(str(output_filename), metadata, dtype=dtype,
+                                  interleave='bip', force=True)
+        return image.open_memmap(writable=True)
+
+    return np.lib.format.open_memmap(output_filename, mode='w+', dtype=dtype, shape=shape)
@@ -0,0 +1,67 @@
+"""
+pipeline provides run_pipeline, a staged pipeline that overlaps reading, processing
+and writing chunks of work: the chunks are read on the calling thread, processed on
+a pool of threads and written in order by a background writer thread. The stages are
+connected by a bounded queue, so a slow stage applies backpressure to the others and
+the memory use stays bounded, while the throughput approaches the slowest stage.
+"""
+
+import os
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_STOP = object()
+
+
+def run_pipeline(chunks, process, write, max_workers=None, queue_size=None):
+    """
+    Processes the chunks on a pool of threads and writes the results in order.
+
+    Parameters
+    ----------
+    chunks : iterable
+             The chunks to process. They are read lazily on the calling thread, which
+             keeps e.g. SQLite connections, bound to the thread that created them, usable.
+    process : callable
+              Processes one chunk. It is called on the threads of the pool.
+    write : callable
+            Writes the result of one chunk. It is called on the writer thread
+            in the order of the chunks.
+    max_workers : int
+                  The number of processing threads. If missing, the number of CPUs.
+    queue_size : int
+                 The maximum number of chunks read but not yet written.
+                 If missing, two per processing thread.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    pending = queue.Queue(maxsize=queue_size or 2 * max_workers)
+    errors = []
+
+    def write_results():
+        while True:
+            future = pending.get()
+            if future is _STOP:
+                return
+            # After an error, the queue is still drained, so the reader never blocks on it.
+            if not errors:
+                try:
+                    write(future.result())
+                except Exception as error:  # pylint: disable=broad-except
+                    errors.append(error)
+
+    writer = threading.Thread(target=write_results, name="pipeline-writer", daemon=True)
+    writer.start()
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        try:
+            for chunk in chunks:
+                if errors:
+                    break
+                pending.put(executor.submit(process, chunk))
+        finally:
+            pending.put(_STOP)
+            writer.join()
+
+    if errors:
+        raise errors[0]
@@ -1,12 +1,18 @@
+import threading
 import unittest
 from unittest import mock
 from unittest.mock import patch, mock_open
 
 import numpy as np
 from colour import SpectralDistribution
+from numpy.testing import assert_array_almost_equal
 
+from sentinel_toolkit.colorimetry import SpectralBatch, get_illuminant
+from sentinel_toolkit.colorimetry import sd_to_sentinel_batch_numpy, sd_to_sentinel_direct_numpy
 from sentinel_toolkit.colorimetry.sentinel_values import SpectralData
 from sentinel_toolkit.converter import EcostressToSentinelConverter
+from sentinel_toolkit.ecostress.ecostress import resample_spectra
+from sentinel_toolkit.srf import S2SrfOptions
 
 
 class TestConverter(unittest.TestCase):
@@ -33,6 +39,8 @@ class TestConverter(unittest.TestCase):
         [0.926199242291321, 0.0202100642531871, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
     ]).T
 
+    _S2_SRF_OPTIONS = S2SrfOptions(satellite='A', wavelength_range=(438, 443))
+
     _EXPECTED_SENTINEL_RESPONSE = [10.985433231270072, 11.086160373966965, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0]
 
     _BAND_NAMES = ["S2A_SR_AV_B1",
@@ -55,14 +63,16 @@ class TestConverter(unittest.TestCase):
     def test_dump(self, mock_open_file, mock_ecostress, mock_s2_srf):
         mock_s2_srf.get_all_band_names.return_value = self._BAND_NAMES
         mock_s2_srf.get_bands_responses.return_value = self._BANDS_RESPONSES
+        mock_s2_srf.get_wavelengths.return_value = np.arange(438, 444)
 
         mock_ecostress.get_spectrum_ids.return_value = np.array([1])
         spectral_data = SpectralData(self._SPECTRAL_DISTRIBUTION.wavelengths,
                                      self._SPECTRAL_DISTRIBUTION.values)
-        mock_ecostress.get_spectral_distribution_numpy.return_value = spectral_data
+        mock_ecostress.get_spectra.return_value = SpectralBatch.from_spectral_data([spectral_data],
+                                                                                  [1])
 
         converter = EcostressToSentinelConverter(mock_ecostress, mock_s2_srf)
-        converter.convert_ecostress_to_sentinel_csv()
+        converter.convert_ecostress_to_sentinel_csv(self._S2_SRF_OPTIONS)
         mock_open_file.assert_called_once_with('sentinel_A.csv', 'w', encoding='utf-8')
 
         band_names_line = ','.join(self._BAND_NAMES)
@@ -75,6 +85,110 @@ class TestConverter(unittest.TestCase):
             mock.call(csv_sentinel_responses_line)
         ])
 
+    @patch('sentinel_toolkit.srf.S2Srf')
+    @patch('sentinel_toolkit.ecostress.Ecostress')
+    @patch('builtins.open', new_callable=mock_open())
+    def test_dump_keeps_order(self, mock_open_file, mock_ecostress, mock_s2_srf):
+        mock_s2_srf.get_all_band_names.return_value = self._BAND_NAMES
+        mock_s2_srf.get_bands_responses.return_value = self._BANDS_RESPONSES
+        mock_s2_srf.get_wavelengths.return_value = np.arange(438, 444)
+
+        spectrum_ids = np.arange(1200)
+        mock_ecostress.get_spectrum_ids.return_value = spectrum_ids
+        mock_ecostress.get_spectra.side_effect = lambda chunk: SpectralBatch.from_spectral_data([
+            SpectralData(self._SPECTRAL_DISTRIBUTION.wavelengths,
+                         self._SPECTRAL_DISTRIBUTION.values * (i + 1)) for i in chunk], chunk)
+
+        converter = EcostressToSentinelConverter(mock_ecostress, mock_s2_srf)
+        converter.convert_ecostress_to_sentinel_csv(self._S2_SRF_OPTIONS, max_workers=3)
+
+        lines = [c.args[0] for c in mock_open_file.return_value.__enter__().write.call_args_list]
+        self.assertEqual(len(spectrum_ids) + 1, len(lines))
+        self.assertEqual([str(i) for i in spectrum_ids], [line.split(',')[0] for line in lines[1:]])
+        self.assertAlmostEqual(self._EXPECTED_SENTINEL_RESPONSE[0] * 1200,
+                               float(lines[-1].split(',')[1]))
+
+    @patch('sentinel_toolkit.srf.S2Srf')
+    @patch('sentinel_toolkit.ecostress.Ecostress')
+    @patch('builtins.open', new_callable=mock_open())
+    def test_dump_float32(self, mock_open_file, mock_ecostress, mock_s2_srf):
+        mock_s2_srf.get_all_band_names.return_value = self._BAND_NAMES
+        mock_s2_srf.get_bands_responses.return_value = self._BANDS_RESPONSES.astype(np.float32)
+        mock_s2_srf.get_wavelengths.return_value = np.arange(438, 444)
+
+        mock_ecostress.get_spectrum_ids.return_value = np.array([1])
+        spectral_data = SpectralData(self._SPECTRAL_DISTRIBUTION.wavelengths,
+                                     self._SPECTRAL_DISTRIBUTION.values.astype(np.float32))
+        mock_ecostress.get_spectra.return_value = SpectralBatch.from_spectral_data([spectral_data],
+                                                                                  [1])
+
+        converter = EcostressToSentinelConverter(mock_ecostress, mock_s2_srf)
+        with patch('sentinel_toolkit.converter.converter.resample_spectra',
+                   wraps=resample_spectra) as mock_resample_spectra:
+            converter.convert_ecostress_to_sentinel_csv(self._S2_SRF_OPTIONS, dtype=np.float32)
+
+        self.assertEqual(np.float32, mock_resample_spectra.call_args.kwargs['dtype'])
+        line = mock_open_file.return_value.__enter__().write.call_args_list[-1].args[0]
+        self.assertAlmostEqual(self._EXPECTED_SENTINEL_RESPONSE[0], float(line.split(',')[1]), places=4)
+
+    @patch('sentinel_toolkit.srf.S2Srf')
+    @patch('sentinel_toolkit.ecostress.Ecostress')
+    @patch('builtins.open', new_callable=mock_open())
+    def test_dump_resamples_on_the_workers(self, _, mock_ecostress, mock_s2_srf):
+        mock_s2_srf.get_all_band_names.return_value = self._BAND_NAMES
+        mock_s2_srf.get_bands_responses.return_value = self._BANDS_RESPONSES
+        mock_s2_srf.get_wavelengths.return_value = np.arange(438, 444)
+
+        mock_ecostress.get_spectrum_ids.return_value = np.array([1])
+        spectral_data = SpectralData(self._SPECTRAL_DISTRIBUTION.wavelengths,
+                                     self._SPECTRAL_DISTRIBUTION.values)
+        mock_ecostress.get_spectra.return_value = SpectralBatch.from_spectral_data([spectral_data],
+                                                                                  [1])
+
+        threads = []
+
+        def record_thread(*args, **kwargs):
+            threads.append(threading.current_thread())
+            return resample_spectra(*args, **kwargs)
+
+        converter = EcostressToSentinelConverter(mock_ecostress, mock_s2_srf)
+        with patch('sentinel_toolkit.converter.converter.resample_spectra',
+                   side_effect=record_thread):
+            converter.convert_ecostress_to_sentinel_csv(self._S2_SRF_OPTIONS, max_workers=2)
+
+        self.assertEqual(1, len(threads))
+        self.assertIsNot(threading.current_thread(), threads[0])
+
+
+    @patch('sentinel_toolkit.srf.S2Srf')
+    @patch('sentinel_toolkit.ecostress.Ecostress')
+    @patch('builtins.open', new_callable=mock_open())
+    def test_dump_converts_each_chunk_in_one_batch(self, mock_open_file, mock_ecostress, mock_s2_srf):
+        mock_s2_srf.get_all_band_names.return_value = self._BAND_NAMES
+        mock_s2_srf.get_bands_responses.return_value = self._BANDS_RESPONSES
+        mock_s2_srf.get_wavelengths.return_value = np.arange(438, 444)
+
+        full = SpectralData(self._SPECTRAL_DISTRIBUTION.wavelengths, self._SPECTRAL_DISTRIBUTION.values)
+        partial = SpectralData(full.wavelengths[2:], full.spectral_responses[2:])
+        spectrum_ids = np.arange(1000)
+        mock_ecostress.get_spectrum_ids.return_value = spectrum_ids
+        mock_ecostress.get_spectra.side_effect = lambda chunk: SpectralBatch.from_spectral_data(
+            [full if i % 2 == 0 else partial for i in chunk], chunk)
+
+        converter = EcostressToSentinelConverter(mock_ecostress, mock_s2_srf)
+        with patch('sentinel_toolkit.converter.converter.sd_to_sentinel_batch_numpy',
+                   wraps=sd_to_sentinel_batch_numpy) as mock_batch:
+            converter.convert_ecostress_to_sentinel_csv(self._S2_SRF_OPTIONS, max_workers=2)
+
+        self.assertEqual(2, mock_batch.call_count)
+
+        # The partial spectrum is converted in its own range, 440-443 nm.
+        expected = sd_to_sentinel_direct_numpy(partial, self._BANDS_RESPONSES[:, 2:],
+                                               get_illuminant("D65"))
+        lines = [c.args[0] for c in mock_open_file.return_value.__enter__().write.call_args_list]
+        assert_array_almost_equal(self._EXPECTED_SENTINEL_RESPONSE,
+                                  np.array(lines[1].split(',')[1:], dtype=float))
+        assert_array_almost_equal(expected, np.array(lines[2].split(',')[1:], dtype=float))
 
 if __name__ == '__main__':
     unittest.main()
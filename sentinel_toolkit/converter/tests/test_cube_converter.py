@@ -0,0 +1,93 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from numpy.testing import assert_array_almost_equal
+from spectral.io import envi
+
+from sentinel_toolkit.colorimetry import ConversionKernel
+from sentinel_toolkit.converter import CubeToSentinelConverter, convert_cube
+from sentinel_toolkit.srf import S2SrfOptions, SensorSrf
+
+
+class TestCubeConverter(unittest.TestCase):
+    _SRF_WAVELENGTHS = np.arange(400, 901)
+    _CUBE_WAVELENGTHS = np.arange(400, 901, 10.0)
+    _CENTERS = [500, 600, 700, 800]
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+        responses = np.array([np.exp(-((self._SRF_WAVELENGTHS - center) / 20.0) ** 2)
+                              for center in self._CENTERS]).T
+        self.srf = SensorSrf("TEST", self._SRF_WAVELENGTHS, ["B1", "B2", "B3", "B4"], responses)
+        self.options = S2SrfOptions(wavelength_range=(400, 900))
+
+        rng = np.random.default_rng(0)
+        self.cube = rng.random((7, 5, len(self._CUBE_WAVELENGTHS))).astype(np.float32)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def _expected(self):
+        spectra = np.array([np.interp(self._SRF_WAVELENGTHS, self._CUBE_WAVELENGTHS, spectrum)
+                            for spectrum in self.cube.reshape(-1, self.cube.shape[-1])])
+        kernel = ConversionKernel(self.srf.get_bands_responses(self.options), np.ones(501))
+        return kernel.apply(spectra).reshape(7, 5, -1)
+
+    def test_get_kernel(self):
+        converter = CubeToSentinelConverter(self.srf, self.options, np.ones(501))
+        kernel = converter.get_kernel(self._CUBE_WAVELENGTHS)
+        self.assertEqual((4, len(self._CUBE_WAVELENGTHS)), kernel.weights.shape)
+
+    def test_get_kernel_srf_narrower_than_cube(self):
+        srf_wavelengths = np.arange(450, 801)
+        responses = np.array([np.exp(-((srf_wavelengths - center) / 20.0) ** 2) for center in [500, 700]]).T
+        srf = SensorSrf("NARROW", srf_wavelengths, ["B1", "B2"], responses)
+
+        kernel = CubeToSentinelConverter(srf, self.options).get_kernel(self._CUBE_WAVELENGTHS)
+
+        spectra = np.array([np.interp(srf_wavelengths, self._CUBE_WAVELENGTHS, spectrum)
+                            for spectrum in self.cube.reshape(-1, self.cube.shape[-1])])
+        expected = ConversionKernel.from_s2_srf(srf, S2SrfOptions(wavelength_range=(450, 800))).apply(spectra)
+        assert_array_almost_equal(expected, kernel.apply(self.cube.reshape(-1, self.cube.shape[-1])), decimal=4)
+
+    def test_get_kernel_outside_of_range(self):
+        converter = CubeToSentinelConverter(self.srf, self.options, np.ones(501))
+        with self.assertRaises(ValueError):
+            converter.get_kernel(np.arange(1000, 2000, 10.0))
+
+    def test_convert_cube_in_tiles(self):
+        converter = CubeToSentinelConverter(self.srf, self.options, np.ones(501))
+        kernel = converter.get_kernel(self._CUBE_WAVELENGTHS)
+        output = np.empty((7, 5, 4))
+
+        convert_cube(self.cube, kernel, output, tile_rows=2, max_workers=3)
+
+        assert_array_almost_equal(self._expected(), output, decimal=5)
+
+    def test_convert_envi_cube(self):
+        cube_filename = Path(self.temp_dir, "cube.hdr")
+        envi.save_image(str(cube_filename), self.cube, metadata={
+            'wavelength': (self._CUBE_WAVELENGTHS / 1000).tolist(),
+            'wavelength units': 'Micrometers'
+        })
+        converter = CubeToSentinelConverter(self.srf, self.options, np.ones(501))
+
+        for output_filename in ["sentinel.hdr", "sentinel.npy"]:
+            output_path = Path(self.temp_dir, output_filename)
+            converter.convert(cube_filename, output_path, tile_rows=3)
+
+            if output_path.suffix == ".hdr":
+                actual = np.array(envi.open(str(output_path)).open_memmap())
+            else:
+                actual = np.load(output_path)
+
+            self.assertEqual(np.float32, actual.dtype)
+            assert_array_almost_equal(self._expected(), actual, decimal=4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import threading
+import time
+import unittest
+
+from sentinel_toolkit.converter.pipeline import run_pipeline
+
+
+class TestPipeline(unittest.TestCase):
+
+    def test_run_pipeline_keeps_order(self):
+        written = []
+
+        def process(chunk):
+            # The later chunks finish first.
+            time.sleep((10 - chunk) / 1000)
+            return chunk * 2
+
+        run_pipeline(range(10), process, written.append, max_workers=4)
+
+        self.assertEqual([2 * i for i in range(10)], written)
+
+    def test_run_pipeline_bounds_pending_chunks(self):
+        lock = threading.Lock()
+        state = {"read": 0, "written": 0, "max_pending": 0}
+
+        def read_chunks():
+            for i in range(20):
+                with lock:
+                    state["read"] += 1
+                    state["max_pending"] = max(state["max_pending"],
+                                               state["read"] - state["written"])
+                yield i
+
+        def write(_):
+            time.sleep(0.002)
+            with lock:
+                state["written"] += 1
+
+        run_pipeline(read_chunks(), lambda chunk: chunk, write, max_workers=2, queue_size=3)
+
+        self.assertEqual(20, state["written"])
+        # The queued chunks, the one taken by the writer and the one being read.
+        self.assertLessEqual(state["max_pending"], 5)
+
+    def test_run_pipeline_process_error(self):
+        written = []
+
+        def process(chunk):
+            if chunk == 3:
+                raise ValueError("Invalid chunk!")
+            return chunk
+
+        with self.assertRaises(ValueError):
+            run_pipeline(range(100), process, written.append, max_workers=2)
+        self.assertEqual([0, 1, 2], written)
+
+    def test_run_pipeline_write_error(self):
+        def write(_):
+            raise OSError("Disk full!")
+
+        with self.assertRaises(OSError):
+            run_pipeline(range(100), lambda chunk: chunk, write, max_workers=2)
+
+    def test_run_pipeline_read_error(self):
+        written = []
+
+        def read_chunks():
+            yield 1
+            raise RuntimeError("Database error!")
+
+        with self.assertRaises(RuntimeError):
+            run_pipeline(read_chunks(), lambda chunk: chunk, written.append)
+        self.assertEqual([1], written)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -9,4 +9,10 @@ Ecostress that can adds some convenient methods on top of the spectral libray.
 """
 
 from .ecostress_db_generator import generate_ecostress_db
+from .ecostress_db_generator import update_ecostress_db
+from .ecostress_db_generator import EcostressDbUpdate
 from .ecostress import Ecostress
+from .ecostress import EcostressBatch
+from .library_cache import EcostressLibrary
+from .catalog import EcostressCatalog
+from .connection_pool import EcostressConnectionPool
@@ -0,0 +1,293 @@
+"""
+catalog provides the class EcostressCatalog that loads the Samples and Spectra metadata
+of the Ecostress database into memory once, as NumPy columns. The material types, classes
+and subclasses are kept as integer codes and the spectra are indexed by their
+Min/MaxWaveLength, so composite selections, e.g. "vegetation covering at least 95% of
+the B8A support", are answered with a few vectorized comparisons instead of SQL queries.
+"""
+
+import numpy as np
+
+# The indexes supporting the metadata queries on the Ecostress database.
+_INDEXES = (
+    "CREATE INDEX IF NOT EXISTS SpectraSampleIDIndex ON Spectra (SampleID)",
+    "CREATE INDEX IF NOT EXISTS SpectraWavelengthIndex ON Spectra (MinWaveLength, MaxWaveLength)",
+    "CREATE INDEX IF NOT EXISTS SamplesTypeIndex ON Samples (Type, Class, SubClass)",
+)
+
+_CATALOG_SQL = """
+select Spectra.SpectrumID, Spectra.SampleID, Samples.Name, Samples.Type, Samples.Class,
+       Samples.SubClass, Spectra.MinWaveLength, Spectra.MaxWaveLength
+from Spectra
+join Samples on Samples.SampleID = Spectra.SampleID
+order by Spectra.SpectrumID
+"""
+
+_CATEGORICAL_COLUMNS = ("types", "classes", "subclasses")
+
+
+class EcostressCatalog:
+    """
+    EcostressCatalog keeps the metadata of the Ecostress spectra as columns:
+    spectrum_ids, sample_ids, names, the (spectra x 2) wavelength_ranges in nm and
+    the types, classes and subclasses, lower-cased and encoded as integer codes
+    into the sorted categories of each column.
+    """
+
+    def __init__(self, spectrum_ids, sample_ids, names, categories, wavelength_ranges):
+        """
+        Parameters
+        ----------
+        spectrum_ids : array_like of int
+                       The spectrum identifiers.
+        sample_ids : array_like of int
+                     The sample identifier of each spectrum.
+        names : array_like of str
+                The sample name of each spectrum.
+        categories : dict
+                     The (categories, codes) of the "types", "classes" and "subclasses" columns.
+        wavelength_ranges : array_like
+                            The (spectra x 2) minimum and maximum wavelength
+                            of each spectrum in nm.
+        """
+        self.spectrum_ids = np.asarray(spectrum_ids, dtype=np.int64)
+        self.sample_ids = np.asarray(sample_ids, dtype=np.int64)
+        self.names = np.asarray(names, dtype=object)
+        self.categories = categories
+        self.wavelength_ranges = np.asarray(wavelength_ranges, dtype=np.float64).reshape(-1, 2)
+
+        # The interval index: the spectra sorted by their minimum wavelength.
+        self._by_min_wavelength = np.argsort(self.wavelength_ranges[:, 0], kind='stable')
+        self._sorted_min_wavelengths = self.wavelength_ranges[self._by_min_wavelength, 0]
+
+    @classmethod
+    def from_db(cls, ecostress_db):
+        """
+        Loads the catalog from the Ecostress database with a single query.
+        The database is only read; its metadata indexes are created by every mode
+        of generate_ecostress_db, or explicitly with create_metadata_indexes.
+
+        Parameters
+        ----------
+        ecostress_db : spectral.EcostressDatabase
+                       The Ecostress database.
+        Returns
+        -------
+        output : EcostressCatalog
+                 The catalog of all the spectra.
+        """
+        rows = ecostress_db.query(_CATALOG_SQL).fetchall()
+        columns = list(zip(*rows)) if rows else [()] * 8
+
+        categories = {}
+        for name, values in zip(_CATEGORICAL_COLUMNS, columns[3:6]):
+            values = np.array([(value or "").lower() for value in values], dtype=object)
+            categories[name] = np.unique(values.astype(str), return_inverse=True)
+
+        wavelength_ranges = np.round(np.column_stack([np.array(columns[6], dtype=np.float64),
+                                                      np.array(columns[7], dtype=np.float64)]),
+                                     4) * 1000
+        return cls(columns[0], columns[1], columns[2], categories, wavelength_ranges)
+
+    def __len__(self):
+        return len(self.spectrum_ids)
+
+    def get_categories(self, column):
+        """
+        Returns the distinct values of a categorical column.
+
+        Parameters
+        ----------
+        column : str
+                 The column - "types", "classes" or "subclasses".
+        Returns
+        -------
+        output : ndarray of str
+                 The sorted lower-cased values.
+        """
+        return self.categories[column][0]
+
+    def is_in(self, column, values):
+        """
+        Returns the mask of the spectra whose categorical column is one of the values.
+
+        Parameters
+        ----------
+        column : str
+                 The column - "types", "classes" or "subclasses".
+        values : str or list of str
+                 The values to match, case-insensitively.
+        Returns
+        -------
+        output : ndarray
+                 The boolean mask of the matching spectra.
+        """
+        if column not in self.categories:
+            raise ValueError(f'Unknown categorical column "{column}"!')
+
+        values = [values] if isinstance(values, str) else values
+        categories, codes = self.categories[column]
+        wanted = np.flatnonzero(np.isin(categories, [value.lower() for value in values]))
+        return np.isin(codes, wanted)
+
+    def overlapping(self, wavelength_range):
+        """
+        Returns the mask of the spectra that have some values in the wavelength range,
+        like Ecostress.get_spectrum_ids, using the interval index.
+
+        Parameters
+        ----------
+        wavelength_range : tuple of float
+                           The wavelength range of interest in nm.
+        Returns
+        -------
+        output : ndarray
+                 The boolean mask of the overlapping spectra.
+        """
+        start, end = wavelength_range
+        # Only the spectra starting before the end of the range are candidates.
+        candidates = self._by_min_wavelength[:np.searchsorted(self._sorted_min_wavelengths,
+                                                              end, side='right')]
+
+        mask = np.zeros(len(self), dtype=bool)
+        mask[candidates[self.wavelength_ranges[candidates, 1] >= start]] = True
+        return mask
+
+    def get_coverage(self, wavelength_range):
+        """
+        Returns the fraction of the wavelength range covered by each spectrum.
+
+        Parameters
+        ----------
+        wavelength_range : tuple of float
+                           The wavelength range of interest in nm.
+        Returns
+        -------
+        output : ndarray
+                 The coverage fractions between 0 and 1.
+        """
+        start, end = wavelength_range
+        overlap = np.minimum(self.wavelength_ranges[:, 1], end) - \
+            np.maximum(self.wavelength_ranges[:, 0], start)
+        if end <= start:
+            return (overlap >= 0).astype(np.float64)
+        return np.clip(overlap / (end - start), 0, 1)
+
+    def select(self, mask=None, types=None, classes=None,  # pylint: disable=too-many-arguments
+               subclasses=None, *, sample_ids=None, wavelength_range=None, min_coverage=None):
+        """
+        Returns the mask of the spectra matching all the given predicates.
+
+        Parameters
+        ----------
+        mask : ndarray
+               A boolean mask to combine with, e.g. from is_in or get_coverage.
+        types : str or list of str
+                The material types, e.g. "vegetation".
+        classes : str or list of str
+                  The material classes.
+        subclasses : str or list of str
+                     The material subclasses.
+        sample_ids : array_like of int
+                     The sample identifiers.
+        wavelength_range : tuple of float
+                           The wavelength range in nm the spectra should overlap.
+        min_coverage : float
+                       The minimum fraction of the wavelength range the spectra
+                       should cover, e.g. 0.95. If missing, any overlap is enough.
+        Returns
+        -------
+        output : ndarray
+                 The boolean mask of the selected spectra.
+        """
+        selected = np.ones(len(self), dtype=bool) if mask is None else np.array(mask, dtype=bool)
+
+        for column, values in zip(_CATEGORICAL_COLUMNS, (types, classes, subclasses)):
+            if values is not None:
+                selected &= self.is_in(column, values)
+
+        if sample_ids is not None:
+            selected &= np.isin(self.sample_ids, sample_ids)
+
+        if wavelength_range is not None:
+            if min_coverage is None:
+                selected &= self.overlapping(wavelength_range)
+            else:
+                selected &= self.get_coverage(wavelength_range) >= min_coverage
+
+        return selected
+
+    def get_spectrum_ids(self, mask=None, types=None,  # pylint: disable=too-many-arguments
+                         classes=None, subclasses=None, *, sample_ids=None,
+                         wavelength_range=None, min_coverage=None):
+        """
+        Returns the spectrum identifiers of the spectra matching the predicates of select,
+        e.g. types="vegetation", wavelength_range=(848, 881), min_coverage=0.95.
+
+        Parameters
+        ----------
+        mask : ndarray
+               A boolean mask to combine with.
+        types : str or list of str
+                The material types.
+        classes : str or list of str
+                  The material classes.
+        subclasses : str or list of str
+                     The material subclasses.
+        sample_ids : array_like of int
+                     The sample identifiers.
+        wavelength_range : tuple of float
+                           The wavelength range in nm the spectra should overlap.
+        min_coverage : float
+                       The minimum fraction of the wavelength range the spectra should cover.
+        Returns
+        -------
+        output : ndarray of int
+                 The ascending spectrum identifiers.
+        """
+        selected = self.select(mask, types, classes, subclasses, sample_ids=sample_ids,
+                               wavelength_range=wavelength_range, min_coverage=min_coverage)
+        return self.spectrum_ids[selected]
+
+
+def create_metadata_indexes(connection):
+    """
+    Creates the missing metadata indexes of an Ecostress database.
+    Every mode of generate_ecostress_db creates them, so this is only needed for
+    databases built by other means, e.g. EcostressDatabase.create.
+    The database must be writable.
+
+    Parameters
+    ----------
+    connection : sqlite3.Connection
+                 The connection to the Ecostress database.
+    """
+    for sql in _INDEXES:
+        connection.execute(sql)
+    connection.commit()
+
+
+def get_support(wavelengths, response, threshold=0.0):
+    """
+    Returns the wavelength range in which a band response is above the threshold,
+    e.g. the support of B8A to select the spectra covering it.
+
+    Parameters
+    ----------
+    wavelengths : array_like
+                  The ascending wavelengths in nm.
+    response : array_like
+               The band response.
+    threshold : float
+                The response threshold. If missing, default to 0.
+    Returns
+    -------
+    output : tuple of float
+             The first and last wavelength with a response above the threshold.
+    """
+    above = np.flatnonzero(np.asarray(response) > threshold)
+    if len(above) == 0:
+        raise ValueError("The band response is never above the threshold!")
+
+    wavelengths = np.asarray(wavelengths, dtype=np.float64)
+    return float(wavelengths[above[0]]), float(wavelengths[above[-1]])
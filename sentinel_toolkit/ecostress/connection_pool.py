@@ -0,0 +1,172 @@
+"""
+connection_pool provides the class EcostressConnectionPool that gives every thread its own
+read-only connection to an Ecostress database, opened in read-only or immutable URI mode
+with a tuned page cache and memory map. It can be used in place of an EcostressDatabase,
+e.g. Ecostress(EcostressConnectionPool("ecostress.db")), from thread pools and forked worker
+processes, which open their own connections instead of sharing the parent's ones.
+"""
+
+import os
+import sqlite3
+import threading
+import weakref
+from pathlib import Path
+from urllib.parse import quote
+
+from spectral import EcostressDatabase
+
+_CACHE_SIZE_KIB = 64 * 1024
+_MMAP_SIZE = 256 * 1024 * 1024
+
+# The connections inherited from a parent process, kept alive because closing them
+# in the child could interfere with the parent.
+_INHERITED_DATABASES = []
+# The pools of this process, reset in forked children before any of their code runs.
+_POOLS = weakref.WeakSet()
+
+
+class EcostressConnectionPool:
+    """
+    EcostressConnectionPool opens one read-only EcostressDatabase per thread and process,
+    when the thread first uses it. Its query and get_signature methods use the database of
+    the calling thread and return fresh cursors, so they can be called concurrently.
+    """
+
+    def __init__(self, db_filename, immutable=False, cache_size_kib=_CACHE_SIZE_KIB,
+                 mmap_size=_MMAP_SIZE):
+        """
+        Parameters
+        ----------
+        db_filename : str or Path
+                      The Ecostress SQLite database filename.
+        immutable : bool
+                    Whether the database file never changes while it is open. SQLite then
+                    takes no locks, which avoids the lock contention of many readers
+                    on a shared filesystem. If missing, default to False.
+        cache_size_kib : int
+                         The page cache size of each connection in KiB.
+                         If missing, default to 64 MiB.
+        mmap_size : int
+                    The number of bytes of the database file memory-mapped by each
+                    connection. If missing, default to 256 MiB.
+        """
+        db_path = Path(db_filename).resolve()
+        if not db_path.is_file():
+            raise ValueError(f'The provided ecostress db filename "{db_filename}" does not exist!')
+
+        self.db_filename = str(db_path)
+        self._uri = f"file:{quote(self.db_filename)}?mode=ro"
+        if immutable:
+            self._uri += "&immutable=1"
+        self._pragmas = (f"PRAGMA cache_size = -{int(cache_size_kib)}",
+                         f"PRAGMA mmap_size = {int(mmap_size)}",
+                         "PRAGMA query_only = ON",
+                         "PRAGMA temp_store = MEMORY")
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._databases = []
+        _POOLS.add(self)
+
+    @property
+    def db(self):
+        """
+        Returns the sqlite3.Connection of the calling thread.
+        """
+        return self.get_database().db
+
+    def get_database(self):
+        """
+        Returns the read-only EcostressDatabase of the calling thread,
+        opening it on the first call of the thread.
+
+        Returns
+        -------
+        output : spectral.EcostressDatabase
+                 The database of the calling thread.
+        """
+        database = getattr(self._local, 'database', None)
+        if database is None:
+            database = EcostressDatabase()
+            database.db = self._connect()
+            database.cursor = database.db.cursor()
+            self._local.database = database
+            with self._lock:
+                self._databases.append(database)
+
+        return database
+
+    def query(self, sql, args=None):
+        """
+        Executes a query on the connection of the calling thread.
+
+        Parameters
+        ----------
+        sql : str
+              The SQL query.
+        args : tuple
+               The query parameters.
+        Returns
+        -------
+        output : sqlite3.Cursor
+                 A new cursor with the results.
+        """
+        connection = self.get_database().db
+        return connection.execute(sql, args) if args else connection.execute(sql)
+
+    def get_signature(self, spectrum_id):
+        """
+        Returns the signature of a spectrum, like EcostressDatabase.get_signature.
+
+        Parameters
+        ----------
+        spectrum_id : int
+                      The spectrum identifier.
+        Returns
+        -------
+        output : spectral.database.aster.Signature
+                 The spectrum with its metadata.
+        """
+        return self.get_database().get_signature(spectrum_id)
+
+    def close(self):
+        """
+        Closes the connections of all the threads of this process.
+        """
+        with self._lock:
+            databases, self._databases = self._databases, []
+            self._local = threading.local()
+
+        for database in databases:
+            database.db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _connect(self):
+        # The connection is only used by one thread, but it can be closed by another one.
+        connection = sqlite3.connect(self._uri, uri=True, check_same_thread=False)
+        for pragma in self._pragmas:
+            connection.execute(pragma)
+        return connection
+
+    def _reset_after_fork(self):
+        # SQLite connections must not be used across fork, so a forked child drops the
+        # parent's connections and opens its own. The lock is replaced, not acquired,
+        # since another thread of the parent may have held it when the process forked.
+        _INHERITED_DATABASES.extend(self._databases)
+        self._databases = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+
+def _reset_pools_after_fork():
+    for pool in list(_POOLS):
+        pool._reset_after_fork()  # pylint: disable=protected-access
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_reset_pools_after_fork)
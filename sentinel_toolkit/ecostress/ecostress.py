@@ -3,13 +3,56 @@ ecostress provides a wrapper class around the EcostressDatabase class from spect
 Ecostress wrapper class can be used for querying spectral data only in a given wavelength range
 """
 
+from collections import namedtuple
+
 import numpy as np
 
 from colour import SpectralDistribution
 from colour import SpectralShape
 from scipy.interpolate import interp1d
 
-from sentinel_toolkit.colorimetry.sentinel_values import SpectralData
+from sentinel_toolkit.colorimetry.resampling import resample_batch
+from sentinel_toolkit.colorimetry.spectral_data import SpectralBatch
+from sentinel_toolkit.colorimetry.spectral_data import SpectralData
+from sentinel_toolkit.colorimetry.spectral_grid import SpectralGrid
+
+from .catalog import EcostressCatalog
+from .catalog import create_metadata_indexes
+from .connection_pool import EcostressConnectionPool
+from .library_cache import EcostressLibrary
+from .library_cache import get_library_cache_path
+from .library_cache import get_valid_ranges
+from .library_cache import read_library
+from .library_cache import write_library
+
+_SPECTRA_CHUNK_SIZE = 500
+# The XData and YData blobs are arrays of float32 values.
+_BLOB_ITEM_SIZE = 4
+
+EcostressBatch = namedtuple("EcostressBatch", "spectrum_ids spectral_data mask")
+
+# Only the compact databases have the table of the deduplicated wavelength grids.
+_IS_COMPACT_SQL = """
+select count(*) from sqlite_master where type = 'table' and name = 'WavelengthGrids'
+"""
+
+_STREAM_SQL = """
+select SpectrumID, XData, YData
+from Spectra
+where MinWaveLength <= ? and MaxWaveLength >= ? and SpectrumID > ?
+order by SpectrumID
+limit ?
+"""
+
+_COMPACT_STREAM_SQL = """
+select SpectraValues.SpectrumID, SpectraValues.GridID, SpectraValues.Responses
+from SpectraValues
+join Spectra on Spectra.SpectrumID = SpectraValues.SpectrumID
+where Spectra.MinWaveLength <= ? and Spectra.MaxWaveLength >= ?
+      and SpectraValues.SpectrumID > ?
+order by SpectraValues.SpectrumID
+limit ?
+"""
 
 
 class Ecostress:
@@ -17,8 +60,62 @@ class Ecostress:
     Ecostress is a wrapper around the EcostressDatabase from spectral library.
     """
 
-    def __init__(self, ecostress_db):
+    def __init__(self, ecostress_db, cache_dir=None, compact=None):
+        """
+        Parameters
+        ----------
+        ecostress_db : spectral.EcostressDatabase
+                       The Ecostress database.
+        cache_dir : str or bool
+                    The directory used for the resampled libraries (see get_library).
+                    If missing, $SENTINEL_TOOLKIT_CACHE_DIR or ~/.cache/sentinel_toolkit
+                    will be used. If False, the libraries are not cached.
+        compact : bool
+                  Whether the database was generated with compact=True, so the spectral data
+                  is read from its deduplicated wavelength grids. If missing, it is detected
+                  from the tables of the database on first use.
+        """
         self.ecostress_db = ecostress_db
+        self.cache_dir = cache_dir
+        self._compact = compact
+        self._catalog = None
+        self._wavelength_grids = {}
+
+    @property
+    def compact(self):
+        """
+        Whether the database is a compact one, as given or detected from its tables.
+        """
+        if self._compact is None:
+            rows = list(self.ecostress_db.query(_IS_COMPACT_SQL, ()))
+            self._compact = bool(rows and rows[0][0])
+        return self._compact
+
+    @classmethod
+    def from_file(cls, db_filename, cache_dir=None, compact=None, immutable=False):
+        """
+        Creates an Ecostress backed by an EcostressConnectionPool, which can be used
+        concurrently from thread pools and forked worker processes.
+
+        Parameters
+        ----------
+        db_filename : str or Path
+                      The Ecostress SQLite database filename.
+        cache_dir : str or bool
+                    The directory used for the resampled libraries (see get_library).
+        compact : bool
+                  Whether the database was generated with compact=True.
+                  If missing, it is detected from the tables of the database.
+        immutable : bool
+                    Whether the database file never changes while it is open, so no locks
+                    are taken. If missing, default to False.
+
+        Returns
+        -------
+        output : Ecostress
+                 The Ecostress wrapper.
+        """
+        return cls(EcostressConnectionPool(db_filename, immutable), cache_dir, compact)
 
     def get_spectrum_ids(self, wavelength_rage=None):
         """
@@ -42,6 +139,7 @@ class Ecostress:
         select SpectrumID 
         from Spectra
         where MinWaveLength <= ? and MaxWaveLength >= ?
+        order by SpectrumID
          """
 
         min_wavelength = wavelength_rage[0] / 1000
@@ -50,6 +148,29 @@ class Ecostress:
         result = self.ecostress_db.query(sql, (max_wavelength, min_wavelength)).fetchall()
         return [r[0] for r in result]
 
+    def get_catalog(self, create_indexes=False):
+        """
+        Returns the in-memory metadata catalog of the spectra. It is loaded on the first call.
+
+        Parameters
+        ----------
+        create_indexes : bool
+                         Whether to first create the missing metadata indexes, for databases
+                         not built by generate_ecostress_db, e.g. by EcostressDatabase.create.
+                         The database must then be writable. If missing, default to False,
+                         and the database is only read.
+        Returns
+        -------
+        output : EcostressCatalog
+                 The catalog, e.g. catalog.get_spectrum_ids(types="vegetation",
+                 wavelength_range=(848, 881), min_coverage=0.95).
+        """
+        if create_indexes:
+            create_metadata_indexes(self.ecostress_db.db)
+        if self._catalog is None:
+            self._catalog = EcostressCatalog.from_db(self.ecostress_db)
+        return self._catalog
+
     def get_spectral_distribution_colour(self, spectrum_id, wavelength_rage=None):
         """
         Returns the SpectralDistribution of a given example
@@ -70,20 +191,22 @@ class Ecostress:
         if wavelength_rage is None:
             wavelength_rage = (360, 830)
 
-        signature = self.ecostress_db.get_signature(spectrum_id)
+        wavelengths, spectral_responses = self._get_signature(spectrum_id)
 
-        wavelengths = np.round(np.array(signature.x), 4) * 1000
-        spectral_responses = np.round(np.array(signature.y), 4) / 100
+        # The samples are often stored in descending order. Sort them and keep the last value
+        # of a repeated wavelength, like building the distribution from a dict would.
+        wavelengths, indices = np.unique(wavelengths[::-1], return_index=True)
+        spectral_responses = spectral_responses[::-1][indices]
 
-        spectral_data = dict(zip(wavelengths, spectral_responses))
-
-        spectral_distribution = SpectralDistribution(spectral_data, name='Ecostress')
+        spectral_distribution = SpectralDistribution(spectral_responses, wavelengths,
+                                                     name='Ecostress')
         shape = SpectralShape(wavelength_rage[0], wavelength_rage[1], 1)
         spectral_distribution.interpolate(shape)
 
         return spectral_distribution
 
-    def get_spectral_distribution_numpy(self, spectrum_id, wavelength_rage=None):
+    def get_spectral_distribution_numpy(self, spectrum_id, wavelength_rage=None, grid=None,
+                                        dtype=np.float64):
         """
         Returns the SpectralDistribution of a given example
         by a given spectrum_id and wavelength_range.
@@ -96,26 +219,408 @@ class Ecostress:
                       The spectrum identifier.
         wavelength_rage : tuple of int
                           The wavelength range of interest.
+        grid : SpectralGrid
+               The grid to sample the spectral data at. If missing, 1 nm steps will be used.
+        dtype : data-type
+                The type of the spectral responses, e.g. np.float32. If missing, np.float64.
 
         Returns
         -------
         output : SpectralData (tuple)
                  The tupled wavelengths and spectral_responses
         """
-        if wavelength_rage is None:
-            wavelength_rage = (360, 830)
+        wavelengths, spectral_responses = self._get_signature(spectrum_id)
+        return _to_spectral_data(wavelengths, spectral_responses, wavelength_rage, grid, dtype)
+
+    def get_spectra_numpy(self, spectrum_ids, chunk_size=_SPECTRA_CHUNK_SIZE):
+        """
+        Returns the raw spectral data of many examples, loaded with one query
+        per chunk_size spectrum identifiers instead of one query per example.
+        The sample blobs are decoded straight into two contiguous float32 buffers.
+
+        Parameters
+        ----------
+        spectrum_ids : list of int
+                       The spectrum identifiers.
+        chunk_size : int
+                     The number of spectrum identifiers per query. If missing, default to 500.
+
+        Returns
+        -------
+        output : SpectralBatch
+                 The wavelengths (in micrometers) and the spectral responses (in percent)
+                 of the examples, in the order of the given spectrum identifiers.
+        """
+        if self.compact:
+            raise ValueError("A compact database has no raw spectral data, use get_spectra!")
+
+        sql = "select SpectrumID, XData, YData from Spectra where SpectrumID in ({})"
+        return _to_spectral_batch(self._query_by_ids(sql, spectrum_ids, chunk_size, "spectra"))
+
+    def get_spectra(self, spectrum_ids, chunk_size=_SPECTRA_CHUNK_SIZE):
+        """
+        Returns the spectral data of many examples in nm and fractions, loaded in bulk.
+        For compact databases, the values are read as float32 and the shared
+        wavelength grids are decoded once and cached.
+
+        Parameters
+        ----------
+        spectrum_ids : list of int
+                       The spectrum identifiers.
+        chunk_size : int
+                     The number of spectrum identifiers per query. If missing, default to 500.
+
+        Returns
+        -------
+        output : SpectralBatch
+                 The wavelengths (in nm) and the spectral responses (as fractions)
+                 of the examples, in the order of the given spectrum identifiers.
+        """
+        if not self.compact:
+            return _convert_batch(self.get_spectra_numpy(spectrum_ids, chunk_size))
+
+        sql = "select SpectrumID, GridID, Responses from SpectraValues where SpectrumID in ({})"
+        return self._to_compact_batch(self._query_by_ids(sql, spectrum_ids, chunk_size, "spectra"))
+
+    def get_spectral_distributions_numpy(self, spectrum_ids, wavelength_rage=None, grid=None,
+                                         dtype=np.float64):
+        """
+        Returns the spectral data of many examples like get_spectral_distribution_numpy,
+        but loaded in bulk with get_spectra_numpy.
+
+        Parameters
+        ----------
+        spectrum_ids : list of int
+                       The spectrum identifiers.
+        wavelength_rage : tuple of int
+                          The wavelength range of interest.
+        grid : SpectralGrid
+               The grid to sample the spectral data at. If missing, 1 nm steps will be used.
+        dtype : data-type
+                The type of the spectral responses, e.g. np.float32. If missing, np.float64.
+
+        Returns
+        -------
+        output : list of SpectralData (tuple)
+                 The tupled wavelengths and spectral_responses of each example,
+                 in the order of the given spectrum identifiers.
+        """
+        return to_spectral_distributions_numpy(self.get_spectra(spectrum_ids), wavelength_rage,
+                                               grid, dtype)
+
+    def get_resampled_spectra(self, spectrum_ids, grid=None, method="linear",
+                              dtype=np.float64):
+        """
+        Returns the spectral data of many examples resampled onto a common grid
+        as a (spectra x wavelengths) matrix, loaded in bulk and resampled in one step.
+        The "linear" method gives the values of get_spectral_distribution_numpy
+        and the "colour" method those of get_spectral_distribution_colour.
+
+        Parameters
+        ----------
+        spectrum_ids : list of int
+                       The spectrum identifiers.
+        grid : SpectralGrid
+               The grid to sample the spectral data at. If missing, 360-830 nm in 1 nm steps.
+        method : str
+                 The interpolation method - "linear", "cubic", "sprague" or "colour".
+                 If missing, default to "linear".
+        dtype : data-type
+                The type of the spectral responses, e.g. np.float32. If missing, np.float64.
+
+        Returns
+        -------
+        output : tuple of SpectralData and ndarray
+                 The grid wavelengths and (spectra x wavelengths) spectral responses,
+                 and the (spectra x wavelengths) boolean mask of the values inside
+                 the native wavelength range of each example.
+        """
+        if grid is None:
+            grid = SpectralGrid(360, 830, 1)
+
+        return resample_spectra(self.get_spectra(spectrum_ids), grid, method, dtype)
+
+    def iter_batches(self, spectrum_ids=None, grid=None,  # pylint: disable=too-many-arguments
+                     batch_size=_SPECTRA_CHUNK_SIZE, *, method="linear", dtype=np.float64):
+        """
+        Yields the examples in fixed-size batches resampled onto a common grid, so
+        a library of any size is streamed with constant memory. Without spectrum
+        identifiers, the examples with some spectral data in the grid range are read
+        with one query per batch, which continues after the last spectrum identifier
+        of the previous batch, so other queries can run between the batches.
+
+        Parameters
+        ----------
+        spectrum_ids : list of int
+                       The spectrum identifiers, e.g. from EcostressCatalog.get_spectrum_ids.
+                       If missing, all the examples with some spectral data in the grid range.
+        grid : SpectralGrid
+               The grid to sample the spectral data at. If missing, 360-830 nm in 1 nm steps.
+        batch_size : int
+                     The number of examples per batch. If missing, default to 500.
+        method : str
+                 The interpolation method - "linear", "cubic", "sprague" or "colour".
+                 If missing, default to "linear".
+        dtype : data-type
+                The type of the spectral responses, e.g. np.float32. If missing, np.float64.
+
+        Yields
+        ------
+        output : EcostressBatch (tuple)
+                 The spectrum identifiers, the grid wavelengths with the (batch x wavelengths)
+                 spectral responses and the (batch x wavelengths) boolean mask of the values
+                 inside the native wavelength range of each example.
+        """
+        if grid is None:
+            grid = SpectralGrid(360, 830, 1)
+
+        if spectrum_ids is None:
+            sql = _COMPACT_STREAM_SQL if self.compact else _STREAM_SQL
+            decode = self._to_compact_batch if self.compact else \
+                (lambda rows: _convert_batch(_to_spectral_batch(rows)))
+            batches = _fetch_batches(
+                lambda last_id: self.ecostress_db.query(sql, (grid.wavelengths[-1] / 1000,
+                                                              grid.wavelengths[0] / 1000,
+                                                              last_id, batch_size)),
+                batch_size, decode)
+        else:
+            spectrum_ids = list(spectrum_ids)
+            batches = (self.get_spectra(spectrum_ids[start:start + batch_size])
+                       for start in range(0, len(spectrum_ids), batch_size))
+
+        for spectra in batches:
+            spectral_data, mask = resample_spectra(spectra, grid, method, dtype)
+            yield EcostressBatch(np.asarray(spectra.spectrum_ids, dtype=np.int64),
+                                 spectral_data, mask)
+
+    def get_library(self, grid=None, method="linear", dtype=np.float64):
+        """
+        Returns all the examples with some spectral data in the grid range,
+        resampled onto the grid. The resampled library is cached on disk and
+        memory-mapped read-only by later calls, also from other processes.
+
+        Parameters
+        ----------
+        grid : SpectralGrid
+               The grid to sample the spectral data at. If missing, 360-830 nm in 1 nm steps.
+        method : str
+                 The interpolation method - "linear", "cubic", "sprague" or "colour".
+                 If missing, default to "linear".
+        dtype : data-type
+                The type of the spectral responses, e.g. np.float32. If missing, np.float64.
+
+        Returns
+        -------
+        output : EcostressLibrary (tuple)
+                 The spectrum ids, the grid wavelengths with the (spectra x wavelengths)
+                 spectral responses, zero outside of the native range of each example,
+                 and the (spectra x 2) first and last valid wavelength of each example.
+        """
+        if grid is None:
+            grid = SpectralGrid(360, 830, 1)
+
+        cache_path = get_library_cache_path(self._get_db_filename(), self.cache_dir,
+                                            grid, method, dtype)
+        library = read_library(cache_path)
+        if library is None:
+            spectrum_ids = self.get_spectrum_ids((grid.wavelengths[0], grid.wavelengths[-1]))
+            spectral_data, mask = self.get_resampled_spectra(spectrum_ids, grid, method, dtype)
+            library = EcostressLibrary(np.asarray(spectrum_ids, dtype=np.int64), spectral_data,
+                                       get_valid_ranges(grid.wavelengths, mask))
+            write_library(cache_path, library)
+
+        return library
+
+    def _get_signature(self, spectrum_id):
+        if self.compact:
+            spectral_data = self.get_spectra([spectrum_id])[0]
+            return SpectralData(spectral_data.wavelengths,
+                                spectral_data.spectral_responses.astype(np.float64))
 
         signature = self.ecostress_db.get_signature(spectrum_id)
+        return SpectralData(*convert_units(signature.x, signature.y))
+
+    def _query_by_ids(self, sql, ids, chunk_size, name):
+        # Returns the rows of the ids, in their order, with one query per chunk.
+        ids = list(ids)
+
+        rows = {}
+        for start in range(0, len(ids), chunk_size):
+            chunk = ids[start:start + chunk_size]
+            for row in self.ecostress_db.query(sql.format(','.join('?' * len(chunk))), chunk):
+                rows[row[0]] = row
+
+        missing = [row_id for row_id in ids if row_id not in rows]
+        if missing:
+            raise ValueError(f'The {name} {missing[:10]} were not found!')
+
+        return [rows[row_id] for row_id in ids]
+
+    def _to_compact_batch(self, rows):
+        # Decodes the (SpectrumID, GridID, Responses) rows, reusing the cached grids.
+        grid_ids = [row[1] for row in rows]
+        missing = sorted(set(grid_ids) - set(self._wavelength_grids))
+        if missing:
+            sql = "select GridID, Wavelengths from WavelengthGrids where GridID in ({})"
+            for grid_id, wavelengths in self._query_by_ids(sql, missing, _SPECTRA_CHUNK_SIZE,
+                                                           "wavelength grids"):
+                self._wavelength_grids[grid_id] = np.frombuffer(wavelengths, dtype=np.float64)
+
+        grids = [self._wavelength_grids[grid_id] for grid_id in grid_ids]
+        offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+        np.cumsum([len(wavelengths) for wavelengths in grids], out=offsets[1:])
+
+        return SpectralBatch([row[0] for row in rows],
+                             np.concatenate(grids) if grids else np.empty(0),
+                             np.frombuffer(b''.join(row[2] for row in rows), dtype=np.float32),
+                             offsets)
+
+    def _get_db_filename(self):
+        # The file of the main database, empty for in-memory databases.
+        for _, name, filename in self.ecostress_db.query("PRAGMA database_list").fetchall():
+            if name == "main":
+                return filename
+        return None
+
+
+def convert_units(x, y):
+    """
+    Converts Ecostress wavelengths in micrometers and values in percent to nm and fractions,
+    rounded to 4 decimals first, like all the readers of the spectral data.
+
+    Parameters
+    ----------
+    x : array_like
+        The wavelengths in micrometers.
+    y : array_like
+        The values in percent.
+    Returns
+    -------
+    output : tuple of ndarray
+             The wavelengths in nm and the values as fractions.
+    """
+    return np.round(np.asarray(x, dtype=np.float64), 4) * 1000, \
+        np.round(np.asarray(y, dtype=np.float64), 4) / 100
+
+
+def to_spectral_distributions_numpy(spectra, wavelength_rage=None, grid=None, dtype=np.float64):
+    """
+    Samples the spectra loaded by Ecostress.get_spectra like get_spectral_distributions_numpy.
+    It does not touch the database, so e.g. the spectra can be read on one thread
+    and sampled on others.
+
+    Parameters
+    ----------
+    spectra : SpectralBatch
+              The wavelengths (in nm) and the spectral responses (as fractions) of the examples.
+    wavelength_rage : tuple of int
+                      The wavelength range of interest.
+    grid : SpectralGrid
+           The grid to sample the spectral data at. If missing, 1 nm steps will be used.
+    dtype : data-type
+            The type of the spectral responses, e.g. np.float32. If missing, np.float64.
+
+    Returns
+    -------
+    output : list of SpectralData (tuple)
+             The tupled wavelengths and spectral_responses of each example.
+    """
+    return [_to_spectral_data(wavelengths, np.asarray(spectral_responses, dtype=np.float64),
+                              wavelength_rage, grid, dtype)
+            for wavelengths, spectral_responses in spectra]
+
+
+def resample_spectra(spectra, grid, method="linear", dtype=np.float64):
+    """
+    Resamples the spectra loaded by Ecostress.get_spectra onto a common grid
+    like get_resampled_spectra. It does not touch the database, so e.g. the spectra
+    can be read on one thread and resampled on others.
+
+    Parameters
+    ----------
+    spectra : SpectralBatch
+              The wavelengths (in nm) and the spectral responses (as fractions) of the examples.
+    grid : SpectralGrid
+           The grid to resample the spectral data onto.
+    method : str
+             The interpolation method - "linear", "cubic", "sprague" or "colour".
+             If missing, default to "linear".
+    dtype : data-type
+            The type of the spectral responses, e.g. np.float32. If missing, np.float64.
+
+    Returns
+    -------
+    output : tuple of SpectralData and ndarray
+             The grid wavelengths and (spectra x wavelengths) spectral responses,
+             and the (spectra x wavelengths) boolean mask of the values inside
+             the native wavelength range of each example.
+    """
+    # The wavelengths are truncated like in the numpy code path and rounded in the colour one.
+    wavelengths = spectra.wavelengths
+    if method == "linear":
+        wavelengths = np.trunc(wavelengths)
+    spectral_responses = spectra.spectral_responses.astype(
+        np.promote_types(spectra.spectral_responses.dtype, dtype))
+
+    spectral_data, mask = resample_batch(
+        SpectralBatch(spectra.spectrum_ids, wavelengths, spectral_responses, spectra.offsets),
+        grid, method)
+
+    spectral_responses = spectral_data.spectral_responses.astype(dtype, copy=False)
+    return SpectralData(spectral_data.wavelengths, spectral_responses), mask
+
+
+def _fetch_batches(query_batch, batch_size, decode):
+    # Only one batch of rows is held at a time. The rows are paged by their identifiers
+    # instead of fetched from one open cursor, which spectral's databases share between
+    # all their queries.
+    last_id = -2 ** 63
+    while True:
+        rows = query_batch(last_id).fetchall()
+        if rows:
+            yield decode(rows)
+        if len(rows) < batch_size:
+            return
+        last_id = rows[-1][0]
+
+
+def _to_spectral_batch(rows):
+    # Decodes the (SpectrumID, XData, YData) rows into two contiguous float32 buffers.
+    spectrum_ids = [row[0] for row in rows]
+    x_blobs = [row[1] for row in rows]
+    y_blobs = [row[2] for row in rows]
+
+    offsets = np.zeros(len(rows) + 1, dtype=np.int64)
+    np.cumsum([len(x_blob) // _BLOB_ITEM_SIZE for x_blob in x_blobs], out=offsets[1:])
+
+    return SpectralBatch(spectrum_ids,
+                         np.frombuffer(b''.join(x_blobs), dtype=np.float32),
+                         np.frombuffer(b''.join(y_blobs), dtype=np.float32),
+                         offsets)
+
+
+def _convert_batch(spectra):
+    wavelengths, spectral_responses = convert_units(spectra.wavelengths,
+                                                    spectra.spectral_responses)
+    return SpectralBatch(spectra.spectrum_ids, wavelengths, spectral_responses, spectra.offsets)
+
+
+def _to_spectral_data(wavelengths, spectral_responses, wavelength_rage, grid, dtype):
+    if wavelength_rage is None:
+        wavelength_rage = (360, 830)
 
-        wavelengths = np.trunc(np.round(np.array(signature.x), 4) * 1000).astype(int)
-        spectral_responses = np.round(np.array(signature.y), 4) / 100
+    wavelengths = np.trunc(wavelengths).astype(int)
 
-        interpolator = interp1d(wavelengths, spectral_responses)
+    interpolator = interp1d(wavelengths, spectral_responses)
 
-        min_wavelength = max(wavelengths[0], wavelength_rage[0])
-        max_wavelength = min(wavelengths[-1], wavelength_rage[1])
+    min_wavelength = max(np.min(wavelengths), wavelength_rage[0])
+    max_wavelength = min(np.max(wavelengths), wavelength_rage[1])
 
+    if grid is None:
         wavelengths = np.arange(min_wavelength, max_wavelength + 1, 1)
-        spectral_responses = interpolator(wavelengths)
+    else:
+        wavelengths = grid.wavelengths[(grid.wavelengths >= min_wavelength) &
+                                       (grid.wavelengths <= max_wavelength)]
+    spectral_responses = interpolator(wavelengths).astype(dtype, copy=False)
 
-        return SpectralData(wavelengths, spectral_responses)
+    return SpectralData(wavelengths, spectral_responses)
@@ -3,19 +3,74 @@ ecostress_db_generator provides a way to generate SQLite database
 containing the Ecostress spectral library.
 ecostress_db_generator.py can be used as a script to generate the database in the following manner::
 
-python ecostress_db_generator.py -d <ecostress_directory> -o <output_filename>
+python ecostress_db_generator.py -d <ecostress_directory> -o <output_filename> [-p] [-u] [-c]
 
 """
 
+import array
+import hashlib
+import itertools as it
+import os
+import sqlite3
 from argparse import ArgumentParser
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+import numpy as np
 from spectral import EcostressDatabase
+from spectral.database.ecostress import read_ecostress_file
+
+from .catalog import create_metadata_indexes
+from .ecostress import convert_units
 
 _DB_FILENAME = "ecostress.db"
 _ECOSTRESS_DATA_DIRECTORY = "ecospeclib-all"
+_INSERT_BATCH_SIZE = 1000
+
+EcostressDbUpdate = namedtuple("EcostressDbUpdate", "added updated deleted")
+_SourceFile = namedtuple("_SourceFile", "path size modified_time sha256")
+
+# The manifest of the spectrum files the rows were parsed from, used by update_ecostress_db.
+_SOURCE_FILES_SCHEMA = """
+CREATE TABLE IF NOT EXISTS SourceFiles (Path TEXT PRIMARY KEY, Size INTEGER,
+                                        ModifiedTime INTEGER, SHA256 TEXT,
+                                        SampleID INTEGER, SpectrumID INTEGER)
+"""
+
+# Bulk loading settings: no rollback journal or fsync until the database is complete.
+_BUILD_PRAGMAS = (
+    "PRAGMA journal_mode = OFF",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -262144",
+    "PRAGMA locking_mode = EXCLUSIVE",
+)
+
+_INSERT_SAMPLE_SQL = """
+INSERT INTO Samples (SampleID, Name, Type, Class, SubClass, ParticleSize, SampleNum,
+                     Owner, Origin, Phase, Description)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
+
+_INSERT_SIGNATURE_SQL = """
+INSERT INTO Spectra (SpectrumID, SampleID, SensorCalibrationID, Instrument, Environment,
+                     Measurement, XUnit, YUnit, MinWavelength, MaxWavelength, NumValues,
+                     XData, YData)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+"""
 
+# The compact layout: every distinct wavelength grid is stored once, in nm (float64), and
+# the values of each spectrum are stored as fractions (float32) with a reference to its grid.
+_COMPACT_SCHEMAS = [
+    "CREATE TABLE IF NOT EXISTS WavelengthGrids (GridID INTEGER PRIMARY KEY, NumValues INTEGER, "
+    "Wavelengths BLOB)",
+    "CREATE TABLE IF NOT EXISTS SpectraValues (SpectrumID INTEGER PRIMARY KEY, GridID INTEGER, "
+    "Responses BLOB)",
+]
 
-def generate_ecostress_db(ecostress_dir=_ECOSTRESS_DATA_DIRECTORY, output_db_filename=_DB_FILENAME):
+
+def generate_ecostress_db(ecostress_dir=_ECOSTRESS_DATA_DIRECTORY, output_db_filename=_DB_FILENAME,
+                          parallel=False, max_workers=None, compact=False):
     """
     Generates SQLite database for a given Ecostress spectral library directory.
 
@@ -27,8 +82,292 @@ def generate_ecostress_db(ecostress_dir=_ECOSTRESS_DATA_DIRECTORY, output_db_fil
     output_db_filename : str
                          The name of the output SQLite database file.
                          If missing, default to "ecostress.db"
+    parallel : bool
+               Whether to parse the spectrum files in a process pool and bulk-insert them
+               in one transaction, instead of using EcostressDatabase.create.
+               The database has the same schema and rows, plus the manifest of the
+               source files used by update_ecostress_db. In every mode, the metadata
+               indexes are created and the database is analyzed.
+               If missing, default to False.
+    max_workers : int
+                  The number of parsing processes in parallel mode.
+                  If missing, the number of CPUs.
+    compact : bool
+              Whether to generate in parallel mode a compact database, which stores every
+              distinct wavelength grid once, in nm, and the values of the spectra as float32
+              fractions, instead of the XData and YData of the Spectra table, which are empty.
+              Ecostress detects the layout when it reads the database.
+              If missing, default to False.
+    """
+    if not parallel and not compact:
+        ecostress_db = EcostressDatabase.create(output_db_filename, ecostress_dir)
+        try:
+            create_metadata_indexes(ecostress_db.db)
+            ecostress_db.db.execute("ANALYZE")
+            ecostress_db.db.commit()
+        finally:
+            ecostress_db.db.close()
+        return
+
+    if not Path(ecostress_dir).is_dir():
+        error_msg = f'The provided ecostress data directory "{ecostress_dir}" does not exist!'
+        raise RuntimeError(error_msg)
+    if Path(output_db_filename).exists():
+        error_msg = f'The output database "{output_db_filename}" already exists!'
+        raise RuntimeError(error_msg)
+
+    filenames = sorted(str(path) for path in Path(ecostress_dir).glob('*spectrum.txt'))
+
+    # The database is built in a temporary file, so a failed build leaves no partial database.
+    # A temporary file left by a killed build would make the schema creation fail, so it goes.
+    tmp_filename = f"{output_db_filename}.tmp"
+    Path(tmp_filename).unlink(missing_ok=True)
+    connection = sqlite3.connect(tmp_filename)
+    try:
+        for pragma in _BUILD_PRAGMAS:
+            connection.execute(pragma)
+        for schema in EcostressDatabase.schemas + [_SOURCE_FILES_SCHEMA] + \
+                (_COMPACT_SCHEMAS if compact else []):
+            connection.execute(schema)
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            records = executor.map(_read_source_file, filenames, chunksize=16)
+            _insert_records(connection, records, 1, {} if compact else None)
+
+        create_metadata_indexes(connection)
+        connection.execute("ANALYZE")
+        connection.commit()
+    except BaseException:
+        connection.close()
+        os.remove(tmp_filename)
+        raise
+
+    connection.close()
+    os.replace(tmp_filename, output_db_filename)
+
+
+def update_ecostress_db(ecostress_dir=_ECOSTRESS_DATA_DIRECTORY, db_filename=_DB_FILENAME,
+                        max_workers=None):
     """
-    EcostressDatabase.create(output_db_filename, ecostress_dir)
+    Updates a database generated in parallel mode with the changes of the Ecostress
+    spectral library directory since the last generation or update. Only the new and
+    modified spectrum files are parsed (the files whose size or modification time
+    changed are hashed to detect the modified ones), their rows are inserted or
+    replaced in place, keeping the spectrum identifiers, and the rows of the deleted
+    files are deleted, all in one transaction. If the database does not exist,
+    it is generated in parallel mode. Compact databases stay compact.
+
+    Parameters
+    ----------
+    ecostress_dir : str
+                    The Ecostress spectral library directory.
+                    If missing, default to "ecospeclib-all"
+    db_filename : str
+                  The name of the SQLite database file.
+                  If missing, default to "ecostress.db"
+    max_workers : int
+                  The number of parsing processes. If missing, the number of CPUs.
+    Returns
+    -------
+    output : EcostressDbUpdate (tuple)
+             The names of the added, updated and deleted spectrum files.
+    """
+    if not Path(db_filename).exists():
+        generate_ecostress_db(ecostress_dir, db_filename, True, max_workers)
+        added = sorted(path.name for path in Path(ecostress_dir).glob('*spectrum.txt'))
+        return EcostressDbUpdate(added, [], [])
+
+    if not Path(ecostress_dir).is_dir():
+        error_msg = f'The provided ecostress data directory "{ecostress_dir}" does not exist!'
+        raise RuntimeError(error_msg)
+
+    connection = sqlite3.connect(db_filename)
+    try:
+        manifest = _read_manifest(connection, db_filename)
+        grids = _read_wavelength_grids(connection)
+        paths = {path.name: path for path in Path(ecostress_dir).glob('*spectrum.txt')}
+
+        changed = sorted(name for name, path in paths.items()
+                         if name not in manifest or _get_stat(path) != manifest[name][:2])
+        deleted = sorted(set(manifest) - set(paths))
+
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            records = executor.map(_read_source_file, [str(paths[name]) for name in changed],
+                                   [manifest.get(name, (None,) * 3)[2] for name in changed],
+                                   chunksize=16)
+            # The connection as a context manager commits the transaction or rolls it back.
+            with connection:
+                added, updated = _apply_changes(connection, records, manifest, grids)
+                _delete_sources(connection, manifest, deleted, grids is not None)
+
+        create_metadata_indexes(connection)
+    finally:
+        connection.close()
+
+    return EcostressDbUpdate(added, updated, deleted)
+
+
+def _read_manifest(connection, db_filename):
+    has_manifest = connection.execute("SELECT count(*) FROM sqlite_master "
+                                      "WHERE type = 'table' AND name = 'SourceFiles'").fetchone()[0]
+    if not has_manifest:
+        if connection.execute("SELECT count(*) FROM Spectra").fetchone()[0]:
+            error_msg = (f'The database "{db_filename}" has no manifest of its source files,'
+                         f' generate it again with parallel=True!')
+            raise RuntimeError(error_msg)
+        connection.execute(_SOURCE_FILES_SCHEMA)
+
+    rows = connection.execute("SELECT Path, Size, ModifiedTime, SHA256, SampleID, SpectrumID "
+                              "FROM SourceFiles").fetchall()
+    return {row[0]: row[1:] for row in rows}
+
+
+def _read_wavelength_grids(connection):
+    # The grid identifiers by their wavelengths, or None if the database is not compact.
+    is_compact = connection.execute("SELECT count(*) FROM sqlite_master WHERE type = 'table' "
+                                    "AND name = 'WavelengthGrids'").fetchone()[0]
+    if not is_compact:
+        return None
+
+    rows = connection.execute("SELECT GridID, Wavelengths FROM WavelengthGrids").fetchall()
+    return {wavelengths: grid_id for grid_id, wavelengths in rows}
+
+
+def _apply_changes(connection, records, manifest, grids):
+    added, updated, inserted = [], [], []
+    for source_file, rows in records:
+        if source_file.path not in manifest:
+            added.append(source_file.path)
+            inserted.append((source_file, rows))
+            continue
+
+        _, _, _, sample_id, spectrum_id = manifest[source_file.path]
+        if rows is not None:
+            # A modified file, its rows are replaced keeping their identifiers.
+            updated.append(source_file.path)
+            sample_row, signature_row = rows
+            connection.execute("DELETE FROM Samples WHERE SampleID = ?", (sample_id,))
+            connection.execute("DELETE FROM Spectra WHERE SpectrumID = ?", (spectrum_id,))
+            if grids is not None:
+                signature_row, values_row = _to_compact_rows(connection, grids, signature_row)
+                connection.execute("REPLACE INTO SpectraValues VALUES (?, ?, ?)",
+                                   (spectrum_id,) + values_row)
+            connection.execute(_INSERT_SAMPLE_SQL, (sample_id,) + sample_row)
+            connection.execute(_INSERT_SIGNATURE_SQL, (spectrum_id, sample_id) + signature_row)
+        # Touched files with the same content only get their new size and modification time.
+        connection.execute("REPLACE INTO SourceFiles VALUES (?, ?, ?, ?, ?, ?)",
+                           tuple(source_file) + (sample_id, spectrum_id))
+
+    next_id = 1 + max(connection.execute("SELECT max(SpectrumID) FROM Spectra").fetchone()[0] or 0,
+                      connection.execute("SELECT max(SampleID) FROM Samples").fetchone()[0] or 0)
+    _insert_records(connection, iter(inserted), next_id, grids)
+    return added, updated
+
+
+def _delete_sources(connection, manifest, deleted, compact):
+    for name in deleted:
+        _, _, _, sample_id, spectrum_id = manifest[name]
+        connection.execute("DELETE FROM Spectra WHERE SpectrumID = ?", (spectrum_id,))
+        connection.execute("DELETE FROM Samples WHERE SampleID = ?", (sample_id,))
+        connection.execute("DELETE FROM SourceFiles WHERE Path = ?", (name,))
+        if compact:
+            connection.execute("DELETE FROM SpectraValues WHERE SpectrumID = ?", (spectrum_id,))
+
+    if compact:
+        connection.execute("DELETE FROM WavelengthGrids WHERE GridID NOT IN "
+                           "(SELECT GridID FROM SpectraValues)")
+
+
+def _to_compact_rows(connection, grids, signature_row):
+    # Returns the Spectra row without the XData and YData and the (GridID, Responses) row,
+    # adding the wavelength grid of the spectrum if it is new.
+    wavelengths, spectral_responses = convert_units(
+        np.frombuffer(signature_row[-2], dtype=np.float32),
+        np.frombuffer(signature_row[-1], dtype=np.float32))
+
+    wavelengths = wavelengths.tobytes()
+    if wavelengths not in grids:
+        cursor = connection.execute("INSERT INTO WavelengthGrids (NumValues, Wavelengths) "
+                                    "VALUES (?, ?)", (signature_row[-3], wavelengths))
+        grids[wavelengths] = cursor.lastrowid
+
+    return signature_row[:-2] + (b'', b''), \
+        (grids[wavelengths], spectral_responses.astype(np.float32).tobytes())
+
+
+def _insert_records(connection, records, first_id, grids=None):
+    # The rows are inserted in the transaction of the caller. Each spectrum file has one
+    # sample and one spectrum, which are given the same identifier. The grids are given
+    # for compact databases.
+    identifiers = it.count(first_id)
+    while True:
+        batch = list(it.islice(records, _INSERT_BATCH_SIZE))
+        if not batch:
+            return
+
+        samples, signatures, source_files, values = [], [], [], []
+        for (source_file, (sample, signature)), row_id in zip(batch, identifiers):
+            if grids is not None:
+                signature, values_row = _to_compact_rows(connection, grids, signature)
+                values.append((row_id,) + values_row)
+            samples.append((row_id,) + sample)
+            signatures.append((row_id, row_id) + signature)
+            source_files.append(tuple(source_file) + (row_id, row_id))
+
+        if grids is not None:
+            connection.executemany("INSERT INTO SpectraValues VALUES (?, ?, ?)", values)
+        connection.executemany(_INSERT_SAMPLE_SQL, samples)
+        connection.executemany(_INSERT_SIGNATURE_SQL, signatures)
+        connection.executemany("INSERT INTO SourceFiles VALUES (?, ?, ?, ?, ?, ?)", source_files)
+
+
+def _get_stat(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def _read_source_file(filename, known_sha256=None):
+    # Returns the manifest entry of a spectrum file and its rows, or None as the rows
+    # if its content has the known hash.
+    size, modified_time = _get_stat(filename)
+    with open(filename, 'rb') as source_file:
+        sha256 = hashlib.sha256(source_file.read()).hexdigest()
+
+    rows = None if sha256 == known_sha256 else _parse_spectrum_file(filename)
+    return _SourceFile(os.path.basename(filename), size, modified_time, sha256), rows
+
+
+def _parse_spectrum_file(filename):
+    # Returns the Samples and Spectra rows of a spectrum file without the identifiers,
+    # with the same values as EcostressDatabase._import_files.
+    signature = read_ecostress_file(filename)
+    sample = signature.sample
+    measurement = signature.measurement
+
+    # EcostressDatabase never detects liquids, so every sample with a particle size is solid.
+    phase = 'solid' if 'particle size' in sample else 'unknown'
+    subclass = sample.get('subclass', 'none')
+    if subclass == 'none' and 'genus' in sample:
+        subclass = sample['genus']
+
+    y_unit = measurement['y units']
+    if y_unit.find('reflectence') > -1:
+        y_unit = 'reflectance (percent)'
+    elif y_unit.find('trans') == 0:
+        y_unit = 'transmittance (percent)'
+    measurement_name = measurement['measurement']
+    if measurement_name[0] == 't':
+        measurement_name = 'transmittance'
+
+    sample_row = (sample['name'], sample['type'], sample['class'], subclass,
+                  sample.get('particle size', 'none'), sample.get('sample no.', ''),
+                  sample['owner'], sample['origin'], phase, sample['description'])
+    signature_row = (-1, os.path.basename(filename).split('.')[-3], 'lab', measurement_name,
+                     measurement['x units'], y_unit, measurement['first x value'],
+                     measurement['last x value'], len(signature.x),
+                     array.array('f', signature.x).tobytes(),
+                     array.array('f', signature.y).tobytes())
+    return sample_row, signature_row
 
 
 def _main():
@@ -41,7 +380,11 @@ def _main():
         error_msg = f'The provided ecostress data directory "{ecostress_dir}" does not exist!'
         raise RuntimeError(error_msg)
 
-    generate_ecostress_db(ecostress_dir, output_db_filename)
+    if args.update:
+        update_ecostress_db(ecostress_dir, output_db_filename)
+    else:
+        generate_ecostress_db(ecostress_dir, output_db_filename, args.parallel,
+                              compact=args.compact)
 
 
 def _parse_args():
@@ -50,6 +393,12 @@ def _parse_args():
                         help="Ecostress data directory")
     parser.add_argument('-o', '--out', required=False, type=str, default=_DB_FILENAME,
                         help="The filename that will be used to store the SQLite database")
+    parser.add_argument('-p', '--parallel', action='store_true',
+                        help="Parse the files in parallel and insert them in one transaction")
+    parser.add_argument('-u', '--update', action='store_true',
+                        help="Update a database generated with --parallel with the changed files")
+    parser.add_argument('-c', '--compact', action='store_true',
+                        help="Store every distinct wavelength grid once (implies --parallel)")
 
     return parser.parse_args()
 
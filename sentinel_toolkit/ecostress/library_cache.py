@@ -0,0 +1,141 @@
+"""
+library_cache provides an on-disk cache of the Ecostress library resampled onto a grid.
+The spectrum ids, the (spectra x wavelengths) matrix and the valid wavelength range
+of each spectrum are saved as .npy files, keyed by the SHA-256 of the database file
+(hashed again only when its size or modification time change), the grid, the resampling
+method and the type, so later runs and parallel workers memory-map them read-only
+instead of reading and resampling the database again.
+"""
+
+import hashlib
+import os
+import shutil
+import tempfile
+from collections import namedtuple
+from pathlib import Path
+
+import numpy as np
+
+from sentinel_toolkit.colorimetry.spectral_data import SpectralData
+from sentinel_toolkit.file_cache import get_cache_dir, get_file_sha256
+
+EcostressLibrary = namedtuple("EcostressLibrary", "spectrum_ids spectral_data valid_ranges")
+
+_CACHE_FORMAT_VERSION = 1
+_LIBRARY_ARRAYS = ("spectrum_ids", "wavelengths", "spectral_responses", "valid_ranges")
+
+
+def get_library_cache_path(db_filename, cache_dir, grid, method, dtype):
+    """
+    Returns the cache directory of a resampled library.
+
+    Parameters
+    ----------
+    db_filename : str or Path
+                  The Ecostress SQLite database filename.
+    cache_dir : str or bool
+                The cache root directory. If missing, $SENTINEL_TOOLKIT_CACHE_DIR or
+                ~/.cache/sentinel_toolkit will be used. If False, there is no cache.
+    grid : SpectralGrid
+           The grid the library is resampled onto.
+    method : str
+             The resampling method.
+    dtype : data-type
+            The type of the spectral responses.
+    Returns
+    -------
+    output : Path
+             The cache directory, or None if there is no cache.
+    """
+    cache_dir = get_cache_dir(cache_dir)
+    if cache_dir is None or not db_filename:
+        return None
+
+    db_sha256 = get_file_sha256(db_filename, cache_dir)
+
+    settings_sha256 = hashlib.sha256(grid.wavelengths.tobytes())
+    settings_sha256.update(f"{method}-{np.dtype(dtype).str}".encode())
+
+    return cache_dir / "ecostress" / f"v{_CACHE_FORMAT_VERSION}-{db_sha256}" \
+        / settings_sha256.hexdigest()[:32]
+
+
+def read_library(cache_path):
+    """
+    Memory-maps a cached library read-only.
+
+    Parameters
+    ----------
+    cache_path : Path
+                 The cache directory.
+    Returns
+    -------
+    output : EcostressLibrary (tuple)
+             The cached library, or None if it is missing.
+    """
+    if cache_path is None:
+        return None
+    try:
+        arrays = [np.load(cache_path / f"{name}.npy", mmap_mode='r') for name in _LIBRARY_ARRAYS]
+    except (OSError, ValueError):
+        return None
+
+    spectrum_ids, wavelengths, spectral_responses, valid_ranges = arrays
+    return EcostressLibrary(spectrum_ids, SpectralData(wavelengths, spectral_responses),
+                            valid_ranges)
+
+
+def write_library(cache_path, library):
+    """
+    Writes a library to the cache. The arrays are written to a temporary directory,
+    which is then renamed, so concurrent readers never see a partial library.
+    The cache is only an optimization, so a read-only or full disk is not an error.
+
+    Parameters
+    ----------
+    cache_path : Path
+                 The cache directory.
+    library : EcostressLibrary (tuple)
+              The library to cache.
+    """
+    if cache_path is None:
+        return
+
+    arrays = (library.spectrum_ids, library.spectral_data.wavelengths,
+              library.spectral_data.spectral_responses, library.valid_ranges)
+    tmp_path = None
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = Path(tempfile.mkdtemp(dir=cache_path.parent, suffix=".tmp"))
+        for name, array in zip(_LIBRARY_ARRAYS, arrays):
+            np.save(tmp_path / f"{name}.npy", np.ascontiguousarray(array))
+        os.rename(tmp_path, cache_path)
+    except OSError:
+        # Either the disk is not writable or another process has just cached the library.
+        if tmp_path is not None:
+            shutil.rmtree(tmp_path, ignore_errors=True)
+
+
+def get_valid_ranges(wavelengths, mask):
+    """
+    Returns the first and last valid wavelength of each spectrum.
+
+    Parameters
+    ----------
+    wavelengths : ndarray
+                  The grid wavelengths.
+    mask : ndarray
+           The (spectra x wavelengths) boolean mask of the valid values.
+    Returns
+    -------
+    output : ndarray
+             The (spectra x 2) valid wavelength ranges, NaN for spectra without valid values.
+    """
+    valid_ranges = np.full((len(mask), 2), np.nan)
+    has_values = mask.any(axis=1)
+
+    first = np.argmax(mask, axis=1)
+    last = mask.shape[1] - 1 - np.argmax(mask[:, ::-1], axis=1)
+    valid_ranges[has_values, 0] = wavelengths[first[has_values]]
+    valid_ranges[has_values, 1] = wavelengths[last[has_values]]
+    return valid_ranges
@@ -0,0 +1,129 @@
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+from numpy.testing import assert_array_equal
+from spectral import EcostressDatabase
+
+from sentinel_toolkit.ecostress import Ecostress
+from sentinel_toolkit.ecostress import EcostressCatalog
+from sentinel_toolkit.ecostress.catalog import create_metadata_indexes, get_support
+
+
+class TestEcostressCatalog(unittest.TestCase):
+    # (type, class, subclass, min and max wavelength in micrometers)
+    _SAMPLES = [("Vegetation", "Tree", "Conifer", 0.35, 2.5),
+                ("vegetation", "Shrub", "Shrub", 0.40, 0.86),
+                ("Mineral", "Silicate", "Tectosilicate", 2.0, 15.0),
+                ("Soil", "Mollisol", "Cryoboroll", 0.30, 1.0)]
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_filename = str(Path(self.temp_dir, "ecostress.db"))
+        self.ecostress_db = EcostressDatabase.create(self.db_filename)
+        for sample_type, sample_class, subclass, min_wavelength, max_wavelength in self._SAMPLES:
+            sample_id = self.ecostress_db._add_sample("name", sample_type, sample_class, subclass,
+                                                      "size", "1", "owner", "origin", "solid", "")
+            self.ecostress_db._add_signature(sample_id, -1, "instrument", "lab", "reflectance",
+                                             "micrometers", "percent", min_wavelength,
+                                             max_wavelength, [min_wavelength, max_wavelength],
+                                             [1.0, 1.0])
+        self.catalog = EcostressCatalog.from_db(self.ecostress_db)
+
+    def tearDown(self):
+        self.ecostress_db.db.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_from_db(self):
+        assert_array_equal([1, 2, 3, 4], self.catalog.spectrum_ids)
+        assert_array_equal([[350, 2500], [400, 860], [2000, 15000], [300, 1000]],
+                           self.catalog.wavelength_ranges)
+        assert_array_equal(["mineral", "soil", "vegetation"], self.catalog.get_categories("types"))
+
+    def test_from_db_does_not_create_indexes(self):
+        sql = "select name from sqlite_master where type = 'index' and name like '%Index'"
+        self.assertEqual([], self.ecostress_db.query(sql).fetchall())
+
+    def test_create_metadata_indexes(self):
+        create_metadata_indexes(self.ecostress_db.db)
+
+        sql = "select name from sqlite_master where type = 'index' and name like '%Index'"
+        names = {row[0] for row in self.ecostress_db.query(sql).fetchall()}
+        self.assertEqual({"SpectraSampleIDIndex", "SpectraWavelengthIndex", "SamplesTypeIndex"},
+                         names)
+
+    def test_get_catalog_creates_indexes_on_request(self):
+        ecostress = Ecostress(self.ecostress_db)
+        sql = "select name from sqlite_master where type = 'index' and name like '%Index'"
+
+        ecostress.get_catalog()
+        self.assertEqual([], self.ecostress_db.query(sql).fetchall())
+
+        self.assertIs(ecostress.get_catalog(), ecostress.get_catalog(create_indexes=True))
+        self.assertEqual(3, len(self.ecostress_db.query(sql).fetchall()))
+
+    def test_create_metadata_indexes_on_read_only_db(self):
+        read_only = sqlite3.connect(f"file:{self.db_filename}?mode=ro", uri=True)
+        self.assertRaises(sqlite3.OperationalError, create_metadata_indexes, read_only)
+        read_only.close()
+
+    def test_from_read_only_db(self):
+        read_only_db = EcostressDatabase()
+        read_only_db.db = sqlite3.connect(f"file:{self.db_filename}?mode=ro", uri=True)
+        read_only_db.cursor = read_only_db.db.cursor()
+
+        catalog = EcostressCatalog.from_db(read_only_db)
+
+        self.assertEqual(4, len(catalog))
+        read_only_db.db.close()
+
+    def test_is_in(self):
+        assert_array_equal([True, True, False, False], self.catalog.is_in("types", "VEGETATION"))
+        assert_array_equal([False, False, True, True],
+                           self.catalog.is_in("types", ["mineral", "soil", "unknown"]))
+
+    def test_is_in_unknown_column(self):
+        self.assertRaises(ValueError, self.catalog.is_in, "phases", "solid")
+
+    def test_overlapping_matches_get_spectrum_ids(self):
+        for wavelength_range in [(360, 830), (870, 1500), (1000, 1000), (20000, 30000)]:
+            expected = Ecostress(self.ecostress_db).get_spectrum_ids(wavelength_range)
+            actual = self.catalog.spectrum_ids[self.catalog.overlapping(wavelength_range)]
+            assert_array_equal(expected, actual)
+
+    def test_get_coverage(self):
+        coverage = self.catalog.get_coverage((800, 900))
+        np.testing.assert_array_almost_equal([1, 0.6, 0, 1], coverage)
+
+    def test_get_spectrum_ids(self):
+        spectrum_ids = self.catalog.get_spectrum_ids(types="vegetation",
+                                                     wavelength_range=(848, 881),
+                                                     min_coverage=0.95)
+        assert_array_equal([1], spectrum_ids)
+
+    def test_get_spectrum_ids_composite(self):
+        mask = self.catalog.is_in("classes", ["tree", "silicate", "mollisol"])
+        spectrum_ids = self.catalog.get_spectrum_ids(mask, sample_ids=[1, 3, 4],
+                                                     wavelength_range=(360, 830))
+        assert_array_equal([1, 4], spectrum_ids)
+
+    def test_get_spectrum_ids_unknown_predicate(self):
+        self.assertRaises(TypeError, self.catalog.get_spectrum_ids, wavelength_range=(848, 881),
+                          min_coverge=0.95)
+
+    def test_get_catalog_is_cached(self):
+        ecostress = Ecostress(self.ecostress_db)
+        self.assertIs(ecostress.get_catalog(), ecostress.get_catalog())
+
+    def test_get_support(self):
+        wavelengths = np.arange(840, 890)
+        response = np.where((wavelengths >= 848) & (wavelengths <= 881), 0.5, 0)
+        self.assertEqual((848, 881), get_support(wavelengths, response))
+        self.assertRaises(ValueError, get_support, wavelengths, np.zeros(50))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import multiprocessing
+import shutil
+import sqlite3
+import tempfile
+import threading
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+from numpy.testing import assert_array_equal
+from spectral import EcostressDatabase
+
+from sentinel_toolkit.ecostress import Ecostress
+from sentinel_toolkit.ecostress import EcostressConnectionPool
+
+
+def _read_in_child(pool, parent_db, results):
+    results.put((pool.get_database() is not parent_db,
+                 Ecostress(pool).get_spectrum_ids((430, 450))))
+
+
+class TestEcostressConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_filename = str(Path(self.temp_dir, "ecostress.db"))
+
+        ecostress_db = EcostressDatabase.create(self.db_filename)
+        for i in range(20):
+            x = [0.430 + 0.001 * j for j in range(21)]
+            sample_id = ecostress_db._add_sample(f"name {i}", "type", "class", "subclass", "size",
+                                                 "1", "owner", "origin", "solid", "description")
+            ecostress_db._add_signature(sample_id, -1, "instrument", "lab", "reflectance",
+                                        "micrometers", "percent", min(x), max(x), x,
+                                        [i + j for j in range(21)])
+        ecostress_db.db.close()
+
+        self.pool = EcostressConnectionPool(self.db_filename)
+
+    def tearDown(self):
+        self.pool.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_get_database_per_thread(self):
+        databases = []
+
+        def get_databases():
+            databases.append((self.pool.get_database(), self.pool.get_database()))
+
+        threads = [threading.Thread(target=get_databases) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(all(first is second for first, second in databases))
+        self.assertEqual(4, len({id(first) for first, _ in databases}))
+
+    def test_concurrent_readers(self):
+        ecostress = Ecostress(self.pool)
+        spectrum_ids = list(range(1, 21)) * 10
+        expected = [ecostress.get_spectral_distribution_numpy(spectrum_id, (430, 450))
+                    for spectrum_id in spectrum_ids]
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            actual = list(executor.map(
+                lambda spectrum_id: ecostress.get_spectral_distribution_numpy(spectrum_id,
+                                                                             (430, 450)),
+                spectrum_ids))
+            batches = list(executor.map(lambda chunk: ecostress.get_spectra(chunk),
+                                        [spectrum_ids[i:i + 7] for i in range(0, 200, 7)]))
+
+        for expected_data, actual_data in zip(expected, actual):
+            assert_array_equal(expected_data.spectral_responses, actual_data.spectral_responses)
+        self.assertEqual(len(spectrum_ids), sum(len(batch) for batch in batches))
+
+    def test_read_only(self):
+        with self.assertRaises(sqlite3.OperationalError):
+            self.pool.query("DELETE FROM Spectra")
+
+    def test_immutable(self):
+        with EcostressConnectionPool(self.db_filename, immutable=True) as pool:
+            self.assertEqual(list(range(1, 21)), Ecostress(pool).get_spectrum_ids((430, 450)))
+
+    def test_from_file(self):
+        ecostress = Ecostress.from_file(self.db_filename, cache_dir=False)
+
+        library = ecostress.get_library()
+
+        assert_array_equal(np.arange(1, 21), library.spectrum_ids)
+        ecostress.ecostress_db.close()
+
+    def test_forked_worker(self):
+        parent_db = self.pool.get_database()
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+
+        process = context.Process(target=_read_in_child, args=(self.pool, parent_db, results))
+        process.start()
+        has_own_database, spectrum_ids = results.get(timeout=30)
+        process.join()
+
+        self.assertTrue(has_own_database)
+        self.assertEqual(list(range(1, 21)), spectrum_ids)
+
+    def test_forked_worker_while_lock_is_held(self):
+        parent_db = self.pool.get_database()
+        context = multiprocessing.get_context("fork")
+        results = context.Queue()
+
+        # Another thread of the parent holds the lock when the process forks.
+        with self.pool._lock:
+            process = context.Process(target=_read_in_child, args=(self.pool, parent_db, results))
+            process.start()
+        try:
+            has_own_database, spectrum_ids = results.get(timeout=30)
+        finally:
+            process.join(timeout=30)
+            process.kill()
+
+        self.assertTrue(has_own_database)
+        self.assertEqual(list(range(1, 21)), spectrum_ids)
+
+    def test_missing_file(self):
+        with self.assertRaises(ValueError):
+            EcostressConnectionPool(Path(self.temp_dir, "missing.db"))
+
+
+if __name__ == '__main__':
+    unittest.main()
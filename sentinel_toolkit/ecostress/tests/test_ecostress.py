@@ -1,10 +1,13 @@
+import array
+import sqlite3
 import unittest
-from unittest.mock import patch
+from unittest.mock import MagicMock, patch
 
 import numpy as np
 from spectral import EcostressDatabase
 from spectral.database.aster import Signature
 
+from sentinel_toolkit.colorimetry import SpectralGrid
 from sentinel_toolkit.ecostress import Ecostress
 
 from numpy.testing import assert_array_equal
@@ -19,6 +22,7 @@ class TestEcostress(unittest.TestCase):
         select SpectrumID 
         from Spectra
         where MinWaveLength <= ? and MaxWaveLength >= ?
+        order by SpectrumID
          """
 
     _SPECTRUM_ID = 0
@@ -63,6 +67,19 @@ class TestEcostress(unittest.TestCase):
         assert_array_equal(self._SIGNATURE_LEN_7.x[0:-1] * 1000, sd.wavelengths)
         assert_array_almost_equal(self._SIGNATURE_LEN_7.y[0:-1] / 100, sd.values)
 
+    def test_get_spectral_distribution_colour_descending_wavelengths(self):
+        signature = Signature()
+        signature.x = self._SIGNATURE_LEN_6.x[::-1]
+        signature.y = self._SIGNATURE_LEN_6.y[::-1]
+        ecostress_db = MagicMock()
+        ecostress_db.get_signature.return_value = signature
+
+        ecostress = Ecostress(ecostress_db)
+        sd = ecostress.get_spectral_distribution_colour(self._SPECTRUM_ID)
+
+        assert_array_equal(self._SIGNATURE_LEN_6.x * 1000, sd.wavelengths)
+        assert_array_almost_equal(self._SIGNATURE_LEN_6.y / 100, sd.values)
+
     @patch.object(EcostressDatabase, 'get_signature')
     def test_get_spectral_distribution_numpy(self, mock_ecostress_db):
         mock_ecostress_db.get_signature.return_value = self._SIGNATURE_LEN_6
@@ -84,6 +101,146 @@ class TestEcostress(unittest.TestCase):
         assert_array_equal(self._SIGNATURE_LEN_7.x[0:-1] * 1000, wavelengths)
         assert_array_almost_equal(self._SIGNATURE_LEN_7.y[0:-1] / 100, spectral_responses)
 
+    @patch.object(EcostressDatabase, 'get_signature')
+    def test_get_spectral_distribution_numpy_float32(self, mock_ecostress_db):
+        mock_ecostress_db.get_signature.return_value = self._SIGNATURE_LEN_6
+
+        ecostress = Ecostress(mock_ecostress_db)
+        _, spectral_responses = ecostress.get_spectral_distribution_numpy(self._SPECTRUM_ID, dtype=np.float32)
+
+        self.assertEqual(np.float32, spectral_responses.dtype)
+        assert_array_almost_equal(self._SIGNATURE_LEN_6.y / 100, spectral_responses)
+
+    @patch.object(EcostressDatabase, 'get_signature')
+    def test_get_spectral_distribution_numpy_with_grid(self, mock_ecostress_db):
+        mock_ecostress_db.get_signature.return_value = self._SIGNATURE_LEN_7
+
+        ecostress = Ecostress(mock_ecostress_db)
+        wavelengths, spectral_responses = ecostress.get_spectral_distribution_numpy(self._SPECTRUM_ID,
+                                                                                    grid=SpectralGrid(430, 450, 2))
+
+        assert_array_equal([438, 440, 442, 444], wavelengths)
+        assert_array_almost_equal(self._SIGNATURE_LEN_7.y[::2] / 100, spectral_responses)
+
+    def _mock_bulk_db(self):
+        rows = [(spectrum_id, array.array('f', signature.x).tobytes(),
+                 array.array('f', signature.y).tobytes())
+                for spectrum_id, signature in [(1, self._SIGNATURE_LEN_6), (2, self._SIGNATURE_LEN_7)]]
+
+        ecostress_db = MagicMock()
+        ecostress_db.query.side_effect = lambda sql, args: [row for row in rows if row[0] in args]
+        return ecostress_db
+
+    def test_get_spectra_numpy(self):
+        ecostress_db = self._mock_bulk_db()
+
+        ecostress = Ecostress(ecostress_db, compact=False)
+        spectra = ecostress.get_spectra_numpy([2, 1], chunk_size=1)
+
+        self.assertEqual(2, ecostress_db.query.call_count)
+        assert_array_equal([2, 1], spectra.spectrum_ids)
+        assert_array_equal([0, 7, 13], spectra.offsets)
+        assert_array_almost_equal(self._SIGNATURE_LEN_6.y, spectra.get(1).spectral_responses, decimal=5)
+
+    def test_get_spectra_numpy_missing_spectrum(self):
+        ecostress = Ecostress(self._mock_bulk_db())
+        with self.assertRaises(ValueError):
+            ecostress.get_spectra_numpy([1, 3])
+
+    def test_get_spectral_distributions_numpy(self):
+        ecostress_db = self._mock_bulk_db()
+        ecostress_db.get_signature.return_value = self._SIGNATURE_LEN_7
+
+        ecostress = Ecostress(ecostress_db)
+        actual = ecostress.get_spectral_distributions_numpy([1, 2], wavelength_rage=(438, 443))
+        expected = ecostress.get_spectral_distribution_numpy(2, wavelength_rage=(438, 443))
+
+        self.assertEqual(2, len(actual))
+        assert_array_equal(expected.wavelengths, actual[1].wavelengths)
+        assert_array_almost_equal(expected.spectral_responses, actual[1].spectral_responses)
+
+    def test_get_resampled_spectra(self):
+        ecostress_db = self._mock_bulk_db()
+        ecostress_db.get_signature.side_effect = \
+            lambda spectrum_id: [self._SIGNATURE_LEN_6, self._SIGNATURE_LEN_7][spectrum_id - 1]
+
+        ecostress = Ecostress(ecostress_db)
+        spectral_data, mask = ecostress.get_resampled_spectra([1, 2], grid=SpectralGrid(430, 450, 1))
+
+        self.assertEqual((2, 21), spectral_data.spectral_responses.shape)
+        for i, spectrum_id in enumerate([1, 2]):
+            expected = ecostress.get_spectral_distribution_numpy(spectrum_id)
+            assert_array_equal(expected.wavelengths, spectral_data.wavelengths[mask[i]])
+            assert_array_almost_equal(expected.spectral_responses,
+                                      spectral_data.spectral_responses[i][mask[i]])
+
+    def _sqlite_db(self, count):
+        connection = sqlite3.connect(":memory:")
+        connection.execute("CREATE TABLE Spectra (SpectrumID INTEGER PRIMARY KEY, "
+                           "MinWaveLength FLOAT, MaxWaveLength FLOAT, XData BLOB, YData BLOB)")
+        for spectrum_id in range(1, count + 1):
+            signature = self._SIGNATURE_LEN_6 if spectrum_id % 2 else self._SIGNATURE_LEN_7
+            connection.execute("INSERT INTO Spectra VALUES (?, ?, ?, ?, ?)",
+                               (spectrum_id, min(signature.x), max(signature.x),
+                                array.array('f', signature.x).tobytes(),
+                                array.array('f', signature.y * spectrum_id).tobytes()))
+
+        ecostress_db = MagicMock()
+        ecostress_db.query.side_effect = connection.execute
+        return ecostress_db
+
+    def test_iter_batches(self):
+        ecostress = Ecostress(self._sqlite_db(7))
+        grid = SpectralGrid(430, 450, 1)
+
+        batches = list(ecostress.iter_batches(grid=grid, batch_size=3))
+
+        self.assertEqual([3, 3, 1], [len(batch.spectrum_ids) for batch in batches])
+        assert_array_equal(np.arange(1, 8), np.concatenate([batch.spectrum_ids for batch in batches]))
+
+        expected, expected_mask = ecostress.get_resampled_spectra(range(1, 8), grid)
+        assert_array_equal(expected.spectral_responses,
+                           np.vstack([batch.spectral_data.spectral_responses for batch in batches]))
+        assert_array_equal(expected_mask, np.vstack([batch.mask for batch in batches]))
+
+    def test_iter_batches_fetches_lazily(self):
+        ecostress_db = self._sqlite_db(7)
+        ecostress = Ecostress(ecostress_db, compact=False)
+
+        batches = ecostress.iter_batches(grid=SpectralGrid(430, 450, 1), batch_size=2)
+        first = next(batches)
+
+        assert_array_equal([1, 2], first.spectrum_ids)
+        self.assertEqual(1, ecostress_db.query.call_count)
+
+    def test_iter_batches_with_interleaved_queries(self):
+        ecostress_db = self._sqlite_db(7)
+        # Like spectral's databases, all the queries share one cursor.
+        cursor = ecostress_db.query.side_effect.__self__.cursor()
+        ecostress_db.query.side_effect = lambda sql, args=(): cursor.execute(sql, args)
+        ecostress = Ecostress(ecostress_db)
+
+        spectrum_ids = []
+        for batch in ecostress.iter_batches(grid=SpectralGrid(430, 450, 1), batch_size=2):
+            ecostress.get_spectra_numpy([7])
+            spectrum_ids.extend(batch.spectrum_ids)
+
+        assert_array_equal(np.arange(1, 8), spectrum_ids)
+
+    def test_iter_batches_outside_of_grid(self):
+        ecostress = Ecostress(self._sqlite_db(3))
+        self.assertEqual([], list(ecostress.iter_batches(grid=SpectralGrid(500, 600, 1))))
+
+    def test_iter_batches_with_spectrum_ids(self):
+        ecostress = Ecostress(self._sqlite_db(7))
+
+        batches = list(ecostress.iter_batches([7, 2, 5], SpectralGrid(430, 450, 1), batch_size=2,
+                                              dtype=np.float32))
+
+        assert_array_equal([7, 2], batches[0].spectrum_ids)
+        assert_array_equal([5], batches[1].spectrum_ids)
+        self.assertEqual(np.float32, batches[0].spectral_data.spectral_responses.dtype)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,18 +1,261 @@
+import os
+import shutil
+import sqlite3
+import tempfile
 import unittest
+from pathlib import Path
 from unittest.mock import patch
 
+import numpy as np
+from numpy.testing import assert_array_equal, assert_array_almost_equal
+from spectral import EcostressDatabase
+
+from sentinel_toolkit.colorimetry import SpectralGrid
+
+from sentinel_toolkit.ecostress import Ecostress
 from sentinel_toolkit.ecostress import generate_ecostress_db
+from sentinel_toolkit.ecostress import update_ecostress_db
+
+_SPECTRUM_FILE = """Name: {name}
+Type: {type}
+Class: {class_}
+Genus: Abies
+Particle Size: {particle_size}
+Sample No.: VH{index}
+Owner: JHU
+Wavelength Range: VSWIR
+Origin: Santa Barbara
+Description: A test spectrum
+Measurement: {measurement}
+First Column: X
+Second Column: Y
+X Units: Wavelength (micrometers)
+Y Units: {y_units}
+First X Value: 2.5
+Last X Value: 0.35
+Number of X Values: 4
+
+{data}"""
+
+_SPECTRUM_DATA = """2.5 {y0}
+1.2 5.5
+0.44 10.25
+0.35 4.5
+"""
 
 
 class TestEcostressDbGenerator(unittest.TestCase):
     _DB_FILENAME = "ecostress.db"
     _ECOSTRESS_DATA_DIRECTORY = "ecospeclib-all"
 
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.data_dir = Path(self.temp_dir, "data")
+        self.data_dir.mkdir()
+        for index in range(25):
+            self._write_spectrum(index, index + 0.5)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
     @patch('spectral.EcostressDatabase.create')
     def test_generate_ecostress_db(self, mock_ecostress_database_create):
         generate_ecostress_db(self._ECOSTRESS_DATA_DIRECTORY, self._DB_FILENAME)
         mock_ecostress_database_create.assert_called_once_with(self._DB_FILENAME, self._ECOSTRESS_DATA_DIRECTORY)
 
+    def test_generate_ecostress_db_creates_indexes(self):
+        db_filename = str(Path(self.temp_dir, "serial.db"))
+        generate_ecostress_db(str(self.data_dir), db_filename)
+
+        ecostress_db = EcostressDatabase(db_filename)
+        sql = "select name from sqlite_master where type = 'index' and name like '%Index'"
+        self.assertEqual({"SpectraSampleIDIndex", "SpectraWavelengthIndex", "SamplesTypeIndex"},
+                         {row[0] for row in ecostress_db.query(sql).fetchall()})
+        self.assertEqual(1, ecostress_db.query("select count(*) from sqlite_master "
+                                               "where name = 'sqlite_stat1'").fetchone()[0])
+        ecostress_db.db.close()
+
+    def test_generate_ecostress_db_parallel(self):
+        serial_filename = str(Path(self.temp_dir, "serial.db"))
+        parallel_filename = str(Path(self.temp_dir, "parallel.db"))
+
+        generate_ecostress_db(str(self.data_dir), serial_filename)
+        generate_ecostress_db(str(self.data_dir), parallel_filename, parallel=True, max_workers=2)
+
+        self.assertEqual(self._read_rows(serial_filename), self._read_rows(parallel_filename))
+        self.assertFalse(Path(f"{parallel_filename}.tmp").exists())
+
+        ecostress_db = EcostressDatabase(parallel_filename)
+        signature = ecostress_db.get_signature(1)
+        self.assertEqual([0.35, 0.44, 1.2, 2.5], [round(x, 4) for x in signature.x])
+        self.assertEqual(list(range(1, 26)), Ecostress(ecostress_db).get_spectrum_ids())
+
+        sql = "select name from sqlite_master where type = 'index' and name like '%Index'"
+        self.assertEqual(3, len(ecostress_db.query(sql).fetchall()))
+        ecostress_db.db.close()
+
+    def test_generate_ecostress_db_parallel_existing_output(self):
+        output_filename = Path(self.temp_dir, "ecostress.db")
+        output_filename.touch()
+        with self.assertRaises(RuntimeError):
+            generate_ecostress_db(str(self.data_dir), str(output_filename), parallel=True)
+
+    def test_generate_ecostress_db_parallel_stale_tmp(self):
+        output_filename = str(Path(self.temp_dir, "ecostress.db"))
+        generate_ecostress_db(str(self.data_dir), output_filename, parallel=True, max_workers=2)
+        expected = self._read_rows(output_filename)
+
+        # A killed build leaves its temporary database behind.
+        os.replace(output_filename, f"{output_filename}.tmp")
+        generate_ecostress_db(str(self.data_dir), output_filename, parallel=True, max_workers=2)
+
+        self.assertEqual(expected, self._read_rows(output_filename))
+        self.assertFalse(Path(f"{output_filename}.tmp").exists())
+
+    def test_generate_ecostress_db_parallel_invalid_file(self):
+        Path(self.data_dir, "invalid.spectrum.txt").write_text("Name: invalid\n", encoding='utf-8')
+        output_filename = Path(self.temp_dir, "ecostress.db")
+
+        with self.assertRaises(Exception):
+            generate_ecostress_db(str(self.data_dir), str(output_filename), parallel=True)
+        self.assertFalse(output_filename.exists())
+        self.assertFalse(Path(f"{output_filename}.tmp").exists())
+
+    def test_update_ecostress_db(self):
+        db_filename = str(Path(self.temp_dir, "ecostress.db"))
+        generate_ecostress_db(str(self.data_dir), db_filename, parallel=True, max_workers=2)
+
+        self._write_spectrum(3, 100.5)
+        self._write_spectrum(30, 30.5)
+        self._get_spectrum_path(7).unlink()
+        os.utime(self._get_spectrum_path(9), ns=(0, 0))
+
+        update = update_ecostress_db(str(self.data_dir), db_filename, max_workers=2)
+
+        self.assertEqual([self._get_spectrum_path(30).name], update.added)
+        self.assertEqual([self._get_spectrum_path(3).name], update.updated)
+        self.assertEqual([self._get_spectrum_path(7).name], update.deleted)
+
+        expected_filename = str(Path(self.temp_dir, "expected.db"))
+        generate_ecostress_db(str(self.data_dir), expected_filename, parallel=True)
+        self.assertEqual(self._read_rows(expected_filename), self._read_rows(db_filename))
+
+        ecostress_db = EcostressDatabase(db_filename)
+        # The updated spectrum keeps its identifier and the new one gets the next identifier.
+        self.assertEqual(100.5, ecostress_db.get_signature(4).y[-1])
+        self.assertEqual(26, ecostress_db.get_signature(26).sample_id)
+        ecostress_db.db.close()
+
+        self.assertEqual(([], [], []), update_ecostress_db(str(self.data_dir), db_filename))
+
+    def test_update_ecostress_db_missing_db(self):
+        db_filename = str(Path(self.temp_dir, "ecostress.db"))
+
+        update = update_ecostress_db(str(self.data_dir), db_filename, max_workers=2)
+
+        self.assertEqual(25, len(update.added))
+        self.assertTrue(Path(db_filename).exists())
+
+    def test_update_ecostress_db_without_manifest(self):
+        db_filename = str(Path(self.temp_dir, "ecostress.db"))
+        generate_ecostress_db(str(self.data_dir), db_filename)
+
+        with self.assertRaises(RuntimeError):
+            update_ecostress_db(str(self.data_dir), db_filename)
+
+    def test_generate_ecostress_db_compact(self):
+        self._write_spectrum(40, 0, "0.8 50.0\n0.6 40.0\n0.4 30.0\n0.3 20.0\n")
+        classic_filename = str(Path(self.temp_dir, "classic.db"))
+        compact_filename = str(Path(self.temp_dir, "compact.db"))
+        generate_ecostress_db(str(self.data_dir), classic_filename, parallel=True)
+        generate_ecostress_db(str(self.data_dir), compact_filename, compact=True, max_workers=2)
+
+        classic_db = EcostressDatabase(classic_filename)
+        compact_db = EcostressDatabase(compact_filename)
+        classic = Ecostress(classic_db)
+        compact = Ecostress(compact_db)
+
+        self.assertFalse(classic.compact)
+        self.assertTrue(compact.compact)
+
+        self.assertEqual(2, compact_db.query("select count(*) from WavelengthGrids").fetchone()[0])
+        self.assertEqual(0, compact_db.query("select sum(length(XData)) from Spectra").fetchone()[0])
+        self.assertEqual(classic.get_spectrum_ids(), compact.get_spectrum_ids())
+
+        spectrum_ids = classic.get_spectrum_ids()
+        grid = SpectralGrid(360, 830, 1)
+        for method in ["linear", "cubic"]:
+            expected, expected_mask = classic.get_resampled_spectra(spectrum_ids, grid, method)
+            actual, actual_mask = compact.get_resampled_spectra(spectrum_ids, grid, method)
+            assert_array_almost_equal(expected.spectral_responses, actual.spectral_responses)
+            assert_array_equal(expected_mask, actual_mask)
+
+        batches = list(compact.iter_batches(grid=grid, batch_size=10, method="cubic"))
+        assert_array_almost_equal(expected.spectral_responses,
+                                  np.vstack([batch.spectral_data.spectral_responses
+                                             for batch in batches]))
+
+        expected = classic.get_spectral_distribution_numpy(26, (360, 830))
+        actual = compact.get_spectral_distribution_numpy(26, (360, 830))
+        assert_array_equal(expected.wavelengths, actual.wavelengths)
+        assert_array_almost_equal(expected.spectral_responses, actual.spectral_responses)
+        assert_array_almost_equal(classic.get_spectral_distribution_colour(1).values,
+                                  compact.get_spectral_distribution_colour(1).values)
+
+        self.assertRaises(ValueError, compact.get_spectra_numpy, [1])
+        classic_db.db.close()
+        compact_db.db.close()
+
+    def test_update_ecostress_db_compact(self):
+        db_filename = str(Path(self.temp_dir, "ecostress.db"))
+        generate_ecostress_db(str(self.data_dir), db_filename, compact=True, max_workers=2)
+
+        self._write_spectrum(3, 0, "0.8 50.0\n0.3 20.0\n")
+        self._get_spectrum_path(5).unlink()
+        update = update_ecostress_db(str(self.data_dir), db_filename, max_workers=2)
+        self.assertEqual(([], [self._get_spectrum_path(3).name], [self._get_spectrum_path(5).name]),
+                         update)
+
+        ecostress_db = EcostressDatabase(db_filename)
+        spectra = Ecostress(ecostress_db).get_spectra([4])
+        assert_array_equal([300, 800], spectra.wavelengths)
+        assert_array_almost_equal([0.2, 0.5], spectra.spectral_responses)
+        self.assertEqual(2, ecostress_db.query("select count(*) from WavelengthGrids").fetchone()[0])
+        self.assertEqual(24, ecostress_db.query("select count(*) from SpectraValues").fetchone()[0])
+        ecostress_db.db.close()
+
+        self._write_spectrum(3, 1.5)
+        update_ecostress_db(str(self.data_dir), db_filename, max_workers=2)
+
+        ecostress_db = EcostressDatabase(db_filename)
+        self.assertEqual(1, ecostress_db.query("select count(*) from WavelengthGrids").fetchone()[0])
+        ecostress_db.db.close()
+
+    def _get_spectrum_path(self, index):
+        return Path(self.data_dir,
+                    f"vegetation.tree.abies.concolor.vswir.vh{index:03}.ucsb.asd.spectrum.txt")
+
+    def _write_spectrum(self, index, y0, data=None):
+        spectrum = _SPECTRUM_FILE.format(
+            name=f"Sample {index}", type="vegetation" if index % 2 else "mineral",
+            class_="tree", particle_size="solid" if index % 3 else "liquid", index=index,
+            measurement="transmittance" if index % 5 == 0 else "Hemispherical reflectance",
+            y_units="Reflectence (percent)" if index % 4 else "Reflectance (percent)",
+            data=data or _SPECTRUM_DATA.format(y0=y0))
+        self._get_spectrum_path(index).write_text(spectrum, encoding='iso-8859-1')
+
+    @staticmethod
+    def _read_rows(db_filename):
+        # The rows of both tables, matched by the sample names, since the file order may differ.
+        connection = sqlite3.connect(db_filename)
+        samples = connection.execute("select * from Samples").fetchall()
+        spectra = connection.execute("select * from Spectra").fetchall()
+        connection.close()
+
+        names = {sample[0]: sample[1] for sample in samples}
+        return (sorted(sample[1:] for sample in samples),
+                sorted((names[spectrum[1]],) + spectrum[2:] for spectrum in spectra))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,97 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+from numpy.testing import assert_array_equal, assert_array_almost_equal
+from spectral import EcostressDatabase
+
+from sentinel_toolkit.colorimetry import SpectralGrid
+from sentinel_toolkit.ecostress import Ecostress
+from sentinel_toolkit.ecostress.library_cache import get_valid_ranges
+
+
+class TestLibraryCache(unittest.TestCase):
+    _GRID = SpectralGrid(430, 450, 1)
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = Path(self.temp_dir, "cache")
+
+        self.db_filename = str(Path(self.temp_dir, "ecostress.db"))
+        self.ecostress_db = EcostressDatabase.create(self.db_filename)
+        for x, y in [([0.438, 0.439, 0.440, 0.441, 0.442, 0.443], [10.4, 10.42, 10.43, 10.44, 10.45, 10.46]),
+                     ([0.445, 0.444, 0.443, 0.442, 0.441, 0.440], [20.0, 20.1, 20.2, 20.3, 20.4, 20.5]),
+                     ([2.0, 2.5], [30.0, 31.0])]:
+            sample_id = self.ecostress_db._add_sample("name", "type", "class", "subclass", "size",
+                                                      "1", "owner", "origin", "solid", "description")
+            self.ecostress_db._add_signature(sample_id, -1, "instrument", "lab", "reflectance",
+                                             "micrometers", "percent", min(x), max(x), x, y)
+
+    def tearDown(self):
+        self.ecostress_db.db.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_get_library(self):
+        ecostress = Ecostress(self.ecostress_db, cache_dir=self.cache_dir)
+
+        library = ecostress.get_library(self._GRID)
+
+        assert_array_equal([1, 2], library.spectrum_ids)
+        assert_array_equal([[438, 443], [440, 445]], library.valid_ranges)
+        expected = ecostress.get_spectral_distribution_numpy(1, (430, 450))
+        assert_array_almost_equal(expected.spectral_responses, library.spectral_data.spectral_responses[0, 8:14])
+
+    def test_get_library_is_cached(self):
+        library = Ecostress(self.ecostress_db, cache_dir=self.cache_dir).get_library(self._GRID)
+
+        with patch.object(Ecostress, 'get_resampled_spectra') as mock_get_resampled_spectra:
+            cached = Ecostress(self.ecostress_db, cache_dir=self.cache_dir).get_library(self._GRID)
+            mock_get_resampled_spectra.assert_not_called()
+
+        self.assertIsInstance(cached.spectral_data.spectral_responses, np.memmap)
+        self.assertFalse(cached.spectral_data.spectral_responses.flags.writeable)
+        assert_array_equal(library.spectral_data.spectral_responses, cached.spectral_data.spectral_responses)
+
+    def test_database_is_hashed_only_when_it_changes(self):
+        Ecostress(self.ecostress_db, cache_dir=self.cache_dir).get_library(self._GRID)
+
+        with patch('sentinel_toolkit.file_cache.open', create=True, wraps=open) as mock_open:
+            Ecostress(self.ecostress_db, cache_dir=self.cache_dir).get_library(self._GRID)
+            mock_open.assert_not_called()
+
+            sample_id = self.ecostress_db._add_sample("name", "type", "class", "subclass", "size",
+                                                      "1", "owner", "origin", "solid", "description")
+            self.ecostress_db._add_signature(sample_id, -1, "instrument", "lab", "reflectance",
+                                             "micrometers", "percent", 0.44, 0.441, [0.44, 0.441], [1.0, 2.0])
+            self.ecostress_db.db.commit()
+            library = Ecostress(self.ecostress_db, cache_dir=self.cache_dir).get_library(self._GRID)
+            mock_open.assert_called_once()
+
+        assert_array_equal([1, 2, 4], library.spectrum_ids)
+        self.assertEqual(2, len(list(self.cache_dir.glob("ecostress/*/*"))))
+
+    def test_cache_is_keyed_on_grid_and_dtype(self):
+        ecostress = Ecostress(self.ecostress_db, cache_dir=self.cache_dir)
+
+        ecostress.get_library(self._GRID)
+        library = ecostress.get_library(SpectralGrid(430, 450, 2), dtype=np.float32)
+
+        self.assertEqual(11, len(library.spectral_data.wavelengths))
+        self.assertEqual(np.float32, library.spectral_data.spectral_responses.dtype)
+        self.assertEqual(2, len(list(self.cache_dir.glob("ecostress/*/*"))))
+
+    def test_cache_disabled(self):
+        Ecostress(self.ecostress_db, cache_dir=False).get_library(self._GRID)
+        self.assertFalse(self.cache_dir.exists())
+
+    def test_get_valid_ranges(self):
+        mask = np.array([[False, True, True, False], [False, False, False, False]])
+        actual = get_valid_ranges(np.array([1.0, 2.0, 3.0, 4.0]), mask)
+        assert_array_equal([[2, 3], [np.nan, np.nan]], actual)
+
+
+if __name__ == '__main__':
+    unittest.main()
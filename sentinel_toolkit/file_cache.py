@@ -0,0 +1,88 @@
+"""
+file_cache provides the helpers shared by the on-disk caches of the toolkit:
+the cache root directory and the SHA-256 digest of the file a cache is built from.
+The digest of a file is recorded in the cache root under its resolved path, size
+and modification time, so the file is hashed again only when one of them changes.
+"""
+
+import hashlib
+import os
+import tempfile
+from pathlib import Path
+
+CACHE_DIR_ENV = "SENTINEL_TOOLKIT_CACHE_DIR"
+_HASH_CHUNK_SIZE = 1 << 20
+_DIGEST_LENGTH = 64
+
+
+def get_cache_dir(cache_dir=None):
+    """
+    Returns the cache root directory.
+
+    Parameters
+    ----------
+    cache_dir : str or Path or bool
+                The cache root directory. If missing, $SENTINEL_TOOLKIT_CACHE_DIR or
+                ~/.cache/sentinel_toolkit will be used. If False, there is no cache.
+    Returns
+    -------
+    output : Path
+             The cache root directory, or None if there is no cache.
+    """
+    if cache_dir is False:
+        return None
+    if cache_dir is None:
+        default_cache_dir = Path.home() / ".cache" / "sentinel_toolkit"
+        cache_dir = os.environ.get(CACHE_DIR_ENV, default_cache_dir)
+
+    return Path(cache_dir)
+
+
+def get_file_sha256(filename, cache_dir):
+    """
+    Returns the SHA-256 digest of a file, hashing it only when its resolved path,
+    size or modification time differ from the ones the recorded digest was taken at.
+
+    Parameters
+    ----------
+    filename : str or Path
+               The file to hash.
+    cache_dir : Path
+                The cache root directory the digest is recorded in.
+    Returns
+    -------
+    output : str
+             The hexadecimal SHA-256 digest of the file.
+    """
+    path = Path(filename).resolve()
+    stat = path.stat()
+    stamp = f"{path}\0{stat.st_size}\0{stat.st_mtime_ns}"
+    digest_path = cache_dir / "digests" / hashlib.sha256(stamp.encode()).hexdigest()
+
+    try:
+        digest = digest_path.read_text(encoding="ascii")
+        if len(digest) == _DIGEST_LENGTH:
+            return digest
+    except (OSError, UnicodeDecodeError):
+        pass
+
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(_HASH_CHUNK_SIZE), b''):
+            sha256.update(chunk)
+    digest = sha256.hexdigest()
+
+    _write_digest(digest_path, digest)
+    return digest
+
+
+def _write_digest(digest_path, digest):
+    # The record only saves hashing the file again, so a read-only or full disk is not an error.
+    try:
+        digest_path.parent.mkdir(parents=True, exist_ok=True)
+        file_descriptor, tmp_filename = tempfile.mkstemp(dir=digest_path.parent, suffix=".tmp")
+        with os.fdopen(file_descriptor, 'w', encoding="ascii") as tmp_file:
+            tmp_file.write(digest)
+        os.replace(tmp_filename, digest_path)
+    except OSError:
+        pass
@@ -7,7 +7,20 @@ S2Srf class acs as a python wrapper around a given S2_SRF Excel file - it provid
 for getting the wavelengths, band data, loading the whole data into
 a colour.MultiSpectralDistributions object, etc.
 S2SrfOptions is a wrapper around the satellite, band names and wavelength range properties.
+SensorSrf keeps the spectral response functions of any sensor (loaded from CSV, JSON
+or NumPy files) in the same array-backed form, and the sensor registry maps names to them.
 """
 
 from .s2_srf import S2Srf
 from .s2_srf import S2SrfOptions
+
+from .sensor_srf import SensorSrf
+from .sensor_srf import SensorRegistry
+from .sensor_srf import SENSOR_REGISTRY
+from .sensor_srf import register_sensor
+from .sensor_srf import get_sensor
+from .sensor_srf import load_srf
+from .sensor_srf import load_srf_csv
+from .sensor_srf import load_srf_json
+from .sensor_srf import load_srf_numpy
+from .sensor_srf import stack_sensors
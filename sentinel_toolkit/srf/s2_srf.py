@@ -3,17 +3,25 @@ s2_srf_reader provides the class S2SrfReader that acts as a python wrapper
 of the Sentinel-2 Spectral Response Functions Excel file.
 """
 
+import os
+import tempfile
+import threading
 import warnings
 
 from dataclasses import dataclass
 from typing import List, Tuple
 
-import pandas as pd
+import numpy as np
 
 from colour import MultiSpectralDistributions
+from openpyxl import load_workbook
+
+from sentinel_toolkit.file_cache import get_cache_dir, get_file_sha256
 
 warnings.filterwarnings('ignore', category=UserWarning, module='openpyxl')
 
+_CACHE_FORMAT_VERSION = 1
+
 
 @dataclass
 class S2SrfOptions:
@@ -58,16 +66,62 @@ class S2Srf:
                    "S2{}_SR_AV_B12"]
     _SHEET_NAME = "Spectral Responses (S2{})"
 
-    def __init__(self, filename):
+    def __init__(self, filename, cache_dir=None):
+        """
+        Parameters
+        ----------
+        filename : str
+                   The Sentinel-2 Spectral Response Functions Excel file.
+        cache_dir : str or bool
+                    The directory used for the binary snapshots of the parsed workbook.
+                    If missing, $SENTINEL_TOOLKIT_CACHE_DIR or ~/.cache/sentinel_toolkit
+                    will be used. If False, the workbook is always parsed.
+        """
         self.all_band_names = {
             'A': list(map(lambda b: b.format('A'), self._BAND_NAMES)),
             'B': list(map(lambda b: b.format('B'), self._BAND_NAMES))
         }
 
-        self.s2_srf_data = {
-            'A': pd.read_excel(filename, sheet_name=self._SHEET_NAME.format('A')),
-            'B': pd.read_excel(filename, sheet_name=self._SHEET_NAME.format('B'))
-        }
+        self.filename = filename
+        self.cache_path = _get_cache_path(filename, cache_dir)
+
+        # The sheets are parsed lazily, on first use of the given satellite. The lock makes
+        # the first use safe from many threads, e.g. the workers of the converter pipeline.
+        self.s2_srf_data = {}
+        self._lock = threading.Lock()
+
+    def _get_s2_srf_data(self, satellite):
+        s2_srf_data = self.s2_srf_data.get(satellite)
+        if s2_srf_data is None:
+            with self._lock:
+                s2_srf_data = self.s2_srf_data.get(satellite)
+                if s2_srf_data is None:
+                    s2_srf_data = _read_snapshot(self.cache_path, satellite)
+                    if s2_srf_data is None:
+                        s2_srf_data = self._read_sheet(satellite)
+                        _write_snapshot(self.cache_path, satellite, s2_srf_data)
+                    self.s2_srf_data[satellite] = s2_srf_data
+
+        return s2_srf_data
+
+    def _read_sheet(self, satellite):
+        # Streams the sheet row by row and keeps only the wavelength and band columns.
+        workbook = load_workbook(self.filename, read_only=True, data_only=True)
+        try:
+            rows = workbook[self._SHEET_NAME.format(satellite)].iter_rows(values_only=True)
+            header = next(rows)
+            column_names = [self._WAVELENGTH_NAME] + self.get_all_band_names(satellite)
+            column_indices = [header.index(column_name) for column_name in column_names]
+
+            wavelength_index = column_indices[0]
+            values = [[row[i] for i in column_indices]
+                      for row in rows if row[wavelength_index] is not None]
+        finally:
+            workbook.close()
+
+        wavelengths = np.array([row[0] for row in values])
+        responses = np.array([row[1:] for row in values], dtype=np.float64)
+        return wavelengths, responses
 
     def get_wavelengths(self, satellite='A'):
         """
@@ -76,15 +130,15 @@ class S2Srf:
         Parameters
         ----------
         satellite : str
-                    The satellite of interest - A or B. If missing, default to 'A'
+                    The satellite of interest - A, B or C. If missing, default to 'A'
         Returns
         -------
         output : ndarray
                  An array containing the wavelengths
         """
-        return self.s2_srf_data[satellite][self._WAVELENGTH_NAME].to_numpy()
+        return self._get_s2_srf_data(satellite)[0]
 
-    def get_bands_responses(self, options=None):
+    def get_bands_responses(self, options=None, dtype=np.float64):
         """
         Retrieves the bands responses given an array of band names.
 
@@ -95,6 +149,8 @@ class S2Srf:
                   If satellite is missing, satellite 'A' will be used.
                   If band names are missing, all band names will be used.
                   If wavelength range is missing, (360, 830) will be used.
+        dtype : data-type
+                The type of the returned array, e.g. np.float32. If missing, np.float64.
         Returns
         -------
         output : ndarray
@@ -103,10 +159,10 @@ class S2Srf:
         """
         satellite, band_names, wavelength_range = self._parse_s2srf_options(options)
 
-        wavelengths = self.get_wavelengths()
+        wavelengths = self.get_wavelengths(satellite)
         mask = (wavelengths >= wavelength_range[0]) & (wavelengths <= wavelength_range[1])
 
-        return self.s2_srf_data[satellite][band_names].T.to_numpy()[:, mask]
+        return self._get_band_columns(satellite, band_names)[mask].T.astype(dtype, copy=False)
 
     def _parse_s2srf_options(self, options):
         if options is None:
@@ -124,6 +180,11 @@ class S2Srf:
 
         return satellite, band_names, wavelength_range
 
+    def _get_band_columns(self, satellite, band_names):
+        all_band_names = self.get_all_band_names(satellite)
+        indices = [all_band_names.index(band_name) for band_name in band_names]
+        return self._get_s2_srf_data(satellite)[1][:, indices]
+
     def get_all_band_names(self, satellite='A'):
         """
         Retrieves all the band names.
@@ -131,12 +192,14 @@ class S2Srf:
         Parameters
         ----------
         satellite : str
-                    The satellite of interest - A or B. If missing, default to 'A'
+                    The satellite of interest - A, B or C. If missing, default to 'A'
         Returns
         -------
         output : list
                  A list containing all the band names.
         """
+        if satellite not in self.all_band_names:
+            self.all_band_names[satellite] = [b.format(satellite) for b in self._BAND_NAMES]
         return self.all_band_names[satellite]
 
     def get_bands_responses_distribution(self, options=None):
@@ -159,10 +222,45 @@ class S2Srf:
         """
         satellite, band_names, wavelength_range = self._parse_s2srf_options(options)
 
-        wavelengths = self.get_wavelengths()
+        wavelengths = self.get_wavelengths(satellite)
         mask = (wavelengths >= wavelength_range[0]) & (wavelengths <= wavelength_range[1])
 
-        bands_srf = self.s2_srf_data[satellite][band_names].to_numpy()[mask, :]
+        bands_srf = self._get_band_columns(satellite, band_names)[mask]
         wavelengths = wavelengths[mask]
 
-        return MultiSpectralDistributions(dict(zip(wavelengths, bands_srf)))
+        return MultiSpectralDistributions(bands_srf, wavelengths)
+
+
+def _get_cache_path(filename, cache_dir):
+    cache_dir = get_cache_dir(cache_dir)
+    if cache_dir is None:
+        return None
+
+    sha256 = get_file_sha256(filename, cache_dir)
+    return cache_dir / "srf" / f"v{_CACHE_FORMAT_VERSION}-{sha256}"
+
+
+def _read_snapshot(cache_path, satellite):
+    if cache_path is None:
+        return None
+    try:
+        wavelengths = np.load(cache_path / f"S2{satellite}_wavelengths.npy", mmap_mode='r')
+        responses = np.load(cache_path / f"S2{satellite}_responses.npy", mmap_mode='r')
+    except (OSError, ValueError):
+        return None
+    return wavelengths, responses
+
+
+def _write_snapshot(cache_path, satellite, snapshot):
+    # The cache is only an optimization, so a read-only or full disk is not an error.
+    if cache_path is None:
+        return
+    try:
+        cache_path.mkdir(parents=True, exist_ok=True)
+        for name, array in zip(("wavelengths", "responses"), snapshot):
+            file_descriptor, tmp_filename = tempfile.mkstemp(dir=cache_path, suffix=".tmp")
+            with os.fdopen(file_descriptor, 'wb') as tmp_file:
+                np.save(tmp_file, np.ascontiguousarray(array))
+            os.replace(tmp_filename, cache_path / f"S2{satellite}_{name}.npy")
+    except OSError:
+        pass
@@ -0,0 +1,404 @@
+"""
+sensor_srf provides the class SensorSrf that keeps the spectral response functions
+of any sensor as arrays, loaders for CSV, JSON and NumPy SRF files,
+and a registry of the known sensors.
+"""
+
+import csv
+import json
+import threading
+from pathlib import Path
+
+import numpy as np
+
+from colour import MultiSpectralDistributions
+
+from .s2_srf import S2SrfOptions
+
+
+class SensorSrf:
+    """
+    SensorSrf keeps the spectral response functions of a sensor on a 1 nm wavelength grid.
+    It provides the same methods as S2Srf, so it can be used everywhere S2Srf is used.
+    The satellite arguments are accepted for compatibility and ignored.
+    """
+
+    def __init__(self, name, wavelengths, band_names, responses):
+        """
+        Parameters
+        ----------
+        name : str
+               The name of the sensor, e.g. "L8_OLI".
+        wavelengths : array_like
+                      The wavelengths in nm, ascending.
+        band_names : list of str
+                     The band names.
+        responses : array_like
+                    A (wavelengths_size x band_names_size) array with the bands responses.
+        """
+        wavelengths = np.asarray(wavelengths, dtype=np.float64)
+        responses = np.asarray(responses, dtype=np.float64).reshape(len(wavelengths), -1)
+
+        if responses.shape[1] != len(band_names):
+            error_msg = f'Expected {len(band_names)} band columns, got {responses.shape[1]}!'
+            raise ValueError(error_msg)
+
+        self.name = name
+        self.band_names = list(band_names)
+        self.wavelengths, self.responses = _to_1nm_grid(wavelengths, responses)
+
+    @classmethod
+    def from_s2_srf(cls, s2_srf, satellite='A', name=None):
+        """
+        Creates a SensorSrf from the given satellite of a S2Srf.
+
+        Parameters
+        ----------
+        s2_srf : sentinel_toolkit.S2Srf
+                 The Sentinel-2 spectral response functions.
+        satellite : str
+                    The satellite of interest. If missing, default to 'A'.
+        name : str
+               The name of the sensor. If missing, default to "S2<satellite>".
+        Returns
+        -------
+        output : SensorSrf
+                 The spectral response functions of the satellite.
+        """
+        wavelengths = s2_srf.get_wavelengths(satellite)
+        band_names = s2_srf.get_all_band_names(satellite)
+        options = S2SrfOptions(satellite, band_names, (wavelengths[0], wavelengths[-1]))
+        responses = s2_srf.get_bands_responses(options)
+        return cls(name or f"S2{satellite}", wavelengths, band_names, responses.T)
+
+    def get_wavelengths(self, satellite=None):  # pylint: disable=unused-argument
+        """
+        Retrieves the wavelengths.
+
+        Returns
+        -------
+        output : ndarray
+                 An array containing the wavelengths
+        """
+        return self.wavelengths
+
+    def get_all_band_names(self, satellite=None):  # pylint: disable=unused-argument
+        """
+        Retrieves all the band names.
+
+        Returns
+        -------
+        output : list
+                 A list containing all the band names.
+        """
+        return self.band_names
+
+    def get_bands_responses(self, options=None, dtype=np.float64):
+        """
+        Retrieves the bands responses.
+
+        Parameters
+        ----------
+        options : S2SrfOptions
+                  The band names and wavelength range of interest.
+                  If band names are missing, all band names will be used.
+                  If wavelength range is missing, (360, 830) will be used.
+        dtype : data-type
+                The type of the returned array, e.g. np.float32. If missing, np.float64.
+        Returns
+        -------
+        output : ndarray
+                 A (band_names_size x wavelengths_size) array
+                 containing the spectral responses of the given bands.
+        """
+        return self._select(options)[1].T.astype(dtype, copy=False)
+
+    def get_bands_responses_distribution(self, options=None):
+        """
+        Retrieves the bands responses as a colour.MultiSpectralDistributions object.
+
+        Parameters
+        ----------
+        options : S2SrfOptions
+                  The band names and wavelength range of interest.
+                  If band names are missing, all band names will be used.
+                  If wavelength range is missing, (360, 830) will be used.
+        Returns
+        -------
+        output : colour.MultiSpectralDistributions
+                 The spectral response functions of the sensor.
+        """
+        wavelengths, bands_srf = self._select(options)
+        return MultiSpectralDistributions(bands_srf, wavelengths)
+
+    def _select(self, options):
+        band_names, wavelength_range = None, None
+        if options is not None:
+            band_names, wavelength_range = options.band_names, options.wavelength_range
+        if band_names is None:
+            band_names = self.band_names
+        if wavelength_range is None:
+            wavelength_range = (360, 830)
+
+        mask = ((self.wavelengths >= wavelength_range[0]) &
+                (self.wavelengths <= wavelength_range[1]))
+        indices = [self.band_names.index(band_name) for band_name in band_names]
+
+        return self.wavelengths[mask], self.responses[mask][:, indices]
+
+
+class SensorRegistry:
+    """
+    SensorRegistry maps sensor names to SensorSrf objects.
+    Sensors registered by filename are loaded on first use.
+    """
+
+    def __init__(self):
+        self._sources = {}
+        self._sensors = {}
+        self._lock = threading.Lock()
+
+    def register(self, name, source):
+        """
+        Registers a sensor.
+
+        Parameters
+        ----------
+        name : str
+               The name of the sensor.
+        source : SensorSrf or str or Path
+                 The sensor SRF or the name of a CSV, JSON, .npy or .npz SRF file.
+        """
+        with self._lock:
+            self._sensors.pop(name, None)
+            if isinstance(source, SensorSrf):
+                self._sensors[name] = source
+            self._sources[name] = source
+
+    def get(self, name):
+        """
+        Retrieves a registered sensor.
+
+        Parameters
+        ----------
+        name : str
+               The name of the sensor.
+        Returns
+        -------
+        output : SensorSrf
+                 The spectral response functions of the sensor.
+        """
+        with self._lock:
+            sensor = self._sensors.get(name)
+            if sensor is None:
+                if name not in self._sources:
+                    raise KeyError(f'Unknown sensor "{name}"!')
+                sensor = load_srf(self._sources[name], name)
+                self._sensors[name] = sensor
+        return sensor
+
+    def names(self):
+        """
+        Retrieves the names of all the registered sensors.
+
+        Returns
+        -------
+        output : list of str
+                 The registered sensor names.
+        """
+        return list(self._sources)
+
+
+SENSOR_REGISTRY = SensorRegistry()
+
+
+def register_sensor(name, source):
+    """
+    Registers a sensor in the default sensor registry.
+
+    Parameters
+    ----------
+    name : str
+           The name of the sensor.
+    source : SensorSrf or str or Path
+             The sensor SRF or the name of a CSV, JSON, .npy or .npz SRF file.
+    """
+    SENSOR_REGISTRY.register(name, source)
+
+
+def get_sensor(name):
+    """
+    Retrieves a sensor from the default sensor registry.
+
+    Parameters
+    ----------
+    name : str
+           The name of the sensor.
+    Returns
+    -------
+    output : SensorSrf
+             The spectral response functions of the sensor.
+    """
+    return SENSOR_REGISTRY.get(name)
+
+
+def load_srf(filename, name=None):
+    """
+    Loads a SensorSrf from a CSV, JSON, .npy or .npz file, depending on the file extension.
+
+    Parameters
+    ----------
+    filename : str or Path
+               The SRF filename.
+    name : str
+           The name of the sensor. If missing, the file stem will be used.
+    Returns
+    -------
+    output : SensorSrf
+             The spectral response functions of the sensor.
+    """
+    loaders = {
+        ".csv": load_srf_csv,
+        ".json": load_srf_json,
+        ".npy": load_srf_numpy,
+        ".npz": load_srf_numpy
+    }
+    suffix = Path(filename).suffix.lower()
+    if suffix not in loaders:
+        raise ValueError(f'Unsupported SRF file format "{suffix}"!')
+    return loaders[suffix](filename, name)
+
+
+def load_srf_csv(filename, name=None):
+    """
+    Loads a SensorSrf from a CSV file, whose first column contains the wavelengths in nm
+    and the rest of the columns contain the bands responses. The header holds the band names.
+
+    Parameters
+    ----------
+    filename : str or Path
+               The SRF filename.
+    name : str
+           The name of the sensor. If missing, the file stem will be used.
+    Returns
+    -------
+    output : SensorSrf
+             The spectral response functions of the sensor.
+    """
+    with open(filename, encoding='utf-8', newline='') as srf_file:
+        header = next(csv.reader(srf_file))
+        data = np.loadtxt(srf_file, delimiter=',', ndmin=2)
+
+    band_names = [band_name.strip() for band_name in header[1:]]
+    return SensorSrf(name or Path(filename).stem, data[:, 0], band_names, data[:, 1:])
+
+
+def load_srf_json(filename, name=None):
+    """
+    Loads a SensorSrf from a JSON file in the following format::
+
+        {"name": "L8_OLI", "wavelengths": [...], "bands": {"B1": [...], ...}}
+
+    Parameters
+    ----------
+    filename : str or Path
+               The SRF filename.
+    name : str
+           The name of the sensor. If missing, the name from the file
+           or the file stem will be used.
+    Returns
+    -------
+    output : SensorSrf
+             The spectral response functions of the sensor.
+    """
+    with open(filename, encoding='utf-8') as srf_file:
+        data = json.load(srf_file)
+
+    band_names = list(data["bands"])
+    responses = np.array([data["bands"][band_name] for band_name in band_names]).T
+    name = name or data.get("name", Path(filename).stem)
+    return SensorSrf(name, data["wavelengths"], band_names, responses)
+
+
+def load_srf_numpy(filename, name=None):
+    """
+    Loads a SensorSrf from a NumPy file. An .npz file should contain the arrays
+    "wavelengths", "responses" (wavelengths x bands) and optionally "band_names".
+    An .npy file should contain a 2D array whose first column holds the wavelengths.
+
+    Parameters
+    ----------
+    filename : str or Path
+               The SRF filename.
+    name : str
+           The name of the sensor. If missing, the file stem will be used.
+    Returns
+    -------
+    output : SensorSrf
+             The spectral response functions of the sensor.
+    """
+    name = name or Path(filename).stem
+
+    data = np.load(filename)
+    if isinstance(data, np.ndarray):
+        wavelengths, responses = data[:, 0], data[:, 1:]
+        band_names = None
+    else:
+        with data:
+            wavelengths, responses = data["wavelengths"], data["responses"]
+            band_names = data["band_names"].tolist() if "band_names" in data else None
+
+    if band_names is None:
+        band_names = [f"B{i + 1}" for i in range(responses.shape[1])]
+    return SensorSrf(name, wavelengths, band_names, responses)
+
+
+def stack_sensors(sensors, name=None):
+    """
+    Stacks the bands of several sensors into a single SensorSrf, so that a spectral library
+    can be simulated for all of them with a single matrix multiplication.
+    Each sensor's responses are zero outside its own wavelength range.
+
+    Parameters
+    ----------
+    sensors : list of SensorSrf
+              The sensors to stack. Their band names should be unique.
+    name : str
+           The name of the stacked sensor. If missing, the sensor names joined by "+".
+    Returns
+    -------
+    output : SensorSrf
+             The stacked spectral response functions.
+    """
+    band_names = [band_name for sensor in sensors for band_name in sensor.band_names]
+    if len(set(band_names)) != len(band_names):
+        raise ValueError("The band names of the stacked sensors should be unique!")
+
+    start = min(sensor.wavelengths[0] for sensor in sensors)
+    end = max(sensor.wavelengths[-1] for sensor in sensors)
+    wavelengths = np.arange(start, end + 1)
+
+    responses = np.zeros((len(wavelengths), len(band_names)))
+    column = 0
+    for sensor in sensors:
+        offset = int(sensor.wavelengths[0] - start)
+        bands_count = len(sensor.band_names)
+        responses[offset: offset + len(sensor.wavelengths), column: column + bands_count] = \
+            sensor.responses
+        column += bands_count
+
+    name = name or '+'.join(sensor.name for sensor in sensors)
+    return SensorSrf(name, wavelengths, band_names, responses)
+
+
+def _to_1nm_grid(wavelengths, responses):
+    # The conversion functions and the illuminants work on an integer 1 nm grid.
+    if float(wavelengths[0]).is_integer() and np.all(np.diff(wavelengths) == 1):
+        return wavelengths, responses
+
+    grid = np.arange(np.ceil(wavelengths[0]), np.floor(wavelengths[-1]) + 1)
+    resampled = np.empty((len(grid), responses.shape[1]))
+    for i in range(responses.shape[1]):
+        resampled[:, i] = np.interp(grid, wavelengths, responses[:, i])
+
+    return grid, resampled
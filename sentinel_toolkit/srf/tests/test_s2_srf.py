@@ -1,5 +1,10 @@
 import os
+import tempfile
+import threading
+import time
 import unittest
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
 
 import numpy as np
 from colour import MultiSpectralDistributions
@@ -46,7 +51,52 @@ class TestS2Srf(unittest.TestCase):
                                 "S2{}_SR_AV_B12"]
 
     def setUp(self):
-        self.s2_srf = S2Srf(self._SRF_FILENAME)
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.s2_srf = S2Srf(self._SRF_FILENAME, cache_dir=self.cache_dir.name)
+
+    def tearDown(self):
+        self.cache_dir.cleanup()
+
+    def test_cached_snapshot_is_used(self):
+        expected = self.s2_srf.get_bands_responses()
+
+        with patch('sentinel_toolkit.srf.s2_srf.load_workbook') as mock_load_workbook:
+            s2_srf = S2Srf(self._SRF_FILENAME, cache_dir=self.cache_dir.name)
+            actual = s2_srf.get_bands_responses()
+            mock_load_workbook.assert_not_called()
+
+        assert_array_equal(expected, actual)
+
+    def test_sheets_are_loaded_lazily(self):
+        self.assertEqual({}, self.s2_srf.s2_srf_data)
+        self.s2_srf.get_wavelengths(satellite='B')
+        self.assertEqual(['B'], list(self.s2_srf.s2_srf_data))
+
+    def test_sheet_is_loaded_once_from_many_threads(self):
+        s2_srf = S2Srf(self._SRF_FILENAME, cache_dir=False)
+        snapshot = self.s2_srf._read_sheet('A')
+        barrier = threading.Barrier(4)
+
+        # The sheet is read slowly, so all the threads ask for it before it is loaded.
+        read_sheet = lambda satellite: time.sleep(0.05) or snapshot
+        with patch.object(S2Srf, '_read_sheet', side_effect=read_sheet) as mock_read_sheet:
+            def get_wavelengths():
+                barrier.wait()
+                return s2_srf.get_wavelengths()
+
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                results = [executor.submit(get_wavelengths) for _ in range(4)]
+                wavelengths = [result.result() for result in results]
+
+            mock_read_sheet.assert_called_once_with('A')
+
+        for actual in wavelengths:
+            self.assertIs(wavelengths[0], actual)
+
+    def test_cache_disabled(self):
+        s2_srf = S2Srf(self._SRF_FILENAME, cache_dir=False)
+        self.assertIsNone(s2_srf.cache_path)
+        assert_array_equal(self.s2_srf.get_bands_responses(), s2_srf.get_bands_responses())
 
     def test_get_wavelengths(self):
         expected = self._EXPECTED_BANDS_RESPONSES_DISTRIBUTION.wavelengths
@@ -63,6 +113,11 @@ class TestS2Srf(unittest.TestCase):
         actual = self.s2_srf.get_bands_responses(S2SrfOptions(satellite='B'))
         assert_array_equal(expected, actual)
 
+    def test_get_bands_responses_float32(self):
+        actual = self.s2_srf.get_bands_responses(dtype=np.float32)
+        self.assertEqual(np.float32, actual.dtype)
+        assert_array_equal(self._EXPECTED_BANDS_RESPONSES_DISTRIBUTION.values.T.astype(np.float32), actual)
+
     def test_get_specific_bands_responses_with_bands(self):
         b1_values = self._EXPECTED_BANDS_RESPONSES_DISTRIBUTION.values[:, self._B1_INDEX]
         b2_values = self._EXPECTED_BANDS_RESPONSES_DISTRIBUTION.values[:, self._B2_INDEX]
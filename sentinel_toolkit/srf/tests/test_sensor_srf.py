@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from numpy.testing import assert_array_equal, assert_array_almost_equal
+
+from sentinel_toolkit.colorimetry import ConversionKernel
+from sentinel_toolkit.srf import S2Srf, S2SrfOptions
+from sentinel_toolkit.srf import SensorSrf, SensorRegistry
+from sentinel_toolkit.srf import load_srf, stack_sensors
+
+
+class TestSensorSrf(unittest.TestCase):
+    _SRF_FILENAME = os.path.dirname(__file__) + "/test_data/s2a_srf.xlsx"
+
+    _WAVELENGTHS = np.array([438, 439, 440, 441, 442, 443])
+    _BAND_NAMES = ["B1", "B2"]
+    _RESPONSES = np.array([
+        [0.1, 0.0],
+        [0.5, 0.0],
+        [1.0, 0.2],
+        [0.5, 0.6],
+        [0.1, 1.0],
+        [0.0, 0.4]
+    ])
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.sensor = SensorSrf("TEST", self._WAVELENGTHS, self._BAND_NAMES, self._RESPONSES)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _assert_sensor_equal(self, sensor):
+        assert_array_equal(self._WAVELENGTHS, sensor.get_wavelengths())
+        self.assertEqual(self._BAND_NAMES, sensor.get_all_band_names())
+        assert_array_equal(self._RESPONSES.T, sensor.get_bands_responses())
+
+    def test_get_bands_responses_with_options(self):
+        options = S2SrfOptions(band_names=["B2"], wavelength_range=(440, 441))
+        assert_array_equal([[0.2, 0.6]], self.sensor.get_bands_responses(options))
+
+    def test_irregular_wavelengths_are_resampled_to_1nm(self):
+        sensor = SensorSrf("TEST", [438.5, 440.5, 442.5], ["B1"], [0.0, 1.0, 0.0])
+        assert_array_equal([439, 440, 441, 442], sensor.get_wavelengths())
+        assert_array_almost_equal([[0.25, 0.75, 0.75, 0.25]], sensor.get_bands_responses())
+
+    def test_load_srf_csv(self):
+        filename = os.path.join(self.tmp_dir.name, "test.csv")
+        np.savetxt(filename, np.column_stack([self._WAVELENGTHS, self._RESPONSES]),
+                   delimiter=',', header="SR_WL,B1,B2", comments='')
+        self._assert_sensor_equal(load_srf(filename))
+
+    def test_load_srf_json(self):
+        filename = os.path.join(self.tmp_dir.name, "test.json")
+        with open(filename, 'w', encoding='utf-8') as srf_file:
+            json.dump({"name": "TEST",
+                       "wavelengths": self._WAVELENGTHS.tolist(),
+                       "bands": {"B1": self._RESPONSES[:, 0].tolist(),
+                                 "B2": self._RESPONSES[:, 1].tolist()}}, srf_file)
+        self._assert_sensor_equal(load_srf(filename))
+
+    def test_load_srf_numpy(self):
+        filename = os.path.join(self.tmp_dir.name, "test.npz")
+        np.savez(filename, wavelengths=self._WAVELENGTHS, responses=self._RESPONSES,
+                 band_names=np.array(self._BAND_NAMES))
+        self._assert_sensor_equal(load_srf(filename))
+
+    def test_from_s2_srf(self):
+        s2_srf = S2Srf(self._SRF_FILENAME, cache_dir=False)
+        sensor = SensorSrf.from_s2_srf(s2_srf, 'B')
+
+        self.assertEqual("S2B", sensor.name)
+        assert_array_equal(s2_srf.get_bands_responses(S2SrfOptions(satellite='B')),
+                           sensor.get_bands_responses())
+
+    def test_registry(self):
+        filename = os.path.join(self.tmp_dir.name, "test.npz")
+        np.savez(filename, wavelengths=self._WAVELENGTHS, responses=self._RESPONSES)
+
+        registry = SensorRegistry()
+        registry.register("FILE", filename)
+        registry.register("OBJECT", self.sensor)
+
+        self.assertEqual(["FILE", "OBJECT"], registry.names())
+        self.assertIs(self.sensor, registry.get("OBJECT"))
+        self.assertIs(registry.get("FILE"), registry.get("FILE"))
+        with self.assertRaises(KeyError):
+            registry.get("MISSING")
+
+    def test_stack_sensors(self):
+        other = SensorSrf("OTHER", [442, 443, 444], ["C1"], [1.0, 1.0, 1.0])
+        stacked = stack_sensors([self.sensor, other])
+
+        self.assertEqual(["B1", "B2", "C1"], stacked.get_all_band_names())
+        assert_array_equal(np.arange(438, 445), stacked.get_wavelengths())
+
+        kernel = ConversionKernel(stacked.get_bands_responses(), np.ones(7))
+        library = np.array([np.linspace(0.1, 0.7, 7), np.full(7, 0.5)])
+        actual = kernel.apply(library)
+
+        expected_sensor = ConversionKernel(self.sensor.get_bands_responses(), np.ones(6)).apply(library[:, :6])
+        expected_other = ConversionKernel(other.get_bands_responses(), np.ones(3)).apply(library[:, 4:])
+        assert_array_almost_equal(np.hstack([expected_sensor, expected_other]), actual)
+
+    def test_stack_sensors_with_duplicated_band_names(self):
+        with self.assertRaises(ValueError):
+            stack_sensors([self.sensor, self.sensor])
+
+
+if __name__ == '__main__':
+    unittest.main()